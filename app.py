@@ -1,19 +1,43 @@
 """
 app.py — Monte Carlo Insight Simulator (Streamlit)
 """
+import atexit
+import os
+import time
+import uuid
+
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
 import numpy as np
 
 from simulation import (
-    run_simulation,
-    auto_convergence,
+    stream_convergence,
+    estimate_mean,
+    correlation_matrix,
+    copula_factor,
     calc_confidence_interval,
     calc_running_mean,
     sensitivity_analysis,
+    bootstrap_intervals,
+    sobol_indices,
+    parameter_grid,
+    sweep_scenarios,
+    tail_probability,
+    result_histogram,
+    empirical_table,
+    histogram_table,
+    BLOCK_SIZE,
+    SAMPLING_METHODS,
+)
+from scenarios import (
+    save_scenario, load_scenario, list_scenarios, list_tags, delete_scenario,
+    content_hash, make_summary, save_summary, load_summary,
 )
-from scenarios import save_scenario, load_scenario, list_scenarios, delete_scenario
+from cache import ResultCache, config_key
+from result_store import RUNS_DIR, cleanup_runs, delete_store
+from export import EXPORT_FORMATS, export_result, parquet_available
+from formula import FUNCTION_NAMES, compile_formula
+from jobs import SimulationJob
+import profiling
 
 # ─────────────────────────────────────────────
 # 페이지 설정
@@ -89,6 +113,7 @@ st.markdown(
     .val-purple { color: #7c3aed; }
     .val-green  { color: #059669; }
     .val-orange { color: #d97706; }
+    .val-red    { color: #dc2626; }
 
     /* ── 탭 ── */
     [data-testid="stTab"] {
@@ -179,12 +204,104 @@ if "variables" not in st.session_state:
     st.session_state.variables = [
         {"name": "변수 A", "min": 0.0, "max": 100.0, "dist": "정규", "weight": 1.0},
     ]
-if "results_df" not in st.session_state:
-    st.session_state.results_df = None
-if "running_means" not in st.session_state:
-    st.session_state.running_means = None
+if "run" not in st.session_state:
+    st.session_state.run = None       # 마지막 실행 결과 묶음 (df, running_means, ...)
+    st.session_state.run_key = None   # 그 실행의 캐시 키
+
+
+def release_files(key: str, name: str, value) -> None:
+    """캐시에서 밀려난 항목이 가리키는 디스크 파일(디스크 실행 결과, 내보내기 파일)을 지웁니다."""
+    if name.startswith("export:"):
+        value.unlink(missing_ok=True)
+    elif name == "run" and value["result"].on_disk:
+        delete_store(value["result"].data.filename)
+
+
+@st.cache_resource
+def get_cache() -> ResultCache:
+    """
+    모든 세션이 공유하는 결과 캐시 (한도: 환경변수 MC_CACHE_MB 기본 512MB,
+    디스크 결과는 MC_DISK_MB 기본 4096MB). 처음 만들 때 이전 프로세스가 남긴 임시 파일을 정리하고,
+    프로세스가 끝날 때 캐시를 비워 남은 디스크 결과도 지웁니다.
+    """
+    cleanup_runs()
+    result_cache = ResultCache(
+        max_bytes=int(os.environ.get("MC_CACHE_MB", 512)) * 2**20,
+        max_disk_bytes=int(os.environ.get("MC_DISK_MB", 4096)) * 2**20,
+        on_evict=release_files,
+    )
+    atexit.register(result_cache.clear)
+    return result_cache
+
+
+cache = get_cache()
+
+DIST_OPTIONS = ["균등", "정규", "삼각", "경험"]
+STOP_REASONS = {
+    "precision": "목표 정밀도 도달",
+    "tolerance": "평균 변화 허용 오차 도달",
+    "max_iter": "최대 반복 횟수",
+    "cancelled": "사용자 중단",
+}
+
+
+def empirical_input(var: dict, i: int) -> None:
+    """
+    경험 분포 입력: CSV 의 원자료 열 또는 히스토그램(하한 / 상한 / 도수 열)으로 조회표를 만듭니다.
+    조회표는 var["table"] 에 저장되어 시나리오 / 캐시 키와 함께 다뤄지고, 범위는 표의 양 끝입니다.
+    """
+    import pandas as pd
 
-DIST_OPTIONS = ["균등", "정규", "삼각"]
+    upload = st.file_uploader("관측 데이터 (CSV)", type="csv", key=f"emp_file_{i}")
+    if upload is not None:
+        # 파싱한 표와 조회표는 업로드 파일(file_id)과 선택한 열이 바뀔 때만 다시 만듭니다.
+        # 그 밖의 재실행(다른 위젯 조작)에서는 CSV 를 다시 읽지 않고 세션에 둔 결과를 씁니다.
+        parsed = st.session_state.get(f"emp_parsed_{i}")
+        if parsed is None or parsed["file_id"] != upload.file_id:
+            parsed = {"file_id": upload.file_id, "frame": None, "error": None, "tables": {}}
+            try:
+                parsed["frame"] = pd.read_csv(upload).select_dtypes("number")
+            except ValueError as exc:
+                parsed["error"] = exc
+            st.session_state[f"emp_parsed_{i}"] = parsed
+        frame, tables = parsed["frame"], parsed["tables"]
+        try:
+            if parsed["error"] is not None:
+                raise parsed["error"]
+            if frame.columns.empty:
+                raise ValueError("숫자 열이 없습니다.")
+            cols = list(frame.columns)
+            mode = st.radio("형식", ["원자료", "히스토그램"], horizontal=True, key=f"emp_mode_{i}")
+            if mode == "원자료":
+                col = st.selectbox("값 열", cols, key=f"emp_col_{i}")
+                choice = (mode, col)
+                if choice not in tables:
+                    tables[choice] = empirical_table(frame[col].to_numpy())
+            else:
+                c1, c2, c3 = st.columns(3)
+                lo = c1.selectbox("하한", cols, index=0, key=f"emp_lo_{i}")
+                hi = c2.selectbox("상한", cols, index=min(1, len(cols) - 1), key=f"emp_hi_{i}")
+                cnt = c3.selectbox("도수", cols, index=min(2, len(cols) - 1), key=f"emp_cnt_{i}")
+                choice = (mode, lo, hi, cnt)
+                if choice not in tables:
+                    bins = frame[[lo, hi, cnt]].dropna().sort_values(lo)
+                    if not np.allclose(bins[lo].to_numpy()[1:], bins[hi].to_numpy()[:-1]):
+                        raise ValueError("구간이 이어져 있어야 합니다 (각 상한 = 다음 하한).")
+                    edges = np.append(bins[lo].to_numpy(), bins[hi].to_numpy()[-1:])
+                    tables[choice] = histogram_table(edges, bins[cnt].to_numpy())
+            table = tables[choice]
+            var["table"] = table
+            var["min"], var["max"] = table[0], table[-1]
+        except ValueError as exc:
+            st.error(f"경험 분포 오류: {exc}")
+    table = var.get("table")
+    if table:
+        st.caption(
+            f"범위 {table[0]:,.4g} ~ {table[-1]:,.4g} · 중앙값 {table[len(table) // 2]:,.4g} "
+            f"· 조회표 {len(table) - 1}구간"
+        )
+    else:
+        st.warning("CSV 를 올려야 이 변수로 실행할 수 있습니다.")
 
 # ─────────────────────────────────────────────
 # 사이드바 — 변수 설정
@@ -217,21 +334,30 @@ with st.sidebar:
         with st.expander(f"**{var['name']}**", expanded=True):
             col1, col2 = st.columns([4, 1])
             with col1:
-                var["name"] = st.text_input("변수명", value=var["name"], key=f"name_{i}")
+                new_name = st.text_input("변수명", value=var["name"], key=f"name_{i}")
+                if new_name != var["name"]:
+                    # 다른 변수에 적힌 상관계수도 새 이름을 따라가게 합니다.
+                    for other in st.session_state.variables:
+                        if var["name"] in other.get("corr", {}):
+                            other["corr"][new_name] = other["corr"].pop(var["name"])
+                    var["name"] = new_name
             with col2:
                 st.markdown("<div style='margin-top:28px;'></div>", unsafe_allow_html=True)
                 if st.button("🗑️", key=f"del_{i}", help="삭제"):
                     delete_idx = i
 
-            c1, c2 = st.columns(2)
-            var["min"] = c1.number_input("최솟값", value=float(var["min"]), key=f"min_{i}", step=1.0)
-            var["max"] = c2.number_input("최댓값", value=float(var["max"]), key=f"max_{i}", step=1.0)
-
             var["dist"] = st.selectbox(
                 "분포 유형", DIST_OPTIONS,
                 index=DIST_OPTIONS.index(var["dist"]),
                 key=f"dist_{i}",
             )
+            if var["dist"] == "경험":
+                empirical_input(var, i)
+            else:
+                var.pop("table", None)
+                c1, c2 = st.columns(2)
+                var["min"] = c1.number_input("최솟값", value=float(var["min"]), key=f"min_{i}", step=1.0)
+                var["max"] = c2.number_input("최댓값", value=float(var["max"]), key=f"max_{i}", step=1.0)
             var["weight"] = st.slider(
                 "가중치", 0.1, 5.0, float(var["weight"]), 0.1, key=f"w_{i}"
             )
@@ -247,6 +373,73 @@ with st.sidebar:
         )
         st.rerun()
 
+    # ── 변수 간 상관관계 ────────────────────────
+    variables = st.session_state.variables
+    if len(variables) >= 2:
+        import pandas as pd  # 변수가 2개 이상일 때만 필요하므로 여기서 가져옵니다.
+
+        names = [v["name"] for v in variables]
+        corr = correlation_matrix(variables)
+        if corr is None:
+            corr = np.eye(len(variables))
+        with st.expander("🔗 변수 간 상관관계", expanded=False):
+            st.caption("순위(Spearman) 상관계수, -1 ~ 1. 위/아래 삼각형 중 한 곳만 고치면 됩니다.")
+            edited = st.data_editor(
+                pd.DataFrame(corr, index=names, columns=names),
+                key="corr_editor",
+                column_config={
+                    name: st.column_config.NumberColumn(min_value=-1.0, max_value=1.0, step=0.05)
+                    for name in names
+                },
+            ).to_numpy(dtype=float)
+            for i, var in enumerate(variables):
+                var_corr = {}
+                for j in range(i + 1, len(variables)):
+                    # 바뀐 쪽 값을 우선합니다 (위 삼각형 → 아래 삼각형 → 기존 값 순).
+                    if edited[i, j] != corr[i, j]:
+                        rho = edited[i, j]
+                    elif edited[j, i] != corr[j, i]:
+                        rho = edited[j, i]
+                    else:
+                        rho = corr[i, j]
+                    if rho:
+                        var_corr[names[j]] = float(rho)
+                if var_corr:
+                    var["corr"] = var_corr
+                else:
+                    var.pop("corr", None)
+            final = correlation_matrix(variables)
+            if final is not None and copula_factor(final)[1]:
+                st.warning("상관 행렬이 서로 모순되어(양의 정부호가 아님) 가장 가까운 행렬로 보정해 사용합니다.")
+
+    st.divider()
+
+    # ── 결과 모델 ──────────────────────────────
+    st.markdown(
+        "<p style='font-size:.9rem; font-weight:700; color:#374151; margin:0 0 10px;'>🧮 결과 모델</p>",
+        unsafe_allow_html=True,
+    )
+    if "loaded_formula" in st.session_state:
+        st.session_state.formula = st.session_state.pop("loaded_formula")
+        st.session_state.use_formula = bool(st.session_state.formula)
+    use_formula = st.toggle(
+        "수식으로 결과 정의", key="use_formula",
+        help="끄면 가중치로 정규화한 가중합을 결과로 씁니다.",
+    )
+    formula = None
+    if use_formula:
+        formula = st.text_input(
+            "결과 수식", key="formula", placeholder="`변수 A` * `변수 B` - 100",
+            help="변수명, 숫자, + - * / **, 비교(< > <= >=), "
+                 f"{' / '.join(FUNCTION_NAMES)} 를 쓸 수 있습니다. "
+                 "공백이 있는 변수명은 `백틱`으로 감싸 주세요.",
+        ).strip() or None
+        if formula:
+            try:
+                compile_formula(formula, tuple(v["name"] for v in st.session_state.variables))
+            except ValueError as exc:
+                st.error(str(exc))
+
     st.divider()
 
     # ── 시뮬레이션 설정 ─────────────────────────
@@ -254,20 +447,66 @@ with st.sidebar:
         "<p style='font-size:.9rem; font-weight:700; color:#374151; margin:0 0 10px;'>⚙️ 시뮬레이션 설정</p>",
         unsafe_allow_html=True,
     )
+    use_disk = st.toggle(
+        "💽 대용량 디스크 모드", value=False,
+        help="결과를 메모리 대신 디스크(memmap)에 저장하고 통계를 청크 단위로 계산합니다.",
+    )
     use_auto = st.toggle("🔁 자동 수렴 감지", value=False)
     if use_auto:
-        tol = st.select_slider(
-            "수렴 허용 오차", options=[1e-2, 5e-3, 1e-3, 5e-4, 1e-4],
-            value=1e-3, format_func=lambda x: f"{x:.0e}"
+        rel_se = st.select_slider(
+            "목표 상대 표준오차 (평균)", options=[1e-2, 5e-3, 1e-3, 5e-4, 1e-4],
+            value=1e-3, format_func=lambda x: f"{x:.0e}",
+            help="평균의 표준오차 ÷ |평균| 이 이 값 이하가 되면 멈춥니다.",
+        )
+        band_tol = st.select_slider(
+            "목표 P5/P95 정밀도", options=[0.0, 5e-2, 2e-2, 1e-2, 5e-3, 2e-3],
+            value=1e-2, format_func=lambda x: "끔" if x == 0 else f"{x:.0e}",
+            help="P5 / P95 의 95% 신뢰구간 반폭 ÷ (P95 - P5) 가 이 값 이하가 되어야 멈춥니다.",
+        )
+        max_iter = st.number_input(
+            "최대 반복 횟수", 10_000, 500_000_000 if use_disk else 500_000, 100_000, 10_000
         )
-        max_iter = st.number_input("최대 반복 횟수", 10_000, 500_000, 100_000, 10_000)
     else:
+        iter_options = [1_000, 5_000, 10_000, 50_000, 100_000]
+        if use_disk:
+            iter_options += [1_000_000, 10_000_000, 100_000_000]
         n_iter = st.selectbox(
             "시뮬레이션 횟수",
-            [1_000, 5_000, 10_000, 50_000, 100_000],
+            iter_options,
             index=2,
             format_func=lambda x: f"{x:,}회",
         )
+    method = st.selectbox(
+        "🎯 샘플링 방식", list(SAMPLING_METHODS),
+        format_func=SAMPLING_METHODS.get,
+        help="LHS / QMC 는 같은 정확도에 도달하는 데 필요한 반복 횟수를 크게 줄여 줍니다.",
+    )
+    antithetic = st.toggle(
+        "🔀 대립 변량 (antithetic)", value=False,
+        help="(u, 1−u) 쌍으로 샘플링해 평균 추정의 분산을 줄입니다.",
+    )
+    control_variates = st.toggle(
+        "🎛️ 제어 변량 (control variates)", value=False,
+        help="입력 변수의 해석적 평균으로 결과 평균을 보정합니다.",
+    )
+    use_seed = st.toggle("🎯 시드 고정", value=False, help="같은 시드면 같은 결과가 재현됩니다.")
+    seed = int(st.number_input("난수 시드", 0, 2**31 - 1, 42, 1)) if use_seed else None
+    workers = int(st.number_input(
+        "⚡ 병렬 워커 수", 1, os.cpu_count() or 1, 1, 1,
+        help="2 이상이면 여러 CPU 코어에서 나눠 실행합니다.",
+    ))
+
+    run_settings = {
+        "use_auto": use_auto, "seed": seed, "method": method,
+        "antithetic": antithetic, "control_variates": control_variates,
+        "disk": use_disk, "formula": formula,
+    }
+    if use_auto:
+        run_settings["rel_se"] = rel_se
+        run_settings["band_tol"] = band_tol or None
+        run_settings["max_iter"] = max_iter
+    else:
+        run_settings["n_iter"] = n_iter
 
     st.divider()
 
@@ -277,26 +516,42 @@ with st.sidebar:
         unsafe_allow_html=True,
     )
     scenario_name = st.text_input("시나리오 이름", value="낙관 시나리오")
+    scenario_tags = st.text_input(
+        "태그 (쉼표 구분)", placeholder="2026, 낙관", help="비워 두면 태그 없이 저장합니다."
+    )
 
     col_s, col_d = st.columns(2)
     if col_s.button("💾 저장", use_container_width=True):
-        settings = {"use_auto": use_auto}
-        if use_auto:
-            settings["tol"] = tol
-            settings["max_iter"] = max_iter
-        else:
-            settings["n_iter"] = n_iter
-        save_scenario(scenario_name, st.session_state.variables, settings)
-        st.success(f"'{scenario_name}' 저장 완료!")
+        try:
+            save_scenario(scenario_name, st.session_state.variables, run_settings, tags=scenario_tags)
+            st.success(f"'{scenario_name.strip()}' 저장 완료!")
+        except ValueError as exc:
+            st.error(str(exc))
 
-    saved = list_scenarios()
+    sc_search = st.text_input("🔍 시나리오 검색", placeholder="이름 일부")
+    all_tags = list_tags()
+    sc_tag = st.selectbox("태그", ["— 전체 —"] + all_tags) if all_tags else "— 전체 —"
+    saved = list_scenarios(sc_search, None if sc_tag == "— 전체 —" else sc_tag)
     if saved:
         selected_sc = st.selectbox("저장된 시나리오", ["— 선택 —"] + saved)
         if selected_sc != "— 선택 —":
+            sc = load_scenario(selected_sc)
+            if sc["tags"]:
+                st.caption("🏷️ " + ", ".join(sc["tags"]))
+            # 같은 내용으로 마지막에 실행한 요약이 있으면 다시 시뮬레이션하지 않고 보여줍니다.
+            last = load_summary(sc["content_hash"])
+            if last is not None:
+                ran_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(last["updated_at"]))
+                st.caption(
+                    f"마지막 실행 {ran_at} · {last['n']:,}회  \n"
+                    f"평균 **{last['mean']:,.2f}** · P5 {last['p5']:,.2f} · P95 {last['p95']:,.2f}"
+                )
+                st.bar_chart(last["hist"]["counts"], height=90)
             btn_load, btn_del = st.columns(2)
             if btn_load.button("📂 불러오기", key="load_sc", use_container_width=True):
-                sc = load_scenario(selected_sc)
                 st.session_state.variables = sc["variables"]
+                # 수식 위젯은 이미 그려졌으므로 다음 실행 초반에 반영합니다.
+                st.session_state.loaded_formula = sc["settings"].get("formula") or ""
                 st.rerun()
             if btn_del.button("🗑️ 삭제", key="del_sc", use_container_width=True):
                 delete_scenario(selected_sc)
@@ -307,10 +562,193 @@ with st.sidebar:
     # ── 실행 버튼 ────────────────────────────────
     run_btn = st.button("🚀 시뮬레이션 실행", use_container_width=True)
 
+    # ── 프로파일링 ────────────────────────────────
+    use_profiling = st.toggle(
+        "⏱️ 프로파일링", value=False,
+        help="이번 화면 갱신에서 엔진 단계와 차트 생성에 든 시간 / 최대 메모리를 표시하고 "
+             "JSON lines 로그로 남깁니다. 켜 두면 메모리 추적 때문에 조금 느려집니다.",
+    )
+    profile_panel = st.container()
+
+# 계측은 토글을 켰을 때만 동작합니다 (꺼져 있으면 엔진의 계측 지점은 아무 일도 하지 않음).
+# Profiler 는 세션마다 따로 두고 이 스크립트 스레드와 이 세션이 시작한 작업에만 연결하므로
+# 다른 세션의 토글이나 실행과 섞이지 않습니다.
+PROFILE_LOG = RUNS_DIR / "profile.jsonl"
+if use_profiling:
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    if st.session_state.get("profiler") is None:
+        st.session_state.profiler = profiling.Profiler(PROFILE_LOG)
+    profiler = st.session_state.profiler
+    # 백그라운드 실행이 끝난 직후의 재실행은 그 실행의 엔진 단계 기록을 이어서 보여줍니다.
+    if not st.session_state.pop("keep_profile", False):
+        profiler.begin(uuid.uuid4().hex[:8])
+else:
+    profiler = None
+    if st.session_state.get("profiler") is not None:
+        st.session_state.profiler.close()
+        st.session_state.profiler = None
+profiling.activate(profiler)
+
+
+def show_profile() -> None:
+    """이번 화면 갱신의 단계별 계측 결과를 사이드바 패널에 표시합니다."""
+    if not use_profiling:
+        return
+    rows = profiling.summary()
+    with profile_panel:
+        if rows:
+            st.dataframe(
+                rows, hide_index=True, use_container_width=True,
+                column_config={
+                    "stage": "단계",
+                    "calls": st.column_config.NumberColumn("호출", format="%d"),
+                    "seconds": st.column_config.NumberColumn("합계(초)", format="%.4f"),
+                    "max_seconds": st.column_config.NumberColumn("최대(초)", format="%.4f"),
+                    "peak_mb": st.column_config.NumberColumn("최대 메모리(MB)", format="%.1f"),
+                },
+            )
+        else:
+            st.caption("계측된 단계가 없습니다. (캐시에서 꺼낸 결과는 다시 계산하지 않습니다)")
+        st.caption(f"로그: `{PROFILE_LOG}`")
+
 
 # ─────────────────────────────────────────────
 # 시뮬레이션 실행
 # ─────────────────────────────────────────────
+def simulate(
+    variables: list[dict], settings: dict, seed: int, workers: int, out_path=None,
+    progress=None, cancel=None,
+) -> dict | None:
+    """
+    설정대로 시뮬레이션하고 화면에 필요한 결과 묶음을 반환합니다 (result: SimulationResult).
+    out_path 를 주면 표본은 디스크에 쓰고, 요약(summary)은 누적 통계로 미리 계산합니다.
+
+    백그라운드 작업에서 실행되므로 두 모드 모두 청크 단위 스트리밍 엔진을 씁니다.
+    progress(run) 은 청크마다 호출되고, cancel 이 설정되면 그때까지의 부분 결과로 묶음을 만듭니다
+    (cancelled=True, 표본이 하나도 없으면 None). 횟수 지정 모드는 BLOCK_SIZE 청크로 끝까지
+    실행하므로 같은 시드의 run_simulation 과 표본이 같습니다.
+    """
+    antithetic = settings["antithetic"]
+    control_variates = settings["control_variates"]
+    formula = settings["formula"]
+    use_vr = antithetic or control_variates
+    if settings["use_auto"]:
+        # 목표 정밀도 기준, 청크는 1,000 부터 BLOCK_SIZE 까지 두 배씩 커집니다.
+        targets = {"rel_se": settings["rel_se"], "band_tol": settings["band_tol"]}
+        min_iter, max_iter, chunk = 1_000, settings["max_iter"], 1_000
+    else:
+        targets = {"tol": 0.0}
+        min_iter, max_iter, chunk = settings["n_iter"], settings["n_iter"], BLOCK_SIZE
+    run = stream_convergence(
+        variables, min_iter=min_iter, max_iter=max_iter, chunk=chunk,
+        seed=seed, workers=workers, method=settings["method"],
+        antithetic=antithetic, control_variates=control_variates, out_path=out_path,
+        formula=formula, progress=progress, cancel=cancel, **targets,
+    )
+    if run.n_done == 0:
+        return None
+    res = run.to_result()
+    estimator = run.estimate() if use_vr else None
+    summary = run.summary() if out_path is not None else None
+    running_means, checkpoints = run.running_means, run.checkpoints
+    hist = run.histogram.coarsen(80)
+    if not settings["use_auto"]:
+        # 횟수 지정 모드는 청크가 커서 수렴 추이를 표본에서 촘촘하게 다시 뽑습니다.
+        idxs, rm = calc_running_mean(res.results)
+        running_means, checkpoints = list(rm), list(idxs)
+        if out_path is None:
+            # 메모리 결과는 실제 범위 기준 히스토그램과 표본 전체의 분산 감소 추정을 씁니다.
+            hist = result_histogram(res.results, 80)
+            if use_vr:
+                estimator = estimate_mean(res.data, variables, antithetic, control_variates)
+    return {
+        "result": res,
+        "running_means": running_means,
+        "checkpoints": checkpoints,
+        "hist": hist,
+        "nonfinite": run.nonfinite,
+        "estimator": estimator,
+        "summary": summary,
+        "cancelled": run.cancelled,
+        "stop_reason": run.stop_reason,
+        "precision": run.precision(),
+        # 파생 분석(Sobol 지수 등)이 실행 당시 모델을 다시 쓸 수 있도록 함께 보관합니다.
+        "variables": [dict(v) for v in variables],
+        "settings": dict(settings),
+        "seed": seed,
+    }
+
+
+def live_snapshot(run) -> dict:
+    """진행 중인 실행에서 화면 갱신용 스냅샷 (표본 없이 누적 통계만 사용)."""
+    return {
+        "n_done": run.n_done,
+        "max_iter": run.max_iter,
+        "running_means": list(run.running_means),
+        "checkpoints": list(run.checkpoints),
+        "ci": run.summary(),
+        "precision": run.precision(),
+        "hist": run.histogram.coarsen(80),
+        "nonfinite": run.nonfinite,
+    }
+
+
+def discard_job_files(meta: dict) -> None:
+    """결과가 캐시에 들어가지 않은 작업(오류, 결과 없음, 새 실행에 밀림)의 디스크 파일을 지웁니다."""
+    if meta.get("out_path") is not None:
+        delete_store(meta["out_path"])
+
+
+def show_run(bundle: dict, run_key: str) -> None:
+    """
+    세션이 보여줄 실행 결과를 바꿉니다. 캐시에 들어가지 않은 결과(중단된 실행의 부분 결과,
+    디스크 한도보다 큰 결과)의 디스크 파일은 이 세션만 쓰므로 다른 결과로 바뀌는 이 시점에 지웁니다.
+    """
+    old = st.session_state.run
+    if (
+        old is not None and old is not bundle and old["result"].on_disk
+        and cache.get(st.session_state.run_key, "run") is not old
+    ):
+        delete_store(old["result"].data.filename)
+    st.session_state.run = bundle
+    st.session_state.run_key = run_key
+
+
+def finish_job(job: SimulationJob) -> None:
+    """끝난 백그라운드 작업의 결과를 캐시 / 세션에 반영합니다 (중단된 실행은 부분 결과로)."""
+    meta = st.session_state.job_meta
+    st.session_state.job = None
+    if job.error is not None:
+        discard_job_files(meta)
+        st.session_state.job_error = f"시뮬레이션 오류: {job.error}"
+        return
+    bundle = job.result
+    if bundle is None:
+        discard_job_files(meta)
+        st.session_state.job_error = "시뮬레이션이 첫 청크 전에 중단되어 결과가 없습니다."
+        return
+    run_key = meta["run_key"]
+    if bundle["cancelled"]:
+        # 부분 결과는 전체 실행과 다른 데이터이므로 결과 자체는 캐시하지 않고,
+        # 파생 데이터(통계, 내보내기 파일 등)만 별도 키로 캐시합니다.
+        run_key = f"{run_key}:partial:{len(bundle['result'])}"
+    else:
+        cache.put(run_key, "run", bundle)
+        # 같은 설정으로 저장된 시나리오가 다시 시뮬레이션 없이 요약을 보여줄 수 있도록 남깁니다.
+        run_ci = bundle["summary"] or cache.get_or_compute(
+            run_key, "ci",
+            lambda: calc_confidence_interval(bundle["result"].results, bundle["estimator"]),
+        )
+        save_summary(
+            content_hash(meta["variables"], meta["settings"]),
+            make_summary(run_ci, bundle["hist"], len(bundle["result"])),
+        )
+    show_run(bundle, run_key)
+
+
+if "job" not in st.session_state:
+    st.session_state.job = None
+
 if run_btn:
     if len(st.session_state.variables) == 0:
         st.error("변수를 최소 1개 이상 추가해주세요.")
@@ -318,23 +756,50 @@ if run_btn:
 
     valid = True
     for v in st.session_state.variables:
-        if v["min"] >= v["max"]:
+        if v["dist"] == "경험" and not v.get("table"):
+            st.error(f"'{v['name']}': 경험 분포에 쓸 CSV 를 올려주세요.")
+            valid = False
+        elif v["min"] >= v["max"]:
             st.error(f"'{v['name']}': 최솟값이 최댓값보다 크거나 같습니다.")
             valid = False
+    if formula:
+        try:
+            compile_formula(formula, tuple(v["name"] for v in st.session_state.variables))
+        except ValueError as exc:
+            st.error(f"결과 수식 오류: {exc}")
+            valid = False
     if not valid:
         st.stop()
 
-    with st.spinner("시뮬레이션 진행 중 ..."):
-        if use_auto:
-            df, rm = auto_convergence(
-                st.session_state.variables, tol=tol, max_iter=max_iter
-            )
-            st.session_state.running_means = rm
-        else:
-            df = run_simulation(st.session_state.variables, n_iter)
-            idxs, rm = calc_running_mean(df["result"].values)
-            st.session_state.running_means = list(rm)
-        st.session_state.results_df = df
+    # 시드를 고정하지 않았으면 이번 실행용 시드를 새로 뽑습니다 (캐시 키에 포함).
+    run_seed = seed if seed is not None else int(np.random.SeedSequence().generate_state(1)[0])
+    run_key = config_key(st.session_state.variables, {**run_settings, "seed": run_seed})
+    bundle = cache.get(run_key, "run")
+    if bundle is not None:
+        show_run(bundle, run_key)
+    else:
+        if st.session_state.job is not None:  # 진행 중인 이전 실행은 중단하고 새로 시작합니다.
+            st.session_state.job.cancel()
+            st.session_state.job.wait()
+            st.session_state.job = None
+            discard_job_files(st.session_state.job_meta)
+        # 실행 중에 사이드바를 바꿔도 작업에는 영향이 없도록 설정을 복사해 넘깁니다.
+        job_variables = [dict(v) for v in st.session_state.variables]
+        job_settings = dict(run_settings)
+        # 실행마다 새 파일을 써서, 다른 세션이 아직 열어 둔 같은 설정의 결과를 덮어쓰지 않습니다.
+        out_path = RUNS_DIR / f"{run_key}-{uuid.uuid4().hex[:8]}.npy" if use_disk else None
+        st.session_state.job_meta = {
+            "run_key": run_key, "variables": job_variables, "settings": job_settings,
+            "out_path": out_path,
+        }
+        st.session_state.job_error = None
+        st.session_state.job = SimulationJob(
+            lambda progress, cancel: simulate(
+                job_variables, job_settings, run_seed, workers, out_path, progress, cancel
+            ),
+            live_snapshot,
+            profiler=profiler,
+        ).start()
 
 
 # ─────────────────────────────────────────────
@@ -364,10 +829,142 @@ CHART_LAYOUT = dict(
 )
 
 
+def histogram_figure(hist: tuple, ci: dict):
+    """미리 집계한 (edges, counts) 와 요약 통계로 결과 분포 히스토그램을 만듭니다."""
+    import plotly.graph_objects as go
+
+    p5, p95 = ci["p5"], ci["p95"]
+    # 엔진이 미리 집계한 구간만 전달 (표본 수와 무관한 상수 크기)
+    edges, counts = hist
+    fig_hist = go.Figure()
+    fig_hist.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        name="시뮬레이션 결과",
+        marker_color="rgba(37,99,235,0.45)",
+        marker_line=dict(color="rgba(37,99,235,0.8)", width=0.5),
+    ))
+    # 90% CI 음영
+    fig_hist.add_vrect(
+        x0=p5, x1=p95,
+        fillcolor="rgba(124,58,237,0.08)",
+        layer="below", line_width=0,
+        annotation_text="90% CI", annotation_position="top left",
+        annotation_font_color="#7c3aed",
+    )
+    # 수직선
+    for val, label, color in [
+        (p5,        f"P5: {p5:,.2f}",         "#2563eb"),
+        (p95,       f"P95: {p95:,.2f}",        "#7c3aed"),
+        (ci["mean"],f"평균: {ci['mean']:,.2f}","#059669"),
+    ]:
+        fig_hist.add_vline(
+            x=val, line_dash="dash", line_color=color, line_width=2,
+            annotation_text=label, annotation_font_color=color,
+            annotation_position="top right",
+        )
+
+    fig_hist.update_layout(
+        title="결과값 확률 분포도",
+        xaxis_title="결과값",
+        yaxis_title="빈도 (횟수)",
+        showlegend=False,
+        bargap=0,
+        **CHART_LAYOUT,
+    )
+    return fig_hist
+
+
+def convergence_figure(x_vals: list, rm: list, ci: dict, mean_label: str = "최종 평균"):
+    """누적 평균 추이 그래프 (ci["mean"] 위치에 기준선)."""
+    import plotly.graph_objects as go
+
+    fig_conv = go.Figure()
+    fig_conv.add_trace(go.Scatter(
+        x=x_vals, y=rm,
+        mode="lines",
+        line=dict(color="#2563eb", width=2.5),
+        fill="tozeroy",
+        fillcolor="rgba(37,99,235,0.06)",
+        name="Running Mean",
+    ))
+    fig_conv.add_hline(
+        y=ci["mean"], line_dash="dot", line_color="#059669", line_width=2,
+        annotation_text=f"{mean_label}: {ci['mean']:,.4f}",
+        annotation_font_color="#059669",
+        annotation_position="right",
+    )
+    fig_conv.update_layout(
+        title="평균값 수렴 그래프",
+        xaxis_title="누적 시뮬레이션 횟수",
+        yaxis_title="누적 평균",
+        **{**CHART_LAYOUT, "margin": dict(t=55, l=60, r=110, b=55)},
+    )
+    return fig_conv
+
+
+# ─────────────────────────────────────────────
+# 진행 중인 실행 (백그라운드 작업)
+# ─────────────────────────────────────────────
+def show_live(job: SimulationJob) -> None:
+    """
+    작업이 끝날 때까지 최신 스냅샷으로 진행률 / 요약 / 분포 / 수렴 차트를 갱신합니다.
+    사이드바나 중단 버튼을 누르면 Streamlit 이 이 루프를 끊고 스크립트를 다시 실행하며,
+    작업 스레드는 영향 없이 계속 진행합니다.
+    """
+    st.markdown(
+        """
+        <div class="page-header">
+            <h1>⏳ 시뮬레이션 진행 중</h1>
+            <p>결과가 쌓이는 대로 분포와 수렴 그래프가 갱신됩니다.</p>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+    if st.button("⏹️ 중단하고 부분 결과 보기", key="cancel_job"):
+        job.cancel()
+    bar = st.progress(0.0)
+    status = st.empty()
+    live_hist, live_conv = st.tabs(["📊 확률 분포도", "📉 수렴 그래프"])
+    hist_slot, conv_slot = live_hist.empty(), live_conv.empty()
+    shown = None
+    while not job.wait(0.5):
+        snap = job.snapshot
+        if snap is None or snap["n_done"] == shown:
+            continue
+        shown = snap["n_done"]
+        ci_live = snap["ci"]
+        bar.progress(min(shown / snap["max_iter"], 1.0))
+        status.markdown(
+            f"**{shown:,}** / {snap['max_iter']:,}회 · 평균 **{ci_live['mean']:,.4f}** · "
+            f"90% 구간 [{ci_live['p5']:,.2f} → {ci_live['p95']:,.2f}] · "
+            f"상대 표준오차 {snap['precision']['rel_se']:.1e} · "
+            f"경과 {time.time() - job.started_at:,.1f}초"
+            + (f" · 유한하지 않은 결과 {snap['nonfinite']:,}개" if snap["nonfinite"] else "")
+            + (" · 중단 요청됨" if job.cancelled else "")
+        )
+        with profiling.stage("chart.live"):
+            hist_slot.plotly_chart(histogram_figure(snap["hist"], ci_live), use_container_width=True)
+            conv_slot.plotly_chart(
+                convergence_figure(snap["checkpoints"], snap["running_means"], ci_live, "현재 평균"),
+                use_container_width=True,
+            )
+
+
+if st.session_state.job is not None:
+    if st.session_state.job.running:
+        show_live(st.session_state.job)
+    finish_job(st.session_state.job)
+    st.session_state.keep_profile = True
+    st.rerun()
+if st.session_state.get("job_error"):
+    st.error(st.session_state.job_error)
+    st.session_state.job_error = None
+
+
 # ─────────────────────────────────────────────
 # 결과 표시
 # ─────────────────────────────────────────────
-if st.session_state.results_df is None:
+if st.session_state.run is None:
     st.markdown(
         """
         <div class="landing-wrap">
@@ -382,20 +979,46 @@ if st.session_state.results_df is None:
         """,
         unsafe_allow_html=True,
     )
+    show_profile()
     st.stop()
 
-df = st.session_state.results_df
-results = df["result"].values
-ci = calc_confidence_interval(results)
+# 차트 라이브러리는 결과를 그릴 때만 가져옵니다 (첫 화면 표시를 늦추지 않도록).
+import plotly.graph_objects as go  # noqa: E402
+
+bundle = st.session_state.run
+run_key = st.session_state.run_key
+res = bundle["result"]
+results = res.results
+# 파생 산출물은 실행 키 단위로 캐시되어 재실행(rerun) 시 다시 계산하지 않습니다.
+if bundle["summary"] is not None:
+    ci = bundle["summary"]  # 디스크 모드: 스케치 기반 요약 (전체 표본을 읽지 않음)
+else:
+    ci = cache.get_or_compute(
+        run_key, "ci", lambda: calc_confidence_interval(results, bundle["estimator"])
+    )
 total_runs = len(results)
 
+
+def fmt_ess(ess: float) -> str:
+    """유효 표본 수 표시 (분산이 사실상 0이면 상한으로 표기)."""
+    return "≥ 10⁹" if ess >= 1e9 else f"{ess:,.0f}"
+
+
+mean_sub = f"중앙값 {ci['median']:,.2f}"
+if "ess" in ci:
+    mean_sub = f"SE {ci['se']:.2g} · 유효 표본 {fmt_ess(ci['ess'])}"
+
 # ── 페이지 헤더 ───────────────────────────────
+partial_note = ""
+if bundle.get("cancelled"):
+    partial_note = " <strong style='color:#dc2626;'>(중단됨 — 부분 결과)</strong>"
 st.markdown(
     f"""
     <div class="page-header">
         <h1>📈 시뮬레이션 결과</h1>
         <p>
-            총 <strong>{total_runs:,}회</strong> 반복 &nbsp;·&nbsp;
+            총 <strong>{total_runs:,}회</strong> 반복{partial_note}
+            {f"(유효 표본 <strong>{fmt_ess(ci['ess'])}</strong>)" if "ess" in ci else ""} &nbsp;·&nbsp;
             변수 <strong>{len(st.session_state.variables)}개</strong> &nbsp;·&nbsp;
             90% 신뢰 구간: <strong>[{ci['p5']:,.2f} → {ci['p95']:,.2f}]</strong>
         </p>
@@ -403,21 +1026,63 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
+if bundle.get("nonfinite"):
+    st.warning(
+        f"결과 {bundle['nonfinite']:,}행이 유한하지 않아(NaN / ±∞) 통계, 히스토그램, 민감도 분석에서 "
+        "제외했습니다. 결과 수식의 정의역(log / sqrt 의 인자, 0 으로 나누기)을 확인하세요."
+    )
+
+# ── 꼬리 확률 (중요도 샘플링) ──────────────────
+# 기본 기준값은 평균 - 3σ (정규 결과라면 약 0.1% 꼬리). 실행이 바뀌면 위젯도 기본값으로 돌아갑니다.
+tail_col1, tail_col2, _ = st.columns([2, 1, 3])
+tail_threshold = tail_col1.number_input(
+    "꼬리 확률 기준값", value=float(round(ci["mean"] - 3 * ci["std"], 2)),
+    help="결과가 이 값보다 작을(클) 확률을 중요도 샘플링으로 추정합니다.",
+)
+tail_side = tail_col2.selectbox(
+    "방향", ["below", "above"], format_func={"below": "미만", "above": "초과"}.get
+)
+tail = cache.get_or_compute(
+    run_key, f"tail:{tail_side}:{tail_threshold}",
+    lambda: tail_probability(
+        bundle["variables"], tail_threshold, tail_side,
+        seed=bundle["seed"], formula=bundle["settings"].get("formula"),
+    ),
+)
+tail_sign = "<" if tail_side == "below" else ">"
+tail_sub = f"P(결과 {tail_sign} {tail_threshold:,.2f}) · SE {tail['se'] * 100:.2g}%p"
+if tail["hits"] == 0:
+    tail_sub = f"P(결과 {tail_sign} {tail_threshold:,.2f}) · 표본이 꼬리에 닿지 않음"
+
+# ── 부트스트랩 구간 (카드 / 토네이도 오차 막대) ──
+boot = cache.get_or_compute(
+    run_key, "bootstrap", lambda: bootstrap_intervals(res, seed=bundle["seed"])
+)
+
+
+def boot_note(key: str) -> str:
+    low, high = boot[key]
+    return f"<br>부트스트랩 {boot['level']:.0%} [{low:,.2f} ~ {high:,.2f}]"
+
+
+if "ess" not in ci:  # 분산 감소 추정이 있으면 그 SE 를 그대로 보여 줍니다.
+    mean_sub += boot_note("mean")
 
 # ── 요약 카드 ─────────────────────────────────
-c1, c2, c3, c4 = st.columns(4)
+c1, c2, c3, c4, c5 = st.columns(5)
 cards = [
-    (c1, "🔵 P5 — 하위 5%",  ci["p5"],   "90% 범위 최저치", "val-blue"),
-    (c2, "🟣 P95 — 상위 5%", ci["p95"],  "90% 범위 최고치", "val-purple"),
-    (c3, "🟢 평균",           ci["mean"], f"중앙값 {ci['median']:,.2f}", "val-green"),
-    (c4, "🟠 표준편차",       ci["std"],  "결과 분산 정도",  "val-orange"),
+    (c1, "🔵 P5 — 하위 5%",  f"{ci['p5']:,.2f}",   "90% 범위 최저치" + boot_note("p5"),  "val-blue"),
+    (c2, "🟣 P95 — 상위 5%", f"{ci['p95']:,.2f}",  "90% 범위 최고치" + boot_note("p95"), "val-purple"),
+    (c3, "🟢 평균",           f"{ci['mean']:,.2f}", mean_sub,                            "val-green"),
+    (c4, "🟠 표준편차",       f"{ci['std']:,.2f}",  "결과 분산 정도" + boot_note("std"),  "val-orange"),
+    (c5, "🔴 꼬리 확률",      f"{tail['prob'] * 100:.3g}%", tail_sub,  "val-red"),
 ]
 for col, label, val, sub, cls in cards:
     col.markdown(
         f"""
         <div class="card">
             <div class="card-label">{label}</div>
-            <div class="card-value {cls}">{val:,.2f}</div>
+            <div class="card-value {cls}">{val}</div>
             <div class="card-sub">{sub}</div>
         </div>
         """,
@@ -427,48 +1092,15 @@ for col, label, val, sub, cls in cards:
 st.markdown("<div style='margin-top:24px;'></div>", unsafe_allow_html=True)
 
 # ── 탭 ───────────────────────────────────────
-tab1, tab2, tab3 = st.tabs(["📊 확률 분포도", "📉 수렴 그래프", "🌪️ 민감도 분석"])
+tab1, tab2, tab3, tab4 = st.tabs(
+    ["📊 확률 분포도", "📉 수렴 그래프", "🌪️ 민감도 분석", "🧪 일괄 비교"]
+)
 
 # ────────────────────────────
 # 탭 1: 히스토그램
 # ────────────────────────────
-with tab1:
-    p5, p95 = ci["p5"], ci["p95"]
-
-    fig_hist = go.Figure()
-    fig_hist.add_trace(go.Histogram(
-        x=results, nbinsx=80,
-        name="시뮬레이션 결과",
-        marker_color="rgba(37,99,235,0.45)",
-        marker_line=dict(color="rgba(37,99,235,0.8)", width=0.5),
-    ))
-    # 90% CI 음영
-    fig_hist.add_vrect(
-        x0=p5, x1=p95,
-        fillcolor="rgba(124,58,237,0.08)",
-        layer="below", line_width=0,
-        annotation_text="90% CI", annotation_position="top left",
-        annotation_font_color="#7c3aed",
-    )
-    # 수직선
-    for val, label, color in [
-        (p5,        f"P5: {p5:,.2f}",         "#2563eb"),
-        (p95,       f"P95: {p95:,.2f}",        "#7c3aed"),
-        (ci["mean"],f"평균: {ci['mean']:,.2f}","#059669"),
-    ]:
-        fig_hist.add_vline(
-            x=val, line_dash="dash", line_color=color, line_width=2,
-            annotation_text=label, annotation_font_color=color,
-            annotation_position="top right",
-        )
-
-    fig_hist.update_layout(
-        title="결과값 확률 분포도",
-        xaxis_title="결과값",
-        yaxis_title="빈도 (횟수)",
-        showlegend=False,
-        **CHART_LAYOUT,
-    )
+with tab1, profiling.stage("chart.histogram"):
+    fig_hist = histogram_figure(bundle["hist"], ci)
     st.markdown('<div class="chart-card">', unsafe_allow_html=True)
     st.plotly_chart(fig_hist, use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
@@ -476,107 +1108,245 @@ with tab1:
 # ────────────────────────────
 # 탭 2: 수렴 그래프
 # ────────────────────────────
-with tab2:
-    rm = st.session_state.running_means
-
-    if use_auto:
-        x_vals = [(i + 1) * 1_000 for i in range(len(rm))]
-    else:
-        idxs, _ = calc_running_mean(results)
-        x_vals = list(idxs)
-
-    fig_conv = go.Figure()
-    fig_conv.add_trace(go.Scatter(
-        x=x_vals, y=rm,
-        mode="lines",
-        line=dict(color="#2563eb", width=2.5),
-        fill="tozeroy",
-        fillcolor="rgba(37,99,235,0.06)",
-        name="Running Mean",
-    ))
-    fig_conv.add_hline(
-        y=ci["mean"], line_dash="dot", line_color="#059669", line_width=2,
-        annotation_text=f"최종 평균: {ci['mean']:,.4f}",
-        annotation_font_color="#059669",
-        annotation_position="right",
-    )
-    fig_conv.update_layout(
-        title="평균값 수렴 그래프",
-        xaxis_title="누적 시뮬레이션 횟수",
-        yaxis_title="누적 평균",
-        **{**CHART_LAYOUT, "margin": dict(t=55, l=60, r=110, b=55)},
-    )
+with tab2, profiling.stage("chart.convergence"):
+    rm = bundle["running_means"]
+    x_vals = bundle["checkpoints"]
+    fig_conv = convergence_figure(x_vals, rm, ci)
     st.markdown('<div class="chart-card">', unsafe_allow_html=True)
     st.plotly_chart(fig_conv, use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
     st.caption(
         f"수렴 상태: 최종 평균 **{ci['mean']:,.4f}** | 총 **{total_runs:,}회** 반복 수행"
     )
+    precision = bundle.get("precision")
+    if precision is not None:
+        st.caption(
+            f"정지 사유: **{STOP_REASONS.get(bundle['stop_reason'], bundle['stop_reason'])}** | "
+            f"평균 표준오차 {precision['se']:,.4g} (상대 {precision['rel_se']:.2e}) | "
+            f"P5 ± {precision['p5_half']:,.4g} · P95 ± {precision['p95_half']:,.4g} "
+            f"(95% 신뢰구간 반폭, 상대 {precision['rel_band']:.2e})"
+        )
 
 # ────────────────────────────
 # 탭 3: 토네이도 차트
 # ────────────────────────────
-with tab3:
+with tab3, profiling.stage("chart.sensitivity"):
     if len(st.session_state.variables) < 2:
         st.info("민감도 분석에는 변수가 2개 이상 필요합니다.")
     else:
-        corr = sensitivity_analysis(df)
-        colors = ["#2563eb" if v >= 0 else "#dc2626" for v in corr.values]
-
-        fig_tornado = go.Figure(go.Bar(
-            x=corr.values,
-            y=corr.index.tolist(),
-            orientation="h",
-            marker_color=colors,
-            marker_line_width=0,
-            text=[f"{v:+.3f}" for v in corr.values],
-            textposition="outside",
-            textfont=dict(color="#1a1d23", size=12, family="Inter, sans-serif"),
-        ))
-        fig_tornado.add_vline(x=0, line_color="#9ca3af", line_width=1.5)
-        fig_tornado.update_layout(
-            title="변수별 영향도 — 토네이도 차트",
-            xaxis_title="결과값과의 상관계수 (Pearson r)",
-            yaxis_title="",
-            xaxis=dict(range=[-1.1, 1.1], gridcolor="#e5e7f0",
-                       linecolor="#c5cad8", tickfont=dict(color="#374151"),
-                       title_font=dict(color="#374151")),
-            yaxis=dict(categoryorder="array",
-                       categoryarray=corr.index[::-1].tolist(),
-                       gridcolor="#e5e7f0", linecolor="#c5cad8",
-                       tickfont=dict(color="#374151", size=13),
-                       title_font=dict(color="#374151")),
-            **{**CHART_LAYOUT,
-               "height": max(300, 80 * len(corr) + 120),
-               "margin": dict(t=55, l=130, r=90, b=55)},
+        sens_mode = st.radio(
+            "분석 방식", ["pearson", "sobol"], horizontal=True, label_visibility="collapsed",
+            format_func={"pearson": "상관계수 (Pearson)", "sobol": "Sobol 지수 (분산 기반)"}.get,
         )
+        if sens_mode == "pearson":
+            corr = cache.get_or_compute(run_key, "sensitivity", lambda: sensitivity_analysis(res))
+            colors = ["#2563eb" if v >= 0 else "#dc2626" for v in corr.values]
+            corr_low, corr_high = np.array(
+                [boot["correlations"][name] for name in corr.index]
+            ).T
+
+            fig_tornado = go.Figure(go.Bar(
+                x=corr.values,
+                y=corr.index.tolist(),
+                orientation="h",
+                marker_color=colors,
+                marker_line_width=0,
+                error_x=dict(
+                    type="data", symmetric=False, color="#6b7280", thickness=1.5,
+                    array=np.maximum(corr_high - corr.values, 0.0),
+                    arrayminus=np.maximum(corr.values - corr_low, 0.0),
+                ),
+                text=[f"{v:+.3f}" for v in corr.values],
+                textposition="outside",
+                textfont=dict(color="#1a1d23", size=12, family="Inter, sans-serif"),
+            ))
+            fig_tornado.add_vline(x=0, line_color="#9ca3af", line_width=1.5)
+            fig_tornado.update_layout(
+                title="변수별 영향도 — 토네이도 차트",
+                xaxis_title="결과값과의 상관계수 (Pearson r)",
+                yaxis_title="",
+                **{**CHART_LAYOUT,
+                   "xaxis": dict(range=[-1.1, 1.1], gridcolor="#e5e7f0",
+                                 linecolor="#c5cad8", tickfont=dict(color="#374151"),
+                                 title_font=dict(color="#374151")),
+                   "yaxis": dict(categoryorder="array",
+                                 categoryarray=corr.index[::-1].tolist(),
+                                 gridcolor="#e5e7f0", linecolor="#c5cad8",
+                                 tickfont=dict(color="#374151", size=13),
+                                 title_font=dict(color="#374151")),
+                   "height": max(300, 80 * len(corr) + 120),
+                   "margin": dict(t=55, l=130, r=90, b=55)},
+            )
+            guide = (
+                "상관계수 절댓값이 클수록 해당 변수가 결과에 더 큰 영향을 미칩니다.<br>"
+                "🔵 <strong>양수(+)</strong>: 값이 커지면 결과도 커짐 &nbsp;&nbsp;"
+                "🔴 <strong>음수(−)</strong>: 값이 커지면 결과가 작아짐<br>"
+                f"막대 끝의 선은 부트스트랩 {boot['level']:.0%} 구간입니다."
+            )
+        else:
+            settings = bundle["settings"]
+            with st.spinner("Sobol 지수 계산 중..."):
+                sobol = cache.get_or_compute(
+                    run_key, "sobol",
+                    lambda: sobol_indices(
+                        bundle["variables"], seed=bundle["seed"],
+                        method=settings["method"], formula=settings.get("formula"),
+                    ),
+                )
+            order = sobol.index[::-1].tolist()
+            fig_tornado = go.Figure()
+            for col, label, color in [("S1", "1차 지수 (S1)", "#2563eb"), ("ST", "총 효과 지수 (ST)", "#f59e0b")]:
+                fig_tornado.add_trace(go.Bar(
+                    x=sobol[col], y=sobol.index.tolist(), name=label, orientation="h",
+                    marker_color=color, marker_line_width=0,
+                    error_x=dict(
+                        type="data", symmetric=False,
+                        array=(sobol[f"{col}_high"] - sobol[col]).clip(lower=0),
+                        arrayminus=(sobol[col] - sobol[f"{col}_low"]).clip(lower=0),
+                        color="#6b7280",
+                    ),
+                    text=[f"{v:.3f}" for v in sobol[col]], textposition="outside",
+                    textfont=dict(color="#1a1d23", size=12, family="Inter, sans-serif"),
+                ))
+            fig_tornado.update_layout(
+                title="변수별 분산 기여도 — Sobol 지수 (90% bootstrap 구간)",
+                xaxis_title="결과 분산 중 차지하는 비율",
+                yaxis_title="",
+                barmode="group",
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
+                **{**CHART_LAYOUT,
+                   "xaxis": dict(range=[0, 1.15], gridcolor="#e5e7f0",
+                                 linecolor="#c5cad8", tickfont=dict(color="#374151"),
+                                 title_font=dict(color="#374151")),
+                   "yaxis": dict(categoryorder="array", categoryarray=order,
+                                 gridcolor="#e5e7f0", linecolor="#c5cad8",
+                                 tickfont=dict(color="#374151", size=13),
+                                 title_font=dict(color="#374151")),
+                   "height": max(300, 110 * len(sobol) + 140),
+                   "margin": dict(t=75, l=130, r=90, b=55)},
+            )
+            guide = (
+                "<strong>S1</strong>: 그 변수 하나만으로 설명되는 결과 분산의 비율 &nbsp;&nbsp;"
+                "<strong>ST</strong>: 다른 변수와의 상호작용까지 포함한 비율<br>"
+                "ST 가 S1 보다 크게 높으면 비선형·상호작용 효과가 큰 변수입니다. "
+                "(입력 간 상관은 무시하고 독립으로 가정해 계산합니다)"
+            )
         st.markdown('<div class="chart-card">', unsafe_allow_html=True)
         st.plotly_chart(fig_tornado, use_container_width=True)
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown(
-            """
+            f"""
             <div style="background:#eff6ff; border-left:4px solid #2563eb;
                         border-radius:8px; padding:14px 18px; margin-top:14px;">
                 <strong style="color:#1d4ed8;">📌 해석 가이드</strong><br>
                 <span style="color:#374151; font-size:.9rem;">
-                    상관계수 절댓값이 클수록 해당 변수가 결과에 더 큰 영향을 미칩니다.<br>
-                    🔵 <strong>양수(+)</strong>: 값이 커지면 결과도 커짐 &nbsp;&nbsp;
-                    🔴 <strong>음수(−)</strong>: 값이 커지면 결과가 작아짐
+                    {guide}
                 </span>
             </div>
             """,
             unsafe_allow_html=True,
         )
 
+# ────────────────────────────
+# 탭 4: 일괄 시나리오 / 파라미터 그리드
+# ────────────────────────────
+with tab4, profiling.stage("tab.sweep"):
+    st.caption(
+        "저장된 시나리오 여러 개나 현재 설정의 파라미터 그리드를 공통 난수로 한 번에 평가해 요약 표로 비교합니다."
+    )
+    sweep_saved = st.multiselect("저장된 시나리오", list_scenarios())
+    grid_var_col, grid_field_col, grid_values_col = st.columns([2, 1, 3])
+    grid_var = grid_var_col.selectbox(
+        "그리드 변수", ["— 없음 —"] + [v["name"] for v in bundle["variables"]]
+    )
+    grid_field = grid_field_col.selectbox("항목", ["max", "min", "weight"])
+    grid_values = grid_values_col.text_input("값 (쉼표 구분)", placeholder="80, 100, 120")
+    sweep_col1, sweep_col2 = st.columns(2)
+    sweep_n = sweep_col1.selectbox(
+        "시나리오당 반복 횟수", [5_000, 10_000, 50_000, 100_000], index=1,
+        format_func=lambda x: f"{x:,}회",
+    )
+    sweep_threshold = sweep_col2.number_input(
+        "기준값 (초과 확률 계산)", value=float(round(ci["mean"], 2))
+    )
+
+    if st.button("🧪 일괄 실행", use_container_width=True):
+        sweep = [load_scenario(name) for name in sweep_saved]
+        if grid_var != "— 없음 —" and grid_values.strip():
+            try:
+                values = [float(x) for x in grid_values.split(",") if x.strip()]
+            except ValueError:
+                st.error("그리드 값은 숫자를 쉼표로 구분해 입력해주세요.")
+                st.stop()
+            try:
+                sweep += parameter_grid(
+                    bundle["variables"], {f"{grid_var}.{grid_field}": values},
+                    bundle["settings"].get("formula"),
+                )
+            except ValueError as exc:
+                st.error(f"그리드 오류: {exc}")
+                st.stop()
+        if not sweep:
+            st.info("비교할 시나리오를 선택하거나 그리드 값을 입력해주세요.")
+        else:
+            sweep_key = config_key(
+                [sc["variables"] for sc in sweep],
+                {"names": [sc["name"] for sc in sweep], "n": sweep_n,
+                 "threshold": sweep_threshold, "seed": bundle["seed"],
+                 "formulas": [sc.get("settings", {}).get("formula") for sc in sweep]},
+            )
+            try:
+                with st.spinner(f"시나리오 {len(sweep)}개 평가 중..."):
+                    st.session_state.sweep = cache.get_or_compute(
+                        sweep_key, "sweep",
+                        lambda: sweep_scenarios(
+                            sweep, sweep_n, seed=bundle["seed"], threshold=sweep_threshold
+                        ),
+                    )
+            except ValueError as exc:
+                st.error(str(exc))
+
+    if st.session_state.get("sweep") is not None:
+        st.dataframe(
+            st.session_state.sweep.drop(columns="n"),
+            use_container_width=True,
+            column_config={
+                col: st.column_config.NumberColumn(format="%.4f" if col == "prob_above" else "%,.2f")
+                for col in st.session_state.sweep.columns
+            },
+        )
+
+with tab3:
     # ── 데이터 내보내기 ────────────────────────
     st.markdown("<div style='margin-top:24px;'></div>", unsafe_allow_html=True)
     st.divider()
     st.markdown("### 📥 데이터 내보내기")
-    csv = df.to_csv(index=False).encode("utf-8-sig")
-    st.download_button(
-        label="⬇️  CSV 다운로드",
-        data=csv,
-        file_name="monte_carlo_results.csv",
-        mime="text/csv",
-    )
+    formats = [f for f in EXPORT_FORMATS if f != "parquet" or parquet_available()]
+    exp_col1, exp_col2 = st.columns([2, 3])
+    with exp_col1:
+        fmt = st.radio(
+            "형식", formats, horizontal=True, label_visibility="collapsed",
+            format_func=lambda f: EXPORT_FORMATS[f][0],
+        )
+    label, mime, ext = EXPORT_FORMATS[fmt]
+    # 파일은 요청했을 때만 청크 단위로 만들고, 경로만 캐시합니다 (다시 누르면 재사용).
+    # 다운로드 버튼에는 읽기 함수만 넘기므로 파일 내용은 실제로 내려받을 때만 읽습니다 (재실행마다 읽지 않음).
+    export_path = cache.get(run_key, f"export:{fmt}")
+    if export_path is not None and not export_path.exists():
+        export_path = None
+    with exp_col2:
+        if export_path is None:
+            if st.button(f"📦  {label} 파일 준비", help=f"{len(res):,}행을 청크 단위로 직렬화합니다."):
+                with st.spinner("내보내기 파일을 만드는 중..."):
+                    export_path = export_result(res, fmt)
+                cache.put(run_key, f"export:{fmt}", export_path)
+        if export_path is not None:
+            st.download_button(
+                label=f"⬇️  {label} 다운로드",
+                data=export_path.read_bytes,
+                file_name=f"monte_carlo_results{ext}",
+                mime=mime,
+            )
+
+show_profile()
@@ -0,0 +1,227 @@
+"""
+bench_engine.py — 시뮬레이션 엔진 / 앱 파생 데이터 경로 벤치마크
+
+반복 횟수 × 변수 수 × 분포 조합을 훑으며 단계별 실행 시간과 최대 메모리(tracemalloc)를
+측정하고, 기준값(JSON)과 비교해 threshold 이상 느려지거나 메모리가 늘면 회귀로 표시합니다.
+브라우저 없이 앱이 쓰는 경로(통계, 히스토그램 binning, 내보내기)도 함께 측정합니다.
+
+    python benchmarks/bench_engine.py                   # 빠른 세트 (1e3 ~ 1e5), 기준값과 비교
+    python benchmarks/bench_engine.py --full            # 1e3 ~ 1e7, 변수 1 ~ 200
+    python benchmarks/bench_engine.py --save-baseline   # 현재 결과를 기준값으로 저장
+    python benchmarks/bench_engine.py --stage run_simulation --threshold 0.1
+
+종료 코드: 0 = 회귀 없음, 1 = 회귀 있음.
+"""
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from export import export_result  # noqa: E402
+from simulation import (  # noqa: E402
+    auto_convergence,
+    bootstrap_intervals,
+    calc_confidence_interval,
+    calc_running_mean,
+    result_histogram,
+    run_simulation,
+    sample_distribution,
+    sensitivity_analysis,
+    summarize_result,
+    tail_probability,
+)
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+QUICK = {"n": [1_000, 10_000, 100_000], "k": [1, 10, 50], "mix": ["균등", "mixed"]}
+FULL = {
+    "n": [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+    "k": [1, 10, 50, 200],
+    "mix": ["균등", "정규", "삼각", "mixed"],
+}
+# 한 케이스의 (변수 수 + 1) × 반복 횟수 상한. 넘는 조합은 건너뜁니다 (float64 기준 약 800 MB).
+MAX_ELEMENTS = 100_000_000
+
+_DISTS = ("균등", "정규", "삼각")
+
+
+# ─────────────────────────────────────────────
+# 1. 케이스 구성
+# ─────────────────────────────────────────────
+def make_variables(k: int, mix: str) -> list[dict]:
+    """mix 가 'mixed' 면 분포를 번갈아 쓰고, 아니면 모든 변수가 같은 분포입니다."""
+    return [
+        {
+            "name": f"v{j}",
+            "min": float(j),
+            "max": float(j) + 10.0,
+            "dist": _DISTS[j % 3] if mix == "mixed" else mix,
+            "weight": 1.0 + (j % 5),
+        }
+        for j in range(k)
+    ]
+
+
+def stage_runners(n: int, k: int, mix: str, workdir: Path) -> dict:
+    """
+    단계 이름 → (준비 함수, 측정 함수). 준비 결과(입력 데이터)는 측정에서 제외합니다.
+    앱 경로 단계(ci / running_mean / histogram / sensitivity / bootstrap / export)는 같은 결과를 입력으로 쓰고,
+    tail_probability 는 그 결과의 P0.1 을 기준값으로 씁니다.
+    """
+    variables = make_variables(k, mix)
+
+    def prepared_result():
+        return run_simulation(variables, n, seed=0)
+
+    def export(fmt):
+        return lambda res: export_result(res, fmt, workdir / f"bench.{fmt}")
+
+    return {
+        "sample_distribution": (
+            lambda: np.random.default_rng(0),
+            lambda rng: [sample_distribution(v["dist"], v["min"], v["max"], n, rng) for v in variables],
+        ),
+        "run_simulation": (lambda: None, lambda _: run_simulation(variables, n, seed=0)),
+        "run_simulation_lhs": (
+            lambda: None, lambda _: run_simulation(variables, n, seed=0, method="lhs")
+        ),
+        "auto_convergence": (
+            lambda: None,
+            lambda _: auto_convergence(variables, tol=0.0, max_iter=n, chunk=max(1_000, n // 50), seed=0),
+        ),
+        "calc_confidence_interval": (prepared_result, lambda res: calc_confidence_interval(res.results)),
+        "calc_running_mean": (prepared_result, lambda res: calc_running_mean(res.results)),
+        "result_histogram": (prepared_result, lambda res: result_histogram(res.results, 80)),
+        "summarize_result": (prepared_result, lambda res: summarize_result(res, variables)),
+        "sensitivity_analysis": (prepared_result, lambda res: sensitivity_analysis(res)),
+        "bootstrap_intervals": (prepared_result, lambda res: bootstrap_intervals(res, seed=0)),
+        "tail_probability": (
+            lambda: float(np.quantile(prepared_result().results, 0.001)),
+            lambda threshold: tail_probability(variables, threshold, n=n, seed=0),
+        ),
+        "export_csv": (prepared_result, export("csv")),
+        "export_npz": (prepared_result, export("npz")),
+    }
+
+
+# 단계별 (변수 수 + 1) × 반복 횟수 상한. 직렬화는 원소당 비용이 커서 작은 케이스만 잽니다.
+STAGE_MAX_ELEMENTS = {"export_csv": 1_000_000, "export_npz": 10_000_000, "auto_convergence": 50_000_000}
+# 변수 1개로는 의미 없는 단계
+STAGE_MIN_K = {"sensitivity_analysis": 2}
+
+
+# ─────────────────────────────────────────────
+# 2. 측정
+# ─────────────────────────────────────────────
+def measure(setup, fn, repeat: int) -> dict:
+    """
+    시간은 tracemalloc 없이 repeat 번 중 최솟값, 메모리는 별도 1회 실행의 최대 할당량.
+    첫 호출(지연 import, 캐시 채우기)은 측정하지 않습니다.
+    """
+    arg = setup()
+    fn(arg)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2**20}
+
+
+def run_suite(grid: dict, stages: list[str] | None, repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in grid["n"]:
+            for k in grid["k"]:
+                if (k + 1) * n > MAX_ELEMENTS:
+                    continue
+                for mix in grid["mix"] if k > 1 else grid["mix"][:1]:
+                    for stage, (setup, fn) in stage_runners(n, k, mix, Path(tmp)).items():
+                        if stages and stage not in stages:
+                            continue
+                        if (k + 1) * n > STAGE_MAX_ELEMENTS.get(stage, MAX_ELEMENTS):
+                            continue
+                        if k < STAGE_MIN_K.get(stage, 0):
+                            continue
+                        case = f"{stage}|n={n}|k={k}|mix={mix}"
+                        results[case] = measure(setup, fn, repeat)
+                        r = results[case]
+                        print(f"  {case:<55} {r['seconds'] * 1000:10.2f} ms {r['peak_mb']:10.1f} MB",
+                              flush=True)
+    return results
+
+
+# ─────────────────────────────────────────────
+# 3. 기준값 비교
+# ─────────────────────────────────────────────
+def compare(results: dict, baseline: dict, threshold: float, min_seconds: float) -> list[str]:
+    """threshold 비율 이상 느려지거나 메모리가 늘어난 케이스 목록 (아주 짧은 측정은 시간 비교 제외)."""
+    regressions = []
+    for case, cur in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        slow = cur["seconds"] / base["seconds"] - 1 if base["seconds"] > 0 else 0.0
+        grow = cur["peak_mb"] / base["peak_mb"] - 1 if base["peak_mb"] > 1 else 0.0
+        if max(cur["seconds"], base["seconds"]) >= min_seconds and slow > threshold:
+            regressions.append(f"{case}: 시간 {base['seconds'] * 1000:.1f} → {cur['seconds'] * 1000:.1f} ms (+{slow:.0%})")
+        if grow > threshold:
+            regressions.append(f"{case}: 메모리 {base['peak_mb']:.1f} → {cur['peak_mb']:.1f} MB (+{grow:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="시뮬레이션 엔진 벤치마크")
+    parser.add_argument("--full", action="store_true", help="1e7 반복 / 200 변수까지 전체 세트")
+    parser.add_argument("--stage", action="append", help="측정할 단계 (여러 번 지정 가능)")
+    parser.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="회귀 판정 비율 (기본 0.25 = 25%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.02,
+                        help="이보다 짧은 측정은 시간 회귀 판정에서 제외 (잡음)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="기준값 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준값으로 저장")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<57} {'time':>13} {'peak':>13}")
+    results = run_suite(FULL if args.full else QUICK, args.stage, args.repeat)
+
+    if args.save_baseline:
+        baseline = {}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"기준값 저장: {args.baseline} ({len(results)}개 케이스)")
+        return 0
+    if not args.baseline.exists():
+        print("기준값이 없습니다. --save-baseline 으로 먼저 저장하세요.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline, args.threshold, args.min_seconds)
+    if regressions:
+        print(f"\n회귀 {len(regressions)}건 (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  ✗ {line}")
+        return 1
+    print(f"\n회귀 없음 (threshold {args.threshold:.0%}, 비교 {sum(c in baseline for c in results)}개 케이스)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
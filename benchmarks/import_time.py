@@ -0,0 +1,82 @@
+"""
+import_time.py — 모듈 import 시간 측정 / 예산 검사
+
+새 인터프리터에서 모듈마다 import 시간을 여러 번 재고 중앙값을 예산과 비교합니다.
+무거운 의존성(pandas, SciPy, Plotly, Streamlit)을 가져오면 시간과 무관하게 실패로 봅니다.
+
+    python benchmarks/import_time.py              # 예산 검사 (위반 시 종료 코드 1)
+    python benchmarks/import_time.py --scale 2    # 느린 머신: 예산을 2배로 완화
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 모듈 → (예산 초, import 되면 안 되는 모듈). 예산은 numpy import 시간을 포함합니다.
+BUDGETS = {
+    "simulation": (0.20, ("pandas", "scipy", "plotly", "streamlit")),
+    "streaming": (0.20, ("pandas", "scipy", "plotly", "streamlit")),
+    "formula": (0.20, ("pandas", "scipy", "plotly", "streamlit")),
+    "export": (0.20, ("pandas", "pyarrow", "plotly", "streamlit")),
+    "cache": (0.20, ("pandas", "plotly", "streamlit")),
+    "profiling": (0.05, ("numpy", "pandas", "plotly", "streamlit")),
+    "jobs": (0.05, ("numpy", "pandas", "plotly", "streamlit")),
+    "cli": (0.05, ("numpy", "pandas", "plotly", "streamlit")),
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, forbidden: tuple, repeat: int) -> dict:
+    """새 프로세스에서 repeat 번 import 해 중앙값과 금지 모듈 로드 여부를 반환합니다."""
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    env["PYTHONPATH"] = str(ROOT)
+    code = _PROBE.format(module=module, forbidden=forbidden)
+    samples, loaded = [], set()
+    for i in range(repeat + 1):  # 첫 번째는 .pyc 생성 / 디스크 캐시 준비용으로 버립니다.
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True,
+        )
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        loaded.update(probe["loaded"])
+        if i:
+            samples.append(probe["elapsed"])
+    return {"median": statistics.median(samples), "loaded": sorted(loaded)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="모듈 import 시간 예산 검사")
+    parser.add_argument("--repeat", type=int, default=5, help="모듈당 측정 횟수 (기본 5)")
+    parser.add_argument("--scale", type=float, default=1.0, help="예산 배수 (느린 머신용)")
+    parser.add_argument("modules", nargs="*", help="측정할 모듈 (기본: 전체)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules or BUDGETS:
+        budget, forbidden = BUDGETS[module]
+        budget *= args.scale
+        result = measure(module, forbidden, args.repeat)
+        ok = result["median"] <= budget and not result["loaded"]
+        failed |= not ok
+        extra = f"  ✗ 금지 모듈 로드: {', '.join(result['loaded'])}" if result["loaded"] else ""
+        print(
+            f"{'✓' if ok else '✗'} {module:<12} {result['median'] * 1000:7.1f} ms"
+            f"  (예산 {budget * 1000:.0f} ms){extra}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
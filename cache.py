@@ -0,0 +1,147 @@
+"""
+cache.py — 시뮬레이션 결과 / 파생 데이터 캐시 (내용 해시 키, LRU 제거)
+"""
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+def config_key(variables: list[dict], settings: dict) -> str:
+    """변수 목록과 실행 설정(반복 횟수, 방식, 시드 등)의 내용 해시."""
+    payload = json.dumps(
+        {"variables": variables, "settings": settings},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def sizeof(obj) -> int:
+    """캐시 항목의 대략적인 메모리 크기 (bytes)."""
+    import numpy as np  # config_key 만 쓰는 scenarios / cli 가 numpy 를 불러오지 않도록 여기서 가져옵니다.
+
+    if isinstance(obj, np.memmap) or getattr(obj, "on_disk", False):
+        return sys.getsizeof(obj)  # 디스크 memmap 은 메모리 한도에 넣지 않습니다.
+    if isinstance(obj, np.ndarray) or hasattr(obj, "nbytes"):  # ndarray, SimulationResult
+        return int(obj.nbytes)
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if hasattr(obj, "memory_usage"):  # pandas DataFrame / Series
+        usage = obj.memory_usage(index=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sizeof(k) + sizeof(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(sizeof(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def disk_sizeof(obj) -> int:
+    """캐시 항목이 디스크에 차지하는 크기 (bytes): 디스크 결과의 memmap, 내보내기 파일 경로."""
+    import numpy as np
+
+    if isinstance(obj, np.memmap):
+        return int(obj.nbytes)
+    if getattr(obj, "on_disk", False):  # 디스크 SimulationResult
+        return int(obj.nbytes)
+    if isinstance(obj, Path):
+        try:
+            return obj.stat().st_size
+        except OSError:
+            return 0
+    if isinstance(obj, dict):
+        return sum(disk_sizeof(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(disk_sizeof(v) for v in obj)
+    return 0
+
+
+class ResultCache:
+    """
+    (실행 키, 산출물 이름) 단위의 스레드 안전 LRU 캐시.
+
+    시뮬레이션 결과뿐 아니라 통계, 히스토그램 구간, 상관계수, 내보내기 바이트 같은
+    파생 산출물도 같은 키 아래에 따로 저장합니다. 전체 크기가 max_bytes 를 넘으면
+    가장 오래 사용하지 않은 항목부터 제거하며, 혼자서 한도를 넘는 항목은 저장하지 않습니다.
+    디스크 결과와 내보내기 파일은 메모리 대신 max_disk_bytes 한도로 따로 셉니다.
+    저장하지 않은 항목은 호출한 쪽이 계속 쓰므로 on_evict 를 부르지 않습니다.
+    on_evict(key, name, value) 는 항목이 밀려나거나 교체 / 비워질 때 (잠금 밖에서) 불리며,
+    앱은 여기서 항목이 가리키는 디스크 파일을 지웁니다.
+    Streamlit 에서는 st.cache_resource 로 하나만 만들어 모든 세션이 공유합니다.
+    """
+
+    def __init__(
+        self, max_bytes: int = 512 * 2**20, max_disk_bytes: int = 4 * 2**30, on_evict=None,
+    ):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.on_evict = on_evict
+        self.total_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, item: tuple) -> bool:
+        with self._lock:
+            return item in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, name: str, default=None):
+        with self._lock:
+            entry = self._entries.get((key, name))
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end((key, name))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, name: str, value) -> None:
+        size, disk = sizeof(value), disk_sizeof(value)
+        released = []
+        with self._lock:
+            old = self._entries.pop((key, name), None)
+            if old is not None:
+                self.total_bytes -= old[1]
+                self.disk_bytes -= old[2]
+                if old[0] is not value:
+                    released.append(((key, name), old[0]))
+            if size <= self.max_bytes and disk <= self.max_disk_bytes:
+                self._entries[(key, name)] = (value, size, disk)
+                self.total_bytes += size
+                self.disk_bytes += disk
+                while self.total_bytes > self.max_bytes or self.disk_bytes > self.max_disk_bytes:
+                    item, (evicted, evicted_size, evicted_disk) = self._entries.popitem(last=False)
+                    self.total_bytes -= evicted_size
+                    self.disk_bytes -= evicted_disk
+                    released.append((item, evicted))
+        self._release(released)
+
+    def get_or_compute(self, key: str, name: str, compute):
+        """캐시에 있으면 그대로, 없으면 compute() 결과를 저장하고 반환합니다."""
+        sentinel = object()
+        value = self.get(key, name, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, name, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            released = [(item, entry[0]) for item, entry in self._entries.items()]
+            self._entries.clear()
+            self.total_bytes = 0
+            self.disk_bytes = 0
+        self._release(released)
+
+    def _release(self, released: list) -> None:
+        if self.on_evict is None:
+            return
+        for (key, name), value in released:
+            self.on_evict(key, name, value)
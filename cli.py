@@ -0,0 +1,241 @@
+"""
+cli.py — 헤드리스 배치 실행기 (시나리오 JSON → 요약 통계 / 원본 결과 파일)
+
+사용 예)
+    python cli.py                              # 시나리오 저장소의 모든 시나리오
+    python cli.py --tag 2026                   # 태그가 붙은 저장된 시나리오만
+    python cli.py 낙관.json 비관.json -j 4      # 지정한 JSON 파일(또는 저장된 이름)을 프로세스 4개로
+    python cli.py --raw npz --out results/     # 원본 결과도 저장
+
+종료 코드: 0 = 모두 성공, 1 = 수렴하지 못한 실행이 있음, 2 = 실행 오류가 있음.
+Streamlit / Plotly 를 가져오지 않으므로 cron 같은 환경에서도 빠르게 시작합니다.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from scenarios import DB_PATH, list_scenarios, load_scenario, make_summary, save_summary
+
+EXIT_OK = 0
+EXIT_NOT_CONVERGED = 1
+EXIT_ERROR = 2
+
+SUMMARY_FIELDS = [
+    "scenario", "status", "converged", "stop_reason", "n", "mean", "se", "std",
+    "p5", "median", "p95", "elapsed", "raw_path", "error",
+]
+
+
+# ─────────────────────────────────────────────
+# 1. 시나리오 수집
+# ─────────────────────────────────────────────
+def collect_scenarios(paths: list[str], tag: str | None = None) -> list[Path | str]:
+    """
+    인자 목록을 실행할 시나리오 목록으로 펼칩니다. JSON 파일 / 폴더는 Path, 저장소의
+    시나리오 이름은 str 입니다. 인자가 없으면 저장소의 모든 시나리오 (tag 를 주면 그 태그만).
+    """
+    if not paths:
+        return list_scenarios(tag=tag)
+    stored = None
+    sources: list = []
+    for arg in paths:
+        p = Path(arg)
+        if p.is_dir():
+            sources.extend(sorted(p.glob("*.json")))
+        elif p.exists():
+            sources.append(p)
+        else:
+            if stored is None:
+                stored = set(list_scenarios())
+            if arg not in stored:
+                raise FileNotFoundError(f"시나리오 파일 또는 저장된 시나리오를 찾을 수 없습니다: {arg}")
+            sources.append(arg)
+    return sources
+
+
+def _load(source: Path | str) -> dict:
+    if isinstance(source, str):
+        return load_scenario(source)
+    with open(source, "r", encoding="utf-8") as f:
+        scenario = json.load(f)
+    scenario.setdefault("name", source.stem)
+    scenario.setdefault("settings", {})
+    return scenario
+
+
+# ─────────────────────────────────────────────
+# 2. 시나리오 하나 실행 (워커 프로세스)
+# ─────────────────────────────────────────────
+def run_scenario(source: Path | str, options: dict) -> dict:
+    """
+    시나리오 하나를 저장된 설정대로 실행하고 요약 dict 를 반환합니다.
+    options 의 값(n_iter / seed / tol / rel_se / band_tol / max_iter / raw / out)은 시나리오 설정보다 우선합니다.
+    저장소의 시나리오를 설정 그대로(덮어쓰는 옵션 없이) 실행하면 요약을 저장소에도 남겨
+    앱에서 다시 시뮬레이션하지 않고 볼 수 있게 합니다.
+    예외는 status='error' 로 담아 돌려주므로 다른 시나리오 실행에 영향을 주지 않습니다.
+    """
+    # 엔진은 워커 안에서만 가져옵니다 (부모 프로세스는 인자 해석만 하고 바로 시작).
+    from export import EXPORT_FORMATS, export_result
+    from simulation import (
+        calc_confidence_interval, estimate_mean, result_histogram, run_simulation, stream_convergence,
+    )
+
+    started = time.perf_counter()
+    name = source if isinstance(source, str) else source.stem
+    row = {"scenario": name, "status": "ok", "converged": True}
+    try:
+        scenario = _load(source)
+        row["scenario"] = scenario["name"]
+        settings = scenario["settings"]
+        variables = scenario["variables"]
+        seed = options["seed"] if options["seed"] is not None else settings.get("seed")
+        method = settings.get("method", "random")
+        antithetic = settings.get("antithetic", False)
+        control_variates = settings.get("control_variates", False)
+        formula = settings.get("formula")
+        use_auto = settings.get("use_auto", False) and options["n_iter"] is None
+
+        if use_auto:
+            # 목표 정밀도(rel_se / band_tol)가 있으면 그 기준, 없으면(이전 시나리오) 평균 변화 tol 기준.
+            # --tol 만 지정하면 시나리오의 목표 정밀도 대신 tol 기준으로 실행합니다.
+            rel_se, band_tol = options["rel_se"], options["band_tol"]
+            if rel_se is None and band_tol is None and options["tol"] is None:
+                rel_se, band_tol = settings.get("rel_se"), settings.get("band_tol")
+            run = stream_convergence(
+                variables,
+                tol=options["tol"] if options["tol"] is not None else settings.get("tol", 1e-3),
+                max_iter=options["max_iter"] or settings.get("max_iter", 100_000),
+                seed=seed, method=method, antithetic=antithetic,
+                control_variates=control_variates, formula=formula,
+                rel_se=rel_se, band_tol=band_tol,
+            )
+            res = run.to_result()
+            estimator = run.estimate() if antithetic or control_variates else None
+            row["converged"] = run.converged
+            row["stop_reason"] = run.stop_reason
+        else:
+            n_iter = options["n_iter"] or settings.get("n_iter", 10_000)
+            res = run_simulation(
+                variables, n_iter, seed=seed, method=method, antithetic=antithetic,
+                formula=formula,
+            )
+            estimator = None
+            if antithetic or control_variates:
+                estimator = estimate_mean(res.data, variables, antithetic, control_variates)
+
+        ci = calc_confidence_interval(res.results, estimator)
+        row.update({key: ci.get(key) for key in ("mean", "se", "std", "p5", "median", "p95")})
+        row["n"] = len(res)
+        if row["se"] is None:
+            row["se"] = ci["std"] / len(res) ** 0.5
+        overrides = ("n_iter", "seed", "tol", "rel_se", "band_tol", "max_iter")
+        if isinstance(source, str) and all(options[key] is None for key in overrides):
+            hist = result_histogram(res.results, 80)
+            save_summary(scenario["content_hash"], make_summary(ci, hist, len(res)))
+        if options["raw"]:
+            ext = EXPORT_FORMATS[options["raw"]][2]
+            # 저장소의 시나리오 이름에는 경로 구분자 등이 들어 있을 수 있습니다.
+            filename = re.sub(r'[\\/:*?"<>|]', "_", row["scenario"])
+            raw_path = Path(options["out"]) / f"{filename}{ext}"
+            row["raw_path"] = str(export_result(res, options["raw"], raw_path))
+        if not row["converged"]:
+            row["status"] = "not_converged"
+    except Exception as exc:  # noqa: BLE001 — 실패도 요약 행으로 보고합니다.
+        row.update({"status": "error", "converged": False, "error": f"{type(exc).__name__}: {exc}"})
+    row["elapsed"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+# ─────────────────────────────────────────────
+# 3. 요약 저장 / 진입점
+# ─────────────────────────────────────────────
+def write_summary(rows: list[dict], out_dir: Path) -> None:
+    """summary.json 과 summary.csv 를 out_dir 에 씁니다."""
+    with open(out_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+    with open(out_dir / "summary.csv", "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Monte Carlo 시나리오 배치 실행기 (Streamlit 없이 실행)"
+    )
+    parser.add_argument(
+        "paths", nargs="*",
+        help=f"시나리오 JSON 파일 / 폴더 / 저장된 시나리오 이름 (기본: 저장소 {DB_PATH} 전체)",
+    )
+    parser.add_argument("--tag", help="인자가 없을 때 이 태그가 붙은 저장된 시나리오만 실행")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="동시에 실행할 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("-o", "--out", default="mc_results", help="결과 폴더 (기본: mc_results)")
+    parser.add_argument("--raw", choices=["csv", "npz", "parquet"],
+                        help="원본 결과(변수 + result)도 이 형식으로 저장")
+    parser.add_argument("-n", "--n-iter", type=int,
+                        help="고정 반복 횟수 (지정 시 자동 수렴 설정을 무시)")
+    parser.add_argument("--seed", type=int, help="모든 시나리오에 쓸 난수 시드")
+    parser.add_argument("--tol", type=float,
+                        help="자동 수렴 허용 오차 (목표 정밀도가 없을 때의 평균 변화 기준)")
+    parser.add_argument("--rel-se", type=float, help="자동 수렴 목표: 평균의 상대 표준오차")
+    parser.add_argument("--band-tol", type=float,
+                        help="자동 수렴 목표: P5/P95 신뢰구간 반폭 ÷ (P95 - P5)")
+    parser.add_argument("--max-iter", type=int, help="자동 수렴 최대 반복 횟수")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        sources = collect_scenarios(args.paths, args.tag)
+    except FileNotFoundError as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_ERROR
+    if not sources:
+        print("실행할 시나리오가 없습니다.", file=sys.stderr)
+        return EXIT_ERROR
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    options = {
+        "n_iter": args.n_iter, "seed": args.seed, "tol": args.tol,
+        "rel_se": args.rel_se, "band_tol": args.band_tol,
+        "max_iter": args.max_iter, "raw": args.raw, "out": str(out_dir),
+    }
+    jobs = max(1, min(args.jobs, len(sources)))
+    if jobs == 1:
+        rows = [run_scenario(source, options) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rows = list(pool.map(run_scenario, sources, [options] * len(sources)))
+
+    for row in rows:
+        if row["status"] == "error":
+            print(f"✗ {row['scenario']}: {row['error']}", file=sys.stderr)
+        else:
+            mark = "✓" if row["converged"] else "…"
+            print(
+                f"{mark} {row['scenario']}: n={row['n']:,} mean={row['mean']:,.4f} "
+                f"P5={row['p5']:,.4f} P95={row['p95']:,.4f} ({row['elapsed']:.2f}s)"
+            )
+    write_summary(rows, out_dir)
+    print(f"요약: {out_dir / 'summary.csv'}")
+
+    if any(row["status"] == "error" for row in rows):
+        return EXIT_ERROR
+    if any(row["status"] == "not_converged" for row in rows):
+        return EXIT_NOT_CONVERGED
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+export.py — 시뮬레이션 결과 내보내기 (청크 단위 CSV / NPZ / Parquet)
+"""
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from profiling import profiled
+from result_store import EXPORT_PREFIX, RUNS_DIR
+
+# CSV / Parquet 로 한 번에 변환하는 반복(행) 수. 메모리 사용량은 이 크기에만 비례합니다.
+EXPORT_ROWS = 1 << 16
+
+# 형식 키 → (표시 이름, MIME, 확장자)
+EXPORT_FORMATS = {
+    "csv": ("CSV", "text/csv", ".csv"),
+    "npz": ("NumPy (.npz)", "application/zip", ".npz"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", ".parquet"),
+}
+
+
+# ─────────────────────────────────────────────
+# 1. 형식별 쓰기 함수
+# ─────────────────────────────────────────────
+def write_csv(result, path, rows: int = EXPORT_ROWS) -> None:
+    """
+    헤더 한 줄을 쓴 뒤 청크마다 작은 DataFrame 으로 바꿔 이어 씁니다.
+    엑셀에서 한글이 깨지지 않도록 UTF-8 BOM 을 붙입니다.
+    """
+    import pandas as pd
+
+    columns = result.columns
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        pd.DataFrame(columns=columns).to_csv(f, index=False)
+        for block in result.iter_chunks(rows):
+            pd.DataFrame(block.T, columns=columns, copy=False).to_csv(
+                f, index=False, header=False
+            )
+
+
+def write_npz(result, path, rows: int = EXPORT_ROWS) -> None:
+    """
+    컬럼마다 하나의 .npy 로 압축 저장합니다 (np.load 로 이름별 접근).
+    .npy 헤더를 먼저 쓰고 본문은 청크 단위로 흘려 쓰므로 디스크 결과도 통째로 읽지 않습니다.
+    """
+    fmt = np.lib.format
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        for name, row in zip(result.columns, result.data):
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+                fmt.write_array_header_2_0(f, fmt.header_data_from_array_1_0(row))
+                for start in range(0, len(row), rows):
+                    f.write(np.ascontiguousarray(row[start : start + rows]).tobytes())
+
+
+def write_parquet(result, path, rows: int = EXPORT_ROWS) -> None:
+    """청크마다 row group 하나씩 Parquet 파일에 이어 씁니다 (pyarrow 필요)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pyarrow 는 Parquet 내보내기에서만 필요합니다.
+        raise ImportError("Parquet 내보내기에는 pyarrow 가 필요합니다: pip install pyarrow") from exc
+
+    columns = result.columns
+    schema = pa.schema([(name, pa.from_numpy_dtype(result.data.dtype)) for name in columns])
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for block in result.iter_chunks(rows):
+            writer.write_table(
+                pa.Table.from_arrays([pa.array(col) for col in block], schema=schema)
+            )
+
+
+_WRITERS = {"csv": write_csv, "npz": write_npz, "parquet": write_parquet}
+
+
+# ─────────────────────────────────────────────
+# 2. 내보내기 파일 생성
+# ─────────────────────────────────────────────
+def parquet_available() -> bool:
+    """pyarrow 설치 여부 (Parquet 선택지를 보일지 결정)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@profiled("export")
+def export_result(result, fmt: str = "csv", path=None) -> Path:
+    """
+    SimulationResult 를 fmt 형식 파일로 내보내고 경로를 반환합니다.
+
+    path 를 생략하면 RUNS_DIR 아래 임시 파일을 만듭니다. 다운로드 버튼에는 바이트 대신
+    이 파일을 열어 넘기므로, 직렬화 중 메모리는 청크 하나 크기로 유계입니다.
+    임시 파일은 호출한 쪽이 지웁니다 (앱은 캐시에서 밀려날 때, 남은 파일은 result_store.cleanup_runs).
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"지원하지 않는 내보내기 형식입니다: {fmt}")
+    if path is None:
+        RUNS_DIR.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(
+            suffix=EXPORT_FORMATS[fmt][2], prefix=EXPORT_PREFIX, dir=RUNS_DIR
+        )
+        os.close(fd)
+    path = Path(path)
+    try:
+        _WRITERS[fmt](result, path)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
@@ -0,0 +1,272 @@
+"""
+formula.py — 결과 수식 엔진 (안전한 파싱 → NumPy 벡터 평가 계획)
+"""
+from __future__ import annotations
+
+import ast
+import re
+from functools import lru_cache
+
+import numpy as np
+
+# 공백 등이 들어간 변수명은 `변수 A` 처럼 백틱으로 감쌉니다.
+_BACKTICK = re.compile(r"`([^`]+)`")
+
+_BINARY = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.Pow: np.power,
+}
+_UNARY = {ast.USub: np.negative, ast.UAdd: np.positive}
+_COMPARE = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+}
+# 함수명 → (NumPy 함수, 인자 수). None 은 2개 이상 가변 인자.
+_FUNCTIONS = {
+    "abs": (np.abs, 1),
+    "sqrt": (np.sqrt, 1),
+    "exp": (np.exp, 1),
+    "log": (np.log, 1),
+    "min": (np.minimum, None),
+    "max": (np.maximum, None),
+    "where": (np.where, 3),
+}
+
+FUNCTION_NAMES = tuple(_FUNCTIONS)
+
+
+# ─────────────────────────────────────────────
+# 1. 파싱 / 검증 → 후위(postfix) 명령열
+# ─────────────────────────────────────────────
+def _compile_node(node: ast.AST, index: dict, code: list) -> None:
+    """화이트리스트에 있는 노드만 후위 명령열로 바꿉니다. 그 밖의 구문은 ValueError."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float, complex):
+        # 아주 큰 정수는 OverflowError, 복소수는 TypeError 가 나므로 둘 다 ValueError 로 바꿉니다.
+        try:
+            value = float(node.value)
+        except (OverflowError, TypeError) as exc:
+            raise ValueError(f"수식에 쓸 수 없는 숫자입니다: {node.value!r:.40}") from exc
+        if not np.isfinite(value):
+            raise ValueError(f"수식에 쓸 수 없는 숫자입니다: {node.value!r:.40}")
+        code.append(("const", value))
+    elif isinstance(node, ast.Name):
+        if node.id not in index:
+            raise ValueError(f"알 수 없는 변수: {node.id}")
+        code.append(("load", index[node.id]))
+    elif isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        _compile_node(node.left, index, code)
+        _compile_node(node.right, index, code)
+        code.append(("binary", type(node.op)))
+    elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        _compile_node(node.operand, index, code)
+        code.append(("unary", type(node.op)))
+    elif (
+        isinstance(node, ast.Compare)
+        and len(node.ops) == 1
+        and type(node.ops[0]) in _COMPARE
+    ):
+        _compile_node(node.left, index, code)
+        _compile_node(node.comparators[0], index, code)
+        code.append(("compare", type(node.ops[0])))
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id
+        if name not in _FUNCTIONS:
+            raise ValueError(f"지원하지 않는 함수: {name} (사용 가능: {', '.join(FUNCTION_NAMES)})")
+        arity = _FUNCTIONS[name][1]
+        n_args = len(node.args)
+        if (arity is None and n_args < 2) or (arity is not None and n_args != arity):
+            raise ValueError(f"{name}() 의 인자 수가 올바르지 않습니다.")
+        for arg in node.args:
+            _compile_node(arg, index, code)
+        code.append(("call", name, n_args))
+    else:
+        raise ValueError(f"수식에 사용할 수 없는 구문입니다: {ast.dump(node)[:40]}")
+
+
+def _interval_binary(op, a: tuple, b: tuple) -> tuple:
+    (alo, ahi), (blo, bhi) = a, b
+    if op is ast.Add:
+        return alo + blo, ahi + bhi
+    if op is ast.Sub:
+        return alo - bhi, ahi - blo
+    if op is ast.Div:
+        if blo <= 0 <= bhi:
+            return -np.inf, np.inf
+        return _interval_binary(ast.Mult, a, (1 / bhi, 1 / blo))
+    if op is ast.Mult:
+        with np.errstate(invalid="ignore"):
+            products = np.array([alo * blo, alo * bhi, ahi * blo, ahi * bhi])
+        products = np.where(np.isnan(products), 0.0, products)  # 0 × inf
+        return float(products.min()), float(products.max())
+    # 거듭제곱: 상수 정수 지수는 단조 구간을 따지고, 그 밖에는 밑이 양수일 때만 끝점으로 계산합니다.
+    alo, ahi = np.float64(alo), np.float64(ahi)
+    with np.errstate(over="ignore", divide="ignore"):
+        if blo == bhi and float(blo).is_integer():
+            p = int(blo)
+            if p < 0 and alo <= 0 <= ahi:
+                return -np.inf, np.inf
+            ends = sorted([alo ** p, ahi ** p])
+            if p % 2 == 0 and p > 0 and alo < 0 < ahi:
+                return 0.0, float(ends[1])
+            return float(ends[0]), float(ends[1])
+        if alo > 0:
+            ends = [alo ** blo, alo ** bhi, ahi ** blo, ahi ** bhi]
+            return float(min(ends)), float(max(ends))
+    return -np.inf, np.inf
+
+
+def _interval_call(name: str, args: list) -> tuple:
+    if name == "abs":
+        lo, hi = args[0]
+        if lo >= 0:
+            return lo, hi
+        if hi <= 0:
+            return -hi, -lo
+        return 0.0, max(-lo, hi)
+    if name == "sqrt":
+        lo, hi = args[0]
+        return np.sqrt(max(lo, 0.0)), np.sqrt(max(hi, 0.0))
+    if name == "exp":
+        lo, hi = args[0]
+        return np.exp(lo), np.exp(hi)
+    if name == "log":
+        lo, hi = args[0]
+        return (np.log(lo) if lo > 0 else -np.inf), (np.log(hi) if hi > 0 else -np.inf)
+    if name == "min":
+        return min(a[0] for a in args), min(a[1] for a in args)
+    if name == "max":
+        return max(a[0] for a in args), max(a[1] for a in args)
+    # where(cond, a, b): 두 분기 구간의 합집합
+    return min(args[1][0], args[2][0]), max(args[1][1], args[2][1])
+
+
+class FormulaPlan:
+    """
+    컴파일된 결과 수식. 후위 명령열을 (변수 수, n) 배열의 행 단위로 한 번에 평가하므로
+    행마다 Python 코드가 실행되지 않습니다. compile_formula 로 만들며 수식별로 캐시됩니다.
+
+    expression: 원래 수식 문자열
+    names     : 변수명 튜플 (행 순서)
+    used      : 수식이 실제로 참조하는 변수 인덱스
+    """
+
+    __slots__ = ("expression", "names", "code", "used")
+
+    def __init__(self, expression: str, names: tuple, code: list):
+        self.expression = expression
+        self.names = names
+        self.code = code
+        self.used = sorted({instr[1] for instr in code if instr[0] == "load"})
+
+    def evaluate(self, values: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        values (변수 수, n) 에 수식을 적용합니다. out 을 주면 그 자리에 씁니다.
+        정의역 밖의 행(음수의 log, 0 으로 나누기, 넘침)은 경고 없이 NaN / ±inf 가 되며,
+        시뮬레이션은 이런 행을 결과 통계에서 빼고 그 개수를 nonfinite 로 보고합니다.
+        """
+        stack: list = []
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for instr in self.code:
+                op = instr[0]
+                if op == "load":
+                    stack.append(values[instr[1]])
+                elif op == "const":
+                    stack.append(instr[1])
+                elif op == "unary":
+                    stack.append(_UNARY[instr[1]](stack.pop()))
+                elif op in ("binary", "compare"):
+                    b, a = stack.pop(), stack.pop()
+                    ufunc = _BINARY[instr[1]] if op == "binary" else _COMPARE[instr[1]]
+                    stack.append(ufunc(a, b))
+                else:
+                    name, n_args = instr[1], instr[2]
+                    args = stack[-n_args:]
+                    del stack[-n_args:]
+                    fn = _FUNCTIONS[name][0]
+                    if name in ("min", "max"):
+                        acc = args[0]
+                        for arg in args[1:]:
+                            acc = fn(acc, arg)
+                        stack.append(acc)
+                    else:
+                        stack.append(fn(*args))
+        result = stack.pop()
+        if out is None:
+            return np.broadcast_to(np.asarray(result, dtype=float), values.shape[1:]).copy()
+        out[...] = result
+        return out
+
+    def bounds(self, lo: np.ndarray, hi: np.ndarray) -> tuple[float, float]:
+        """
+        변수별 범위 [lo, hi] 에서 결과가 가질 수 있는 범위 (구간 연산, 보수적).
+        0 을 포함하는 구간으로 나누는 경우처럼 유계가 아니면 ±inf 를 돌려줍니다.
+        """
+        stack: list = []
+        for instr in self.code:
+            op = instr[0]
+            if op == "load":
+                stack.append((float(lo[instr[1]]), float(hi[instr[1]])))
+            elif op == "const":
+                stack.append((instr[1], instr[1]))
+            elif op == "unary":
+                a_lo, a_hi = stack.pop()
+                stack.append((-a_hi, -a_lo) if instr[1] is ast.USub else (a_lo, a_hi))
+            elif op == "binary":
+                b, a = stack.pop(), stack.pop()
+                stack.append(_interval_binary(instr[1], a, b))
+            elif op == "compare":
+                del stack[-2:]
+                stack.append((0.0, 1.0))
+            else:
+                args = stack[-instr[2]:]
+                del stack[-instr[2]:]
+                stack.append(_interval_call(instr[1], args))
+        result_lo, result_hi = stack.pop()
+        return float(result_lo), float(result_hi)
+
+    def __reduce__(self):
+        # 워커 프로세스에서는 캐시된 컴파일 결과를 다시 사용합니다.
+        return compile_formula, (self.expression, self.names)
+
+
+@lru_cache(maxsize=128)
+def compile_formula(expression: str, names: tuple) -> FormulaPlan:
+    """
+    수식을 한 번 파싱·검증해 FormulaPlan 으로 만듭니다 ((수식, 변수명) 별로 캐시).
+
+    사용 가능: 숫자, 변수명, + - * / **, 비교(< <= > >=), abs / sqrt / exp / log / min / max / where.
+    예) `단가` * `수량` - `고정비`,  max(`매출` - `비용`, 0)
+    """
+    index = {}
+    for j, name in enumerate(names):
+        index[name] = j
+    aliases = {}
+
+    def alias(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in index:
+            raise ValueError(f"알 수 없는 변수: {name}")
+        key = aliases.setdefault(name, f"__v{len(aliases)}")
+        index[key] = index[name]
+        return key
+
+    source = _BACKTICK.sub(alias, expression.strip())
+    if not source:
+        raise ValueError("수식이 비어 있습니다.")
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"수식 문법 오류: {exc.msg}") from exc
+    except (MemoryError, RecursionError) as exc:  # 지나치게 깊게 중첩된 식
+        raise ValueError("수식이 너무 깊게 중첩되어 있습니다.") from exc
+    code: list = []
+    try:
+        _compile_node(tree.body, index, code)
+    except RecursionError as exc:
+        raise ValueError("수식이 너무 깊게 중첩되어 있습니다.") from exc
+    return FormulaPlan(expression, tuple(names), code)
@@ -0,0 +1,84 @@
+"""
+jobs.py — 백그라운드 시뮬레이션 작업 (진행 스냅샷 / 취소)
+"""
+import threading
+import time
+
+import profiling
+
+
+class SimulationJob:
+    """
+    target(progress, cancel) 를 데몬 스레드에서 실행합니다.
+
+    target   : 엔진 호출을 감싼 함수. 진행 중에 progress(state) 를 부르고,
+               cancel(threading.Event)이 설정되면 멈춘 뒤 그때까지의 결과를 반환합니다.
+    snapshot : state → 화면용 dict. 최소 min_interval 초 간격으로만 만들고 최신 것 하나만 보관하므로
+               엔진은 화면 갱신 속도와 관계없이 진행하고, 스냅샷 비용도 청크 수와 무관합니다.
+    profiler : 작업 스레드의 계측 단계를 기록할 Profiler (None 이면 계측하지 않음).
+               계측 상태는 스레드마다 따로이므로 시작한 세션의 Profiler 를 명시적으로 넘깁니다.
+
+    화면(스크립트) 쪽은 job.snapshot 을 읽고, job.wait(초) 로 완료를 기다리며,
+    job.cancel() 로 중단을 요청합니다. 완료 후 result / error 를 확인합니다.
+    """
+
+    def __init__(self, target, snapshot, min_interval: float = 0.25, profiler=None):
+        self._target = target
+        self._snapshot_fn = snapshot
+        self.profiler = profiler
+        self.min_interval = min_interval
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._last = 0.0
+        self.result = None
+        self.error: BaseException | None = None
+        self.started_at = None
+        self.finished_at = None
+        self._thread = threading.Thread(target=self._run, name="simulation-job", daemon=True)
+
+    def start(self) -> "SimulationJob":
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def _progress(self, state) -> None:
+        now = time.monotonic()
+        if now - self._last < self.min_interval:
+            return
+        snap = self._snapshot_fn(state)
+        with self._lock:
+            self._snapshot = snap
+        self._last = time.monotonic()
+
+    def _run(self) -> None:
+        try:
+            with profiling.use(self.profiler):
+                self.result = self._target(self._progress, self._cancel)
+        except BaseException as exc:  # noqa: BLE001 — 오류는 화면 쪽에서 표시합니다.
+            self.error = exc
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def snapshot(self) -> dict | None:
+        """가장 최근 진행 스냅샷 (아직 없으면 None)."""
+        with self._lock:
+            return self._snapshot
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """중단을 요청합니다. 엔진은 진행 중인 청크를 마친 뒤 멈춥니다."""
+        self._cancel.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """완료될 때까지 최대 timeout 초 기다리고, 완료되었으면 True."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
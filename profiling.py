@@ -0,0 +1,263 @@
+"""
+profiling.py — 단계별 실행 시간 / 메모리 계측 (사이드바 패널 + JSON lines 로그)
+
+엔진과 앱은 계측할 구간을 stage("이름") 컨텍스트나 @profiled("이름") 로 감싸 두기만 합니다.
+enable() 전에는 stage() 가 공유 no-op 컨텍스트를 돌려주므로 시간 측정도, 할당 추적도 하지 않습니다.
+
+    profiling.enable("profile.jsonl")
+    with profiling.stage("sample", n=65_536):
+        ...
+    profiling.summary()   # 단계별 호출 수 / 합계 시간 / 최대 메모리
+
+켜진 Profiler 는 프로세스 전체가 아니라 실행 컨텍스트(스레드)에 연결됩니다 (contextvars).
+그래서 Streamlit 세션마다 자기 Profiler 를 activate() 해도 서로 섞이지 않고, 백그라운드 스레드는
+use(profiler) 로 넘겨받은 Profiler 에만 기록합니다. 병렬 워커 안에서 실행되는 블록 단계는 기록되지 않고,
+부모 프로세스의 상위 단계(run_simulation 등)에 시간이 합산되어 보입니다.
+tracemalloc 은 프로세스 전역이므로 메모리를 재는 Profiler 가 하나라도 있는 동안 켜 두고,
+여러 세션이 동시에 계측하면 peak_mb 에는 다른 세션의 할당도 섞일 수 있습니다.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+
+_NULL = nullcontext()
+_current: ContextVar = ContextVar("profiler", default=None)  # 꺼져 있으면 None
+
+# 메모리를 재는 Profiler 수. 0 이 되면 이 모듈이 켠 tracemalloc 을 끕니다.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+# 여러 Profiler 가 같은 로그 파일에 이어 쓸 때 줄이 섞이지 않도록 합니다.
+_log_lock = threading.Lock()
+
+MB = 2**20
+
+
+class Profiler:
+    """
+    켜져 있는 동안 stage 기록을 모으는 객체.
+
+    log_path : 지정하면 기록마다 JSON 한 줄을 이어 씁니다
+    memory   : True 면 tracemalloc 으로 단계별 최대 할당량(peak_mb)을 함께 잽니다 (느려짐)
+    records  : 현재 run 의 기록 dict 목록 (begin() 으로 비움)
+    """
+
+    def __init__(self, log_path=None, memory: bool = True):
+        self.log_path = Path(log_path) if log_path is not None else None
+        self.memory = memory
+        self.run = None
+        self.records: list[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()  # 스레드별 중첩 단계 스택
+        self._release = None
+        if memory:
+            _acquire_tracing()
+            # close() 없이 버려져도(세션 종료) 가비지 수집 때 tracemalloc 사용을 반납합니다.
+            self._release = weakref.finalize(self, _release_tracing)
+
+    def close(self) -> None:
+        if self._release is not None:
+            self._release()
+
+    def begin(self, run: str) -> None:
+        """새 run 을 시작합니다. 이후 기록에는 run 이름이 붙고 이전 기록은 비웁니다."""
+        with self._lock:
+            self.run = run
+            self.records = []
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name: str, fields: dict):
+        return _Stage(self, name, fields)
+
+    def _emit(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+        if self.log_path is not None:
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            with _log_lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class _Stage:
+    """
+    단계 하나의 계측 컨텍스트. 중첩된 단계마다 tracemalloc 최대치를 초기화하되,
+    바깥 단계의 최대치는 안쪽 단계가 끝날 때 이어받으므로 바깥 peak 는 안쪽을 포함합니다.
+    """
+
+    __slots__ = ("profiler", "name", "fields", "start", "mem_start", "peak")
+
+    def __init__(self, profiler: Profiler, name: str, fields: dict):
+        self.profiler = profiler
+        self.name = name
+        self.fields = fields
+        self.mem_start = 0
+        self.peak = 0
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        tracing = self.profiler.memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        record = {
+            "ts": round(time.time(), 3),
+            "run": self.profiler.run,
+            "stage": self.name,
+            "parent": stack[-1].name if stack else None,
+            "seconds": seconds,
+        }
+        if self.profiler.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+            record["peak_mb"] = max(self.peak - self.mem_start, 0) / MB
+            record["net_mb"] = (current - self.mem_start) / MB
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record.update(self.fields)
+        self.profiler._emit(record)
+        return False
+
+
+def _acquire_tracing() -> None:
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        _tracing_users += 1
+        if _tracing_users == 1 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+
+
+def _release_tracing() -> None:
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+# ─────────────────────────────────────────────
+# 1. 켜기 / 끄기
+# ─────────────────────────────────────────────
+def enable(log_path=None, memory: bool = True) -> Profiler:
+    """
+    현재 컨텍스트에서 계측을 켭니다. 이미 같은 설정으로 켜져 있으면 그 Profiler 를 그대로 돌려줍니다.
+    다른 스레드(세션)의 계측에는 영향을 주지 않습니다.
+    """
+    profiler = _current.get()
+    path = Path(log_path) if log_path is not None else None
+    if profiler is not None and profiler.log_path == path and profiler.memory == memory:
+        return profiler
+    disable()
+    profiler = Profiler(path, memory)
+    _current.set(profiler)
+    return profiler
+
+
+def disable() -> None:
+    """현재 컨텍스트의 계측을 끄고 그 Profiler 를 닫습니다."""
+    profiler = _current.get()
+    if profiler is not None:
+        profiler.close()
+    _current.set(None)
+
+
+def activate(profiler: Profiler | None) -> None:
+    """
+    이미 만든 Profiler 를 현재 컨텍스트에 연결합니다 (None 이면 계측 끔, 닫지는 않음).
+    Streamlit 앱은 세션별 Profiler 를 재실행마다 이렇게 연결합니다.
+    """
+    _current.set(profiler)
+
+
+@contextmanager
+def use(profiler: Profiler | None):
+    """with 블록 동안만 profiler 를 현재 컨텍스트에 연결합니다 (백그라운드 작업 스레드용)."""
+    token = _current.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current.reset(token)
+
+
+def get_profiler() -> Profiler | None:
+    return _current.get()
+
+
+# ─────────────────────────────────────────────
+# 2. 계측 지점
+# ─────────────────────────────────────────────
+def stage(name: str, **fields):
+    """계측 구간 컨텍스트. 꺼져 있으면 공유 no-op 을 돌려줍니다 (할당 없음)."""
+    profiler = _current.get()
+    if profiler is None:
+        return _NULL
+    return profiler.stage(name, fields)
+
+
+def profiled(name: str):
+    """함수 전체를 stage(name) 으로 감싸는 데코레이터 (꺼져 있으면 원래 함수를 바로 호출)."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _current.get()
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.stage(name, {}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# ─────────────────────────────────────────────
+# 3. 집계
+# ─────────────────────────────────────────────
+def summary(records: list[dict] | None = None) -> list[dict]:
+    """
+    단계별 {stage, calls, seconds(합계), max_seconds, peak_mb(최대)} 목록 (합계 시간 내림차순).
+    records 를 생략하면 현재 run 의 기록을 씁니다.
+    """
+    if records is None:
+        profiler = _current.get()
+        records = profiler.records if profiler is not None else []
+    rows: dict = {}
+    for rec in records:
+        row = rows.setdefault(
+            rec["stage"],
+            {"stage": rec["stage"], "calls": 0, "seconds": 0.0, "max_seconds": 0.0, "peak_mb": None},
+        )
+        row["calls"] += 1
+        row["seconds"] += rec["seconds"]
+        row["max_seconds"] = max(row["max_seconds"], rec["seconds"])
+        if "peak_mb" in rec:
+            row["peak_mb"] = max(row["peak_mb"] or 0.0, rec["peak_mb"])
+    return sorted(rows.values(), key=lambda row: row["seconds"], reverse=True)
@@ -0,0 +1,105 @@
+"""
+result_store.py — 디스크 기반(memory-mapped) 결과 저장소
+"""
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 앱이 대용량 실행 결과를 쓰는 기본 위치
+RUNS_DIR = Path(tempfile.gettempdir()) / "monte_carlo_runs"
+
+# 디스크 결과를 읽을 때 한 번에 메모리에 올리는 반복(열) 수
+CHUNK_ROWS = 1 << 20
+
+# 내보내기 임시 파일 이름 접두어 (cleanup_runs 가 알아보는 데 씁니다)
+EXPORT_PREFIX = "export_"
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_suffix(".json")
+
+
+def create_store(path, names: list[str], n: int, dtype=np.float64) -> np.memmap:
+    """
+    (변수 수 + 1, n) 크기의 .npy 파일을 만들고 쓰기 가능한 memmap 으로 엽니다.
+    마지막 행이 'result' 이며, 실제로 채운 열 수는 finalize_store 로 기록합니다.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.dtype(dtype), shape=(len(names) + 1, max(n, 1))
+    )
+
+
+def finalize_store(path, data: np.memmap, names: list[str], n_done: int) -> np.memmap:
+    """
+    버퍼를 디스크에 반영하고 변수명과 유효 열 수를 옆 파일(.json)에 기록합니다.
+    버퍼가 n_done 보다 크면(자동 수렴이 일찍 멈춘 경우) 유효 열만 청크 단위로 새 파일에 옮겨
+    원래 파일을 대체하므로 디스크에는 실제 결과 크기만 남습니다.
+    반환: 최종 파일을 연 쓰기 가능한 memmap (이전 버퍼 대신 사용)
+    """
+    path = Path(path)
+    data.flush()
+    if data.shape[1] > n_done:
+        tmp = path.with_name(path.stem + ".tmp.npy")
+        trimmed = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=data.dtype, shape=(data.shape[0], max(n_done, 1))
+        )
+        for start in range(0, n_done, CHUNK_ROWS):
+            trimmed[:, start : start + CHUNK_ROWS] = data[:, start : min(start + CHUNK_ROWS, n_done)]
+        trimmed.flush()
+        del trimmed
+        os.replace(tmp, path)
+    with open(_meta_path(path), "w", encoding="utf-8") as f:
+        json.dump({"names": names, "n": n_done}, f, ensure_ascii=False)
+    return np.load(path, mmap_mode="r+")
+
+
+def open_store(path, mode: str = "r") -> tuple[np.memmap, list[str]]:
+    """저장된 결과를 memmap 으로 열어 (유효 열만 자른 배열, 변수명 목록) 을 반환합니다."""
+    path = Path(path)
+    with open(_meta_path(path), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    data = np.load(path, mmap_mode=mode)
+    return data[:, : meta["n"]], meta["names"]
+
+
+def delete_store(path) -> None:
+    """저장된 결과 파일과 옆 파일(.json)을 지웁니다 (이미 없거나 아직 열려 있어 못 지우면 건너뜀)."""
+    path = Path(path)
+    for target in (path, _meta_path(path), path.with_name(path.stem + ".tmp.npy")):
+        try:
+            target.unlink(missing_ok=True)
+        except OSError:  # Windows 에서 아직 매핑된 파일
+            pass
+
+
+def cleanup_runs(directory=RUNS_DIR, max_age: float = 24 * 3600) -> int:
+    """
+    directory 에서 max_age 초 넘게 수정되지 않은 결과(.npy / .json)와 내보내기 임시 파일을 지우고
+    지운 파일 수를 반환합니다. 앱 시작 시 이전 프로세스가 남긴 파일을 정리하는 데 씁니다.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in directory.iterdir():
+        stale = path.suffix in (".npy", ".json") or path.name.startswith(EXPORT_PREFIX)
+        try:
+            if stale and path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def iter_columns(data: np.ndarray, rows: int = CHUNK_ROWS):
+    """(행, n) 배열을 열 방향 청크 view 로 나눠 순서대로 돌려줍니다."""
+    for start in range(0, data.shape[1], rows):
+        yield data[:, start : start + rows]
@@ -1,43 +1,221 @@
 """
-scenarios.py — 시나리오 저장/불러오기 관리
+scenarios.py — 시나리오 저장/불러오기 관리 (SQLite 저장소, 태그 / 검색, 실행 요약 캐시)
 """
 import json
 import os
+import sqlite3
+import time
+from contextlib import closing, contextmanager
 from pathlib import Path
 
+from cache import config_key
+
 SCENARIOS_DIR = Path(__file__).parent / "scenarios"
+# 환경변수 MC_SCENARIOS_DB 로 저장소 파일 위치를 바꿀 수 있습니다.
+DB_PATH = Path(os.environ.get("MC_SCENARIOS_DB", SCENARIOS_DIR / "scenarios.db"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    name         TEXT PRIMARY KEY,
+    variables    TEXT NOT NULL,
+    settings     TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    name TEXT NOT NULL REFERENCES scenarios(name) ON DELETE CASCADE,
+    tag  TEXT NOT NULL,
+    PRIMARY KEY (name, tag)
+);
+CREATE INDEX IF NOT EXISTS tags_by_tag ON tags(tag);
+CREATE TABLE IF NOT EXISTS summaries (
+    content_hash TEXT PRIMARY KEY,
+    summary      TEXT NOT NULL,
+    updated_at   REAL NOT NULL
+);
+"""
+
+_initialized: set = set()  # 스키마를 확인한 DB 경로 (프로세스당 한 번)
+
+
+# ─────────────────────────────────────────────
+# 1. 연결 / 스키마 / JSON 폴더 이전
+# ─────────────────────────────────────────────
+def content_hash(variables: list[dict], settings: dict) -> str:
+    """변수 목록과 실행 설정의 내용 해시. 결과 캐시 키와 어긋나지 않도록 cache.config_key 를 그대로 씁니다."""
+    return config_key(variables, settings)
+
+
+@contextmanager
+def _db(path: Path | None = None):
+    """트랜잭션 하나를 여는 연결 (성공하면 commit, 예외면 rollback 후 닫음)."""
+    path = Path(path or DB_PATH)
+    first = path not in _initialized
+    if first:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(path, timeout=10)) as conn:
+        conn.execute("PRAGMA foreign_keys = ON")
+        if first:
+            conn.execute("PRAGMA journal_mode = WAL")  # 앱 / CLI 가 동시에 읽고 쓸 수 있도록
+            conn.executescript(_SCHEMA)
+            _initialized.add(path)
+            # 새로 만든 저장소라면 기존 JSON 시나리오 폴더를 한 번만 가져옵니다 (user_version 으로 표시).
+            if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+                with conn:
+                    _import_json(conn, SCENARIOS_DIR)
+                conn.execute("PRAGMA user_version = 1")
+        with conn:
+            yield conn
+
+
+def _validate_name(name: str) -> str:
+    name = name.strip()
+    if not name:
+        raise ValueError("시나리오 이름이 비어 있습니다.")
+    return name
+
+
+def _parse_tags(tags) -> list[str]:
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return sorted({t.strip() for t in tags or () if t.strip()})
 
 
-def _ensure_dir():
-    SCENARIOS_DIR.mkdir(exist_ok=True)
+def _write(conn, name: str, variables: list[dict], settings: dict, tags) -> None:
+    conn.execute(
+        "INSERT INTO scenarios (name, variables, settings, content_hash, updated_at) "
+        "VALUES (?, ?, ?, ?, ?) ON CONFLICT(name) DO UPDATE SET "
+        "variables = excluded.variables, settings = excluded.settings, "
+        "content_hash = excluded.content_hash, updated_at = excluded.updated_at",
+        (
+            name,
+            json.dumps(variables, ensure_ascii=False),
+            json.dumps(settings, ensure_ascii=False),
+            content_hash(variables, settings),
+            time.time(),
+        ),
+    )
+    if tags is not None:
+        conn.execute("DELETE FROM tags WHERE name = ?", (name,))
+        conn.executemany(
+            "INSERT INTO tags (name, tag) VALUES (?, ?)", [(name, t) for t in _parse_tags(tags)]
+        )
 
 
-def save_scenario(name: str, variables: list[dict], settings: dict) -> None:
-    """시나리오를 JSON 파일로 저장합니다."""
-    _ensure_dir()
-    payload = {"name": name, "variables": variables, "settings": settings}
-    path = SCENARIOS_DIR / f"{name}.json"
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+def _import_json(conn, directory: Path) -> int:
+    count = 0
+    for path in sorted(Path(directory).glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        _write(
+            conn, _validate_name(payload.get("name") or path.stem),
+            payload["variables"], payload.get("settings", {}), payload.get("tags", ()),
+        )
+        count += 1
+    return count
+
+
+def migrate_json_dir(directory=SCENARIOS_DIR, path=None) -> int:
+    """
+    JSON 시나리오 폴더(이전 저장 방식)의 *.json 을 저장소로 가져오고 개수를 반환합니다.
+    같은 이름은 덮어씁니다. 원본 파일은 지우지 않습니다.
+    새 저장소를 처음 열 때 SCENARIOS_DIR 에 대해 자동으로 한 번 실행됩니다.
+    """
+    with _db(path) as conn:
+        return _import_json(conn, Path(directory))
+
+
+# ─────────────────────────────────────────────
+# 2. 시나리오 CRUD / 검색
+# ─────────────────────────────────────────────
+def save_scenario(name: str, variables: list[dict], settings: dict, tags=None) -> None:
+    """시나리오를 저장합니다. tags 는 목록 또는 쉼표 구분 문자열 (None 이면 기존 태그 유지)."""
+    with _db() as conn:
+        _write(conn, _validate_name(name), variables, settings, tags)
 
 
 def load_scenario(name: str) -> dict:
-    """저장된 시나리오를 불러옵니다."""
-    path = SCENARIOS_DIR / f"{name}.json"
-    if not path.exists():
-        raise FileNotFoundError(f"시나리오 '{name}'을 찾을 수 없습니다.")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """저장된 시나리오 {'name', 'variables', 'settings', 'tags', 'content_hash'} 를 불러옵니다."""
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT variables, settings, content_hash FROM scenarios WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"시나리오 '{name}'을 찾을 수 없습니다.")
+        tags = [t for (t,) in conn.execute("SELECT tag FROM tags WHERE name = ? ORDER BY tag", (name,))]
+    return {
+        "name": name,
+        "variables": json.loads(row[0]),
+        "settings": json.loads(row[1]),
+        "tags": tags,
+        "content_hash": row[2],
+    }
+
+
+def list_scenarios(search: str = "", tag: str | None = None) -> list[str]:
+    """
+    저장된 시나리오 이름 목록 (이름순, 인덱스 사용).
+    search 는 이름 부분 일치, tag 는 그 태그가 붙은 시나리오만.
+    """
+    query = "SELECT s.name FROM scenarios s"
+    params: list = []
+    if tag:
+        query += " JOIN tags t ON t.name = s.name AND t.tag = ?"
+        params.append(tag)
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query += " WHERE s.name LIKE ? ESCAPE '\\'"
+        params.append(f"%{escaped}%")
+    query += " ORDER BY s.name"
+    with _db() as conn:
+        return [name for (name,) in conn.execute(query, params)]
 
 
-def list_scenarios() -> list[str]:
-    """저장된 시나리오 이름 목록을 반환합니다."""
-    _ensure_dir()
-    return [p.stem for p in sorted(SCENARIOS_DIR.glob("*.json"))]
+def list_tags() -> list[str]:
+    """사용 중인 태그 목록."""
+    with _db() as conn:
+        return [t for (t,) in conn.execute("SELECT DISTINCT tag FROM tags ORDER BY tag")]
 
 
 def delete_scenario(name: str) -> None:
-    """시나리오 파일을 삭제합니다."""
-    path = SCENARIOS_DIR / f"{name}.json"
-    if path.exists():
-        path.unlink()
+    """시나리오를 삭제합니다 (태그도 함께, 요약 캐시는 다른 시나리오와 공유될 수 있어 유지)."""
+    with _db() as conn:
+        conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+
+
+# ─────────────────────────────────────────────
+# 3. 실행 요약 캐시 (내용 해시 키)
+# ─────────────────────────────────────────────
+def make_summary(ci: dict, hist: tuple, n: int) -> dict:
+    """
+    calc_confidence_interval 결과와 (edges, counts) 히스토그램으로 저장용 요약을 만듭니다.
+    NumPy 값은 JSON 으로 쓸 수 있도록 float / int 로 바꿉니다.
+    """
+    edges, counts = hist
+    summary = {key: float(ci[key]) for key in ("mean", "std", "p5", "median", "p95") if key in ci}
+    summary["n"] = int(n)
+    summary["hist"] = {"edges": [float(x) for x in edges], "counts": [int(c) for c in counts]}
+    return summary
+
+
+def save_summary(key: str, summary: dict) -> None:
+    """
+    content_hash(변수, 설정) 키로 마지막 실행 요약을 저장합니다.
+    summary 는 JSON 으로 직렬화 가능한 값이어야 합니다 (p5 / p95 / mean / std, 히스토그램 구간 등).
+    """
+    with _db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO summaries (content_hash, summary, updated_at) VALUES (?, ?, ?)",
+            (key, json.dumps(summary, ensure_ascii=False), time.time()),
+        )
+
+
+def load_summary(key: str) -> dict | None:
+    """저장된 실행 요약 (없으면 None). updated_at 에 저장 시각(epoch 초)이 들어 있습니다."""
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT summary, updated_at FROM summaries WHERE content_hash = ?", (key,)
+        ).fetchone()
+    if row is None:
+        return None
+    return {**json.loads(row[0]), "updated_at": row[1]}
@@ -1,123 +1,2017 @@
 """
 simulation.py — Monte Carlo Insight Simulator 엔진
 """
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import warnings
+from collections import deque
+from functools import lru_cache
+from itertools import product, repeat, tee
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pandas as pd
+
+from formula import compile_formula
+from profiling import profiled, stage
+from result_store import CHUNK_ROWS, create_store, finalize_store, iter_columns, open_store
+from streaming import QuantileSketch, RunningCovariance, RunningStats, StreamingHistogram
+
+if TYPE_CHECKING:  # 타입 표기 전용. 실행 시 pandas / 프로세스 풀은 필요한 함수 안에서만 가져옵니다.
+    from concurrent.futures import Executor, ProcessPoolExecutor
+
+    import pandas as pd
 
 
 # ─────────────────────────────────────────────
 # 1. 분포 샘플링
 # ─────────────────────────────────────────────
-def sample_distribution(dist: str, min_val: float, max_val: float, n: int) -> np.ndarray:
-    """변수 하나에 대해 n개의 샘플을 생성합니다."""
+def sample_distribution(
+    dist: str,
+    min_val: float,
+    max_val: float,
+    n: int,
+    rng: np.random.Generator | None = None,
+    method: str = "random",
+    table=None,
+) -> np.ndarray:
+    """
+    변수 하나에 대해 n개의 샘플을 생성합니다. rng 미지정 시 새 Generator 를 사용합니다.
+    method 가 'random' 이 아니면 층화/준난수 설계(uniform_design)를 역누적분포로 변환합니다.
+    '경험' 분포는 table(empirical_table 로 만든 역누적분포 조회표)로 샘플링합니다.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if method != "random":
+        return inverse_cdf(dist, min_val, max_val, uniform_design(method, n, 1, rng)[0], table)
     dist = dist.lower()
+    if dist == "경험":
+        return empirical_ppf(_require_table(table), rng.random(n))
     if dist == "균등":
-        return np.random.uniform(min_val, max_val, n)
+        return rng.uniform(min_val, max_val, n)
     elif dist == "정규":
         mean = (min_val + max_val) / 2
         std = (max_val - min_val) / 6  # 99.7% 범위 = ±3σ
-        samples = np.random.normal(mean, std, n)
+        samples = rng.normal(mean, std, n)
         return np.clip(samples, min_val, max_val)
     elif dist == "삼각":
         mode = (min_val + max_val) / 2
-        return np.random.triangular(min_val, mode, max_val, n)
+        return rng.triangular(min_val, mode, max_val, n)
+    else:
+        raise ValueError(f"알 수 없는 분포: {dist}")
+
+
+# Acklam 유리 근사 계수 (표준정규 분위수 함수, 상대오차 < 1.2e-9)
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00)
+_PPF_LOW = 0.02425
+
+
+def norm_ppf(u: np.ndarray) -> np.ndarray:
+    """표준정규분포의 역누적분포함수 Φ⁻¹(u) (벡터화, u=0/1 은 ∓inf)."""
+    u = np.asarray(u, dtype=float)
+    a, b, c, d = _PPF_A, _PPF_B, _PPF_C, _PPF_D
+    out = np.empty_like(u)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tail = np.minimum(u, 1.0 - u)
+        lo = tail < _PPF_LOW
+        # 중앙 구간
+        q = u[~lo] - 0.5
+        r = q * q
+        out[~lo] = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+                   (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0)
+        # 양 꼬리 (대칭)
+        q = np.sqrt(-2.0 * np.log(tail[lo]))
+        x = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0)
+        out[lo] = np.where(u[lo] < 0.5, x, -x)
+    out[u <= 0.0] = -np.inf
+    out[u >= 1.0] = np.inf
+    return out
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """표준정규분포의 누적분포함수 Φ(x) (벡터화, erfc 체비셰프 근사, 상대오차 < 1.2e-7)."""
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x).reshape(-1) * np.sqrt(0.5)
+    t = 0.5 * z
+    t += 1.0
+    np.reciprocal(t, out=t)
+    poly = t * 0.17087277
+    # Horner 전개를 제자리 연산으로 (큰 청크에서 임시 배열을 줄임)
+    for coef in (-0.82215223, 1.48851587, -1.13520398, 0.27886807, -0.18628806,
+                 0.09678418, 0.37409196, 1.00002368):
+        poly += coef
+        poly *= t
+    poly -= 1.26551223
+    z *= z
+    poly -= z
+    np.exp(poly, out=poly)
+    poly *= t
+    poly *= 0.5  # = Φ(-|x|)
+    poly = poly.reshape(x.shape)
+    return np.where(x < 0, poly, 1.0 - poly)
+
+
+def inverse_cdf(
+    dist: str, min_val: float, max_val: float, u: np.ndarray, table=None
+) -> np.ndarray:
+    """
+    균등 난수 u ∈ [0, 1] 을 분포의 역누적분포함수로 변환합니다.
+    sample_distribution 과 같은 분포를 따르며, 같은 u 를 쓰면 여러 분포/시나리오가
+    공통 난수(CRN)를 공유하게 됩니다. '경험' 분포는 table 조회표를 씁니다.
+    """
+    dist = dist.lower()
+    u = np.asarray(u, dtype=float)
+    if dist == "경험":
+        return empirical_ppf(_require_table(table), u)
+    if dist == "균등":
+        return min_val + u * (max_val - min_val)
+    elif dist == "정규":
+        mean = (min_val + max_val) / 2
+        std = (max_val - min_val) / 6
+        return np.clip(mean + std * norm_ppf(u), min_val, max_val)
+    elif dist == "삼각":
+        mode = (min_val + max_val) / 2
+        span = max_val - min_val
+        cut = (mode - min_val) / span
+        return np.where(
+            u < cut,
+            min_val + np.sqrt(u * span * (mode - min_val)),
+            max_val - np.sqrt((1.0 - u) * span * (max_val - mode)),
+        )
     else:
         raise ValueError(f"알 수 없는 분포: {dist}")
 
 
+def distribution_mean(dist: str, min_val: float, max_val: float, table=None) -> float:
+    """분포의 해석적 기댓값 (제어 변량의 기준값으로 사용)."""
+    if dist.lower() == "경험":
+        # 조회표 사이를 선형 보간하는 분위수 함수의 적분 (사다리꼴, 정확한 값)
+        q = np.asarray(_require_table(table), dtype=float)
+        return float((q[:-1] + q[1:]).mean() / 2)
+    if dist.lower() in ("균등", "정규", "삼각"):
+        # 세 분포 모두 (min + max) / 2 를 중심으로 대칭입니다 (정규는 대칭 clip).
+        return (min_val + max_val) / 2
+    raise ValueError(f"알 수 없는 분포: {dist}")
+
+
+# 경험 분포 조회표의 구간 수 (분위수 EMPIRICAL_POINTS + 1 개)
+EMPIRICAL_POINTS = 1024
+
+
+def _require_table(table):
+    if table is None or len(table) < 2:
+        raise ValueError("경험 분포에는 관측 데이터로 만든 조회표(table)가 필요합니다.")
+    return table
+
+
+def empirical_table(data, points: int = EMPIRICAL_POINTS) -> list[float]:
+    """
+    관측값으로 경험 분포의 역누적분포 조회표를 만듭니다 (확률 0, 1/points, ..., 1 의 분위수).
+    한 번만 계산해 변수 정의(var["table"])에 저장하므로 시나리오와 함께 저장·캐시됩니다.
+    """
+    data = np.asarray(data, dtype=float).ravel()
+    data = data[np.isfinite(data)]
+    if data.size < 2 or data.min() == data.max():
+        raise ValueError("경험 분포에는 서로 다른 유한한 관측값이 2개 이상 필요합니다.")
+    return np.quantile(data, np.linspace(0.0, 1.0, points + 1)).tolist()
+
+
+def histogram_table(edges, counts, points: int = EMPIRICAL_POINTS) -> list[float]:
+    """
+    히스토그램(구간 경계 len(counts) + 1 개, 도수)으로 조회표를 만듭니다.
+    구간 안에서는 값이 고르게 퍼져 있다고 보고 누적분포를 선형 보간합니다.
+    """
+    edges = np.asarray(edges, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    if len(edges) != len(counts) + 1 or np.any(np.diff(edges) <= 0):
+        raise ValueError("구간 경계는 도수보다 1개 많고 오름차순이어야 합니다.")
+    if np.any(counts < 0) or counts.sum() <= 0:
+        raise ValueError("도수는 0 이상이고 합이 양수여야 합니다.")
+    cdf = np.concatenate([[0.0], np.cumsum(counts)]) / counts.sum()
+    # 도수 0 인 구간(누적분포가 평평한 곳)은 건너뛰도록 경계를 한쪽으로 모읍니다.
+    keep = np.concatenate([[True], np.diff(cdf) > 0])
+    return np.interp(np.linspace(0.0, 1.0, points + 1), cdf[keep], edges[keep]).tolist()
+
+
+def empirical_ppf(table, u: np.ndarray) -> np.ndarray:
+    """
+    조회표 사이를 선형 보간하는 역누적분포. 구간 번호를 u × 구간 수로 바로 계산하므로
+    표본마다 탐색(searchsorted)이 없고 비용은 표본 수에 비례합니다.
+    층화 / 준난수 / 상관(코퓰라) 경로도 같은 u 변환을 쓰므로 그대로 동작합니다.
+    """
+    q = np.asarray(table, dtype=float)
+    k = len(q) - 1
+    pos = np.asarray(u, dtype=float) * k
+    idx = pos.astype(np.intp)
+    np.clip(idx, 0, k - 1, out=idx)
+    pos -= idx
+    pos *= np.diff(q)[idx]
+    pos += q[idx]
+    return pos
+
+
+# ─────────────────────────────────────────────
+# 1-1. 층화 / 준난수(QMC) 설계
+# ─────────────────────────────────────────────
+SAMPLING_METHODS = {
+    "random": "무작위 (Monte Carlo)",
+    "lhs": "라틴 하이퍼큐브 (LHS)",
+    "sobol": "Sobol (scrambled QMC)",
+    "halton": "Halton (scrambled QMC)",
+}
+
+
+def _primes(k: int) -> list[int]:
+    """앞에서부터 k개의 소수."""
+    primes: list[int] = []
+    cand = 2
+    while len(primes) < k:
+        if all(cand % p for p in primes if p * p <= cand):
+            primes.append(cand)
+        cand += 1
+    return primes
+
+
+def _halton(n: int, k: int, start: int, scramble: int) -> np.ndarray:
+    """
+    무작위 자릿수 치환으로 scramble 한 Halton 점열 (k, n).
+    차원 j 는 j 번째 소수를 밑으로 하는 radical inverse 이며, 자릿수 위치마다 독립된
+    치환을 적용합니다. start 로 점열의 시작 인덱스를 지정해 블록/청크를 이어 붙입니다.
+    """
+    rng = np.random.default_rng(scramble)
+    index = np.arange(start, start + n, dtype=np.int64)
+    out = np.empty((k, n))
+    for j, base in enumerate(_primes(k)):
+        levels = int(np.ceil(52 / np.log2(base)))
+        perms = rng.random((levels, base)).argsort(axis=1)
+        # 인덱스가 실제로 가진 자릿수만 계산하고, 그 위의 0 자릿수들은 치환된 상수로 더합니다.
+        used = min(levels, max(1, int(np.ceil(np.log(start + n + 1) / np.log(base)))))
+        scales = float(base) ** -np.arange(1, levels + 1)
+        i = index.copy()
+        u = np.full(n, perms[used:, 0] @ scales[used:])
+        for level in range(used):
+            i, digit = np.divmod(i, base)
+            u += perms[level][digit] * scales[level]
+        out[j] = u
+    return out
+
+
+def _sobol(n: int, k: int, start: int, scramble: int) -> np.ndarray:
+    """scipy.stats.qmc 기반 scrambled Sobol 점열 (k, n)."""
+    try:
+        from scipy.stats import qmc
+    except ImportError as exc:  # scipy 는 Sobol 모드에서만 필요합니다.
+        raise ImportError("Sobol 샘플링에는 scipy 가 필요합니다: pip install scipy") from exc
+    engine = qmc.Sobol(d=k, scramble=True, seed=scramble)
+    if start:
+        engine.fast_forward(start)
+    with warnings.catch_warnings():
+        # 2의 거듭제곱이 아닌 청크 크기에 대한 균형 경고는 무시합니다.
+        warnings.simplefilter("ignore", UserWarning)
+        return engine.random(n).T
+
+
+def uniform_design(
+    method: str,
+    n: int,
+    k: int,
+    rng: np.random.Generator | None = None,
+    start: int = 0,
+    scramble: int | None = None,
+) -> np.ndarray:
+    """
+    k개 변수에 대한 [0, 1) 균등 설계를 (k, n) 배열로 생성합니다.
+
+    method  : 'random' | 'lhs' | 'sobol' | 'halton'
+    start   : QMC 점열의 시작 인덱스 (청크/블록을 이어서 생성할 때)
+    scramble: QMC scramble 시드. 같은 실행의 모든 블록이 같은 값을 써야 하나의 점열이 됩니다.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if method == "random":
+        return rng.random((k, n))
+    elif method == "lhs":
+        # 변수마다 n개 층에 하나씩, 층 순서는 독립적으로 섞습니다.
+        strata = rng.random((k, n)).argsort(axis=1)
+        return (strata + rng.random((k, n))) / n
+    if scramble is None:
+        scramble = int(rng.integers(2**63))
+    if method == "sobol":
+        return _sobol(n, k, start, scramble)
+    elif method == "halton":
+        return _halton(n, k, start, scramble)
+    else:
+        raise ValueError(f"알 수 없는 샘플링 방식: {method}")
+
+
+# ─────────────────────────────────────────────
+# 1-2. 변수 간 상관관계 (Gaussian copula)
+# ─────────────────────────────────────────────
+def correlation_matrix(variables: list[dict]) -> np.ndarray | None:
+    """
+    변수 정의의 'corr' ({다른 변수명: 순위 상관계수}) 로 (k, k) 상관 행렬을 만듭니다.
+    한쪽 변수에만 적어도 대칭으로 채우며, 상관이 하나도 없으면 None 을 반환합니다.
+    """
+    index = {var["name"]: j for j, var in enumerate(variables)}
+    corr = np.eye(len(variables))
+    found = False
+    for i, var in enumerate(variables):
+        for other, rho in var.get("corr", {}).items():
+            j = index.get(other)
+            if j is None or j == i or not rho:
+                continue
+            if not -1.0 <= rho <= 1.0:
+                raise ValueError(f"상관계수는 -1 ~ 1 사이여야 합니다: {var['name']} ↔ {other}")
+            corr[i, j] = corr[j, i] = rho
+            found = True
+    return corr if found else None
+
+
+@lru_cache(maxsize=64)
+def _copula_factor(rank_corr: tuple) -> tuple[np.ndarray, bool]:
+    """
+    순위(Spearman) 상관 행렬 → 정규 점수 상관 행렬의 Cholesky 인자 (시나리오별 캐시).
+    양의 정부호가 아니면 고윳값을 잘라 가장 가까운 상관 행렬로 보정하고 repaired=True.
+    """
+    target = np.array(rank_corr, dtype=float)
+    # 정규 copula 에서 Spearman ρs 를 내려면 정규 상관 2·sin(π·ρs/6) 이 필요합니다.
+    normal = 2.0 * np.sin(np.pi * target / 6.0)
+    np.fill_diagonal(normal, 1.0)
+    repaired = False
+    try:
+        factor = np.linalg.cholesky(normal)
+    except np.linalg.LinAlgError:
+        w, v = np.linalg.eigh(normal)
+        normal = (v * np.maximum(w, 1e-6)) @ v.T
+        d = np.sqrt(np.diag(normal))
+        factor = np.linalg.cholesky(normal / np.outer(d, d))
+        repaired = True
+    factor.setflags(write=False)
+    return factor, repaired
+
+
+def copula_factor(corr: np.ndarray) -> tuple[np.ndarray, bool]:
+    """상관 행렬의 Cholesky 인자와 보정 여부 (같은 행렬이면 캐시된 인자를 재사용)."""
+    return _copula_factor(tuple(map(tuple, np.asarray(corr, dtype=float))))
+
+
+def correlate_uniforms(u: np.ndarray, factor: np.ndarray) -> np.ndarray:
+    """
+    독립 균등 설계 u (k, n) 에 상관을 입힙니다: Φ(L · Φ⁻¹(u)).
+    각 행의 주변 분포는 여전히 균등이므로 inverse_cdf 로 어떤 분포에도 쓸 수 있고,
+    u ↔ 1 - u 대칭이 유지되어 대립 변량 쌍도 그대로 쌍을 이룹니다.
+    """
+    return norm_cdf(factor @ norm_ppf(u))
+
+
 # ─────────────────────────────────────────────
 # 2. 시뮬레이션 실행
 # ─────────────────────────────────────────────
-def run_simulation(variables: list[dict], n_iter: int) -> pd.DataFrame:
+def _normalized_weights(variables: list[dict]) -> np.ndarray:
+    """가중치 벡터 (weight 미지정 시 균등 가중, 합이 1이 되도록 정규화)."""
+    weights = np.array([var.get("weight", 1.0) for var in variables], dtype=float)
+    return weights / weights.sum()
+
+
+def combine_inputs(
+    variables: list[dict], values: np.ndarray, formula: str | None = None, out=None
+) -> np.ndarray:
+    """
+    변수 값 (변수 수, n) 으로 결과 행을 계산합니다.
+    formula 가 없으면 정규화 가중합, 있으면 컴파일된 수식(formula.compile_formula, 캐시됨)입니다.
+    """
+    if formula:
+        plan = compile_formula(formula, tuple(var["name"] for var in variables))
+        return plan.evaluate(values, out=out)
+    weights = _normalized_weights(variables).astype(values.dtype)
+    if out is None:
+        return weights @ values
+    return np.matmul(weights, values, out=out)
+
+
+class SimulationPlan:
+    """
+    블록 하나를 샘플링하는 데 필요한 설정 묶음 (워커 프로세스로 전달되도록 pickle 가능).
+
+    variables: 변수 정의 목록
+    method    : uniform_design 샘플링 방식
+    scramble  : QMC scramble 시드 (실행 전체에서 공유)
+    antithetic: True 면 (u, 1 - u) 대립 변량 쌍을 인접한 두 열에 생성
+    dtype     : 결과 배열의 dtype (float64 또는 메모리를 절반으로 줄이는 float32)
+    formula   : 결과 수식 (None 이면 가중합). 워커에서는 수식별 캐시로 한 번만 컴파일됩니다.
+    copula    : 변수 간 상관이 있으면 Cholesky 인자 (k, k), 없으면 None
+    """
+
+    __slots__ = ("variables", "method", "scramble", "antithetic", "dtype", "formula", "copula")
+
+    def __init__(
+        self,
+        variables: list[dict],
+        method: str = "random",
+        scramble: int = 0,
+        antithetic: bool = False,
+        dtype=np.float64,
+        formula: str | None = None,
+    ):
+        if method not in SAMPLING_METHODS:
+            raise ValueError(f"알 수 없는 샘플링 방식: {method}")
+        if formula:
+            compile_formula(formula, tuple(var["name"] for var in variables))  # 미리 검증
+        self.variables = variables
+        self.method = method
+        self.scramble = scramble
+        self.antithetic = antithetic
+        self.dtype = np.dtype(dtype)
+        self.formula = formula or None
+        corr = correlation_matrix(variables)
+        self.copula = None if corr is None else copula_factor(corr)[0]
+
+    @classmethod
+    def create(
+        cls,
+        variables: list[dict],
+        method: str,
+        seed_seq: np.random.SeedSequence,
+        antithetic: bool = False,
+        dtype=np.float64,
+        formula: str | None = None,
+    ):
+        scramble = int(seed_seq.generate_state(1, np.uint64)[0])
+        return cls(variables, method, scramble, antithetic, dtype, formula)
+
+
+def _sample_matrix(
+    plan: SimulationPlan,
+    n: int,
+    start: int = 0,
+    out: np.ndarray | None = None,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    변수별 샘플과 결과(가중합 또는 수식)를 (변수 수 + 1, n) 배열 하나에 채워 반환합니다.
+    마지막 행이 'result' 입니다. out 을 주면 새 배열을 만들지 않고 그 자리에 씁니다.
+    start 는 이 블록이 실행 전체에서 시작하는 반복 인덱스입니다 (QMC 점열 위치).
+    """
+    variables = plan.variables
+    k = len(variables)
+    if out is None:
+        out = np.empty((k + 1, n), dtype=plan.dtype)
+    if rng is None:
+        rng = np.random.default_rng()
+    with stage("sample", n=n):
+        if plan.method == "random" and not plan.antithetic and plan.copula is None:
+            for j, var in enumerate(variables):
+                out[j] = sample_distribution(
+                    var["dist"], var["min"], var["max"], n, rng, table=var.get("table")
+                )
+        else:
+            if plan.antithetic:
+                # 열 (2i, 2i+1) 이 한 쌍: u 와 1 - u. start 는 항상 짝수 위치에서 시작합니다.
+                half = uniform_design(
+                    plan.method, (n + 1) // 2, k, rng, start=start // 2, scramble=plan.scramble
+                )
+                u = np.empty((k, n))
+                u[:, 0::2] = half
+                u[:, 1::2] = 1.0 - half[:, : n // 2]
+            else:
+                u = uniform_design(plan.method, n, k, rng, start=start, scramble=plan.scramble)
+            if plan.copula is not None:
+                u = correlate_uniforms(u, plan.copula)
+            for j, var in enumerate(variables):
+                out[j] = inverse_cdf(var["dist"], var["min"], var["max"], u[j], var.get("table"))
+    # 결과는 별도 복사 없이 결과 행에 바로 씁니다.
+    with stage("combine", n=n):
+        combine_inputs(variables, out[:k], plan.formula, out=out[k])
+    return out
+
+
+class SimulationResult:
     """
-    variables: [{'name': str, 'min': float, 'max': float, 'dist': str, 'weight': float}, ...]
-    반환: 각 변수 컬럼 + 'result' 컬럼을 가진 DataFrame
+    시뮬레이션 결과. 변수 행들과 마지막 'result' 행을 연속된 2-D 배열
+    data (변수 수 + 1, n) 하나에 담습니다.
+
+    res["변수 A"], res["result"] 처럼 컬럼 이름으로 복사 없는 view 를 얻고,
+    pandas 가 필요한 곳에서만 to_frame() 으로 DataFrame 을 만듭니다 (복사 없음, 캐시).
     """
-    data = {}
-    for var in variables:
-        data[var["name"]] = sample_distribution(
-            var["dist"], var["min"], var["max"], n_iter
+
+    __slots__ = ("data", "names", "_frame")
+
+    def __init__(self, data: np.ndarray, names: list[str]):
+        if data.shape[0] != len(names) + 1:
+            raise ValueError("data 의 행 수는 변수 수 + 1 이어야 합니다.")
+        self.data = data
+        self.names = list(names)
+        self._frame = None
+
+    @classmethod
+    def from_variables(cls, variables: list[dict], data: np.ndarray) -> "SimulationResult":
+        return cls(data, [var["name"] for var in variables])
+
+    @property
+    def columns(self) -> list[str]:
+        return self.names + ["result"]
+
+    @property
+    def inputs(self) -> np.ndarray:
+        """(변수 수, n) 입력 표본 view."""
+        return self.data[:-1]
+
+    @property
+    def results(self) -> np.ndarray:
+        """결과값 view."""
+        return self.data[-1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == "result":
+            return self.data[-1]
+        try:
+            return self.data[self.names.index(name)]
+        except ValueError:
+            raise KeyError(name) from None
+
+    @property
+    def on_disk(self) -> bool:
+        """data 가 디스크 memmap 인지 여부 (전체를 한 번에 읽지 말아야 함)."""
+        return isinstance(self.data, np.memmap) or isinstance(self.data.base, np.memmap)
+
+    @classmethod
+    def open(cls, path) -> "SimulationResult":
+        """result_store 로 저장한 디스크 결과를 읽기 전용 memmap 으로 엽니다."""
+        data, names = open_store(path)
+        return cls(data, names)
+
+    def iter_chunks(self, rows: int = CHUNK_ROWS):
+        """(변수 수 + 1, ≤rows) 배열 청크를 순서대로 돌려줍니다 (디스크 결과도 청크만 읽음)."""
+        return iter_columns(self.data, rows)
+
+    def to_frame(self) -> pd.DataFrame:
+        """변수 컬럼 + 'result' 컬럼 DataFrame. data 를 복사하지 않고 공유합니다."""
+        if self._frame is None:
+            import pandas as pd
+
+            self._frame = pd.DataFrame(self.data.T, columns=self.columns, copy=False)
+        return self._frame
+
+
+# 병렬 실행 시 n_iter 를 나누는 고정 블록 크기.
+# 블록마다 SeedSequence 에서 파생한 독립 스트림을 쓰므로, 같은 seed 면 워커 수와
+# 상관없이 출력이 비트 단위로 동일합니다.
+BLOCK_SIZE = 65_536
+
+
+def _simulate_block(
+    plan: SimulationPlan, start: int, n: int, seed: np.random.SeedSequence
+) -> np.ndarray:
+    """워커 프로세스에서 실행되는 단위 작업: 독립 Generator 로 블록 하나를 샘플링합니다."""
+    return _sample_matrix(plan, n, start=start, rng=np.random.default_rng(seed))
+
+
+# 워커 수 → 공유 프로세스 풀. 깨진 풀(워커 비정상 종료)은 다음 요청 때 새로 만듭니다.
+_POOLS: dict[int, ProcessPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    forkserver (지원하지 않는 플랫폼은 spawn) 로 워커를 띄우는 프로세스 풀.
+    Streamlit 처럼 스레드가 여럿인 프로세스를 fork 하면 잠금 상태까지 복제되어 교착될 수 있으므로
+    fork 는 쓰지 않습니다. 대신 워커가 실행 스크립트를 다시 import 하므로, 직접 작성한 스크립트에서
+    workers > 1 을 쓰려면 `if __name__ == "__main__":` 보호가 필요합니다.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def get_pool(workers: int | None = None) -> ProcessPoolExecutor:
+    """워커 수별로 재사용되는 프로세스 풀을 반환합니다 (None = CPU 코어 수). 깨진 풀은 새로 만듭니다."""
+    workers = workers or os.cpu_count()
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None or getattr(pool, "_broken", False):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            pool = _POOLS[workers] = _new_pool(workers)
+        return pool
+
+
+def _replace_pool(pool: Executor) -> Executor | None:
+    """get_pool 이 관리하는 깨진 풀을 새 풀로 바꿔 반환합니다. 호출자가 넘긴 풀이면 None."""
+    with _POOLS_LOCK:
+        for workers, managed in _POOLS.items():
+            if managed is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                replacement = _POOLS[workers] = _new_pool(workers)
+                return replacement
+    return None
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    """공유 프로세스 풀을 모두 종료합니다 (인터프리터 종료 시 자동 호출)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _pool_for(workers: int, pool: Executor | None) -> Executor | None:
+    if pool is None and workers > 1:
+        pool = get_pool(workers)
+    return pool
+
+
+def _map_ordered(pool: Executor | None, fn, *iterables, window: int = 1):
+    """
+    pool 이 있으면 최대 window 개 작업만 동시에 제출하며 결과를 입력 순서대로 돌려줍니다.
+    Executor.map 과 달리 완료된 블록이 메모리에 무한정 쌓이지 않습니다.
+
+    get_pool 의 풀이 실행 중에 깨지면(BrokenProcessPool) 새 풀로 바꾸고 아직 결과를 받지 못한
+    작업만 한 번 다시 제출합니다. 블록마다 시드가 정해져 있으므로 결과는 그대로입니다.
+    호출자가 도중에 멈추면(close) 제출했지만 받지 않은 작업은 취소합니다.
+    """
+    if pool is None:
+        yield from map(fn, *iterables)
+        return
+    from concurrent.futures.process import BrokenProcessPool
+
+    pending: deque = deque()  # [args, future]
+    items = zip(*iterables)
+    retried = False
+    try:
+        while True:
+            try:
+                for entry in pending:
+                    if entry[1] is None:
+                        entry[1] = pool.submit(fn, *entry[0])
+                for args in items:
+                    pending.append([args, None])
+                    pending[-1][1] = pool.submit(fn, *args)
+                    if len(pending) >= window:
+                        value = pending[0][1].result()
+                        pending.popleft()
+                        yield value
+                while pending:
+                    value = pending[0][1].result()
+                    pending.popleft()
+                    yield value
+                return
+            except BrokenProcessPool:
+                replacement = None if retried else _replace_pool(pool)
+                if replacement is None:
+                    raise
+                pool, retried = replacement, True
+                for entry in pending:
+                    entry[1] = None
+    finally:
+        for _, future in pending:
+            if future is not None:
+                future.cancel()
+
+
+@profiled("run_simulation")
+def run_simulation(
+    variables: list[dict],
+    n_iter: int,
+    seed: int | None = None,
+    workers: int = 1,
+    pool: Executor | None = None,
+    method: str = "random",
+    antithetic: bool = False,
+    dtype=np.float64,
+    out_path=None,
+    formula: str | None = None,
+) -> SimulationResult:
+    """
+    variables : [{'name': str, 'min': float, 'max': float, 'dist': str, 'weight': float}, ...]
+                '경험' 분포 변수는 'table' (empirical_table 조회표) 도 가집니다
+    seed      : 난수 시드 (None 이면 매번 다른 결과)
+    workers   : 2 이상이면 BLOCK_SIZE 블록을 프로세스 풀에 나눠 병렬 실행
+    pool      : 직접 관리하는 Executor (지정 시 workers 대신 사용)
+    method    : 샘플링 방식 (SAMPLING_METHODS 참고)
+    antithetic: True 면 인접한 두 열이 대립 변량 쌍 (estimate_mean 으로 분산 감소 추정)
+    dtype     : np.float64 (기본) 또는 np.float32
+    out_path  : 지정하면 결과를 메모리 대신 이 .npy 파일(memmap)에 블록 단위로 씁니다
+    formula   : 결과 수식 (예: "단가 * 수량 - 고정비"). None 이면 정규화 가중합
+    반환: 각 변수 + 'result' 를 담은 SimulationResult (DataFrame 은 .to_frame())
+    """
+    seed_seq = np.random.SeedSequence(seed)
+    plan = SimulationPlan.create(variables, method, seed_seq, antithetic, dtype, formula)
+    starts = list(range(0, n_iter, BLOCK_SIZE))
+    sizes = [min(BLOCK_SIZE, n_iter - start) for start in starts]
+    seeds = seed_seq.spawn(len(sizes))
+    pool = _pool_for(workers, pool)
+
+    names = [var["name"] for var in variables]
+    if out_path is None:
+        matrix = np.empty((len(variables) + 1, n_iter), dtype=plan.dtype)
+    else:
+        matrix = create_store(out_path, names, n_iter, plan.dtype)
+    if pool is None:
+        for start, size, ss in zip(starts, sizes, seeds):
+            _sample_matrix(
+                plan, size, start=start, out=matrix[:, start : start + size],
+                rng=np.random.default_rng(ss),
+            )
+    else:
+        blocks = _map_ordered(
+            pool, _simulate_block, repeat(plan), starts, sizes, seeds, window=2 * max(workers, 2)
         )
+        for start, block in zip(starts, blocks):
+            matrix[:, start : start + block.shape[1]] = block
 
-    df = pd.DataFrame(data)
+    if out_path is not None:
+        matrix = finalize_store(out_path, matrix, names, n_iter)[:, :n_iter]
+    return SimulationResult(matrix, names)
+
+
+# ─────────────────────────────────────────────
+# 2-1. 분산 감소 추정량 (대립 변량 / 제어 변량)
+# ─────────────────────────────────────────────
+def input_means(variables: list[dict]) -> np.ndarray:
+    """변수별 해석적 기댓값 벡터 (제어 변량 기준값)."""
+    return np.array([
+        distribution_mean(v["dist"], v["min"], v["max"], v.get("table")) for v in variables
+    ])
 
-    # result = 가중합 (weight 미지정 시 균등 가중)
-    weights = np.array([var.get("weight", 1.0) for var in variables], dtype=float)
-    weights /= weights.sum()
-    values = np.column_stack([df[var["name"]].values for var in variables])
-    df["result"] = values @ weights
 
-    return df
+def _pair_average(rows: np.ndarray) -> np.ndarray:
+    """인접한 대립 변량 쌍 (2i, 2i+1) 의 평균. 짝이 없는 마지막 열은 버립니다."""
+    m = rows.shape[1] // 2
+    return (rows[:, 0 : 2 * m : 2] + rows[:, 1 : 2 * m : 2]) / 2
+
+
+def _estimate_from(
+    acc: RunningCovariance, raw_var: float, means: np.ndarray | None = None
+) -> dict:
+    """
+    누적된 (제어 변수..., 결과) co-moment 로 평균 추정량과 표준오차를 계산합니다.
+    means 가 주어지면 최소제곱 계수 β 로 제어 변량 보정을 적용합니다.
+    ess 는 같은 표준오차를 얻는 데 필요한 단순 무작위 표본 수입니다.
+    """
+    m = acc.n
+    mean = float(acc.mean[-1])
+    if m < 2:
+        return {"mean": mean, "se": np.inf, "ess": 0.0}
+    s_yy = acc.comoment[-1, -1]
+    dof = m - 1
+    if means is not None:
+        s_cc = acc.comoment[:-1, :-1]
+        s_cy = acc.comoment[:-1, -1]
+        beta = np.linalg.lstsq(s_cc, s_cy, rcond=None)[0]
+        mean -= float(beta @ (acc.mean[:-1] - means))
+        s_yy -= float(s_cy @ beta)
+        dof = max(m - 1 - len(means), 1)
+    se = float(np.sqrt(max(s_yy, 0.0) / dof / m))
+    ess = raw_var / se ** 2 if se > 0 else np.inf
+    return {"mean": mean, "se": se, "ess": float(ess)}
+
+
+def estimate_mean(
+    samples: np.ndarray,
+    variables: list[dict],
+    antithetic: bool = False,
+    control_variates: bool = False,
+) -> dict:
+    """
+    분산 감소를 반영한 결과 평균 추정량.
+
+    samples         : (변수 수 + 1, n) 배열 — 변수 행들 + 마지막 행 'result'
+    antithetic      : 인접한 두 행을 대립 변량 쌍으로 보고 쌍 평균으로 추정
+    control_variates: 입력 변수의 해석적 기댓값으로 제어 변량 보정
+    반환: {'mean', 'se', 'ess', 'n'} — n 은 실제 반복 수, ess 는 유효 표본 수
+    결과에 NaN / ±inf 가 있으면 분산 감소 없이 유한한 결과의 단순 평균으로 추정합니다.
+    """
+    k = len(variables)
+    finite = np.isfinite(samples[k])
+    if not finite.all():
+        stats = RunningStats()
+        stats.update(samples[k][finite])
+        return {"mean": float(stats.mean), "se": float(stats.sem), "ess": float(stats.n),
+                "n": samples.shape[1]}
+    rows = samples if control_variates else samples[k:]
+    if antithetic:
+        rows = _pair_average(rows)
+    acc = RunningCovariance(rows.shape[0])
+    acc.update(rows)
+    means = input_means(variables) if control_variates else None
+    est = _estimate_from(acc, float(np.var(samples[k])), means)
+    est["n"] = samples.shape[1]
+    return est
 
 
 # ─────────────────────────────────────────────
 # 3. 자동 수렴 감지
 # ─────────────────────────────────────────────
-def auto_convergence(
+# 분위수 신뢰구간에서 밀도를 추정할 최소 확률 폭 (분위수 스케치의 순위 오차보다 넉넉하게)
+_SKETCH_BANDWIDTH = 0.01
+
+
+class ConvergenceRun:
+    """
+    스트리밍 수렴 엔진의 실행 상태.
+
+    stats        : 결과값의 RunningStats (평균/분산/최솟값/최댓값)
+    input_stats  : 변수별 RunningStats (total 에 변수별 합계)
+    running_means: 청크마다 기록한 누적 평균
+    checkpoints  : running_means 각 값이 계산된 시점의 누적 반복 횟수
+    samples      : (변수 수 + 1, n_done) 표본 배열, keep_samples=False 이면 None
+    estimator    : 대립/제어 변량 추정용 RunningCovariance (분산 감소 미사용 시 None)
+    histogram    : 결과값의 StreamingHistogram (해석적 결과 범위 기준, 표본 없이 갱신)
+    sketch       : 결과값의 QuantileSketch (표본 없이 P5/P50/P95 등 분위수 근사)
+    nonfinite    : 결과가 NaN / ±inf 인 행 수. 이런 행은 표본에는 그대로 남지만
+                   결과 통계, 히스토그램, 스케치에서는 빠지고, 하나라도 있으면 (남은 행이 더는
+                   대립 쌍 / 입력 기댓값과 맞지 않으므로) 분산 감소 대신 단순 평균으로 추정합니다
+    cancelled    : 취소 신호로 max_iter 전에 멈췄으면 True (표본과 통계는 그때까지의 부분 결과)
+    stop_reason  : 멈춘 이유 — 'precision'(목표 정밀도 도달) / 'tolerance'(평균 변화 tol 미만) /
+                   'max_iter' / 'cancelled' (실행 전에는 None)
+    """
+
+    def __init__(
+        self,
+        variables: list[dict],
+        max_iter: int,
+        keep_samples: bool = True,
+        antithetic: bool = False,
+        control_variates: bool = False,
+        seed=None,
+        dtype=np.float64,
+        out_path=None,
+        formula: str | None = None,
+    ):
+        k = len(variables)
+        self.variables = variables
+        self.antithetic = antithetic
+        self.control_variates = control_variates
+        self.stats = RunningStats()
+        self.input_stats = RunningStats((k,))
+        self.histogram = StreamingHistogram(*result_bounds(variables, formula))
+        self.sketch = QuantileSketch(seed=seed)
+        self.estimator = None
+        if antithetic or control_variates:
+            self.estimator = RunningCovariance(k + 1 if control_variates else 1)
+        self.running_means: list[float] = []
+        self.checkpoints: list[int] = []
+        self.converged = False
+        self.cancelled = False
+        self.stop_reason = None
+        self.max_iter = max_iter
+        self.n_done = 0
+        self.nonfinite = 0
+        # 청크는 미리 할당한 버퍼 하나에 이어 씁니다 (반복 concat 없음).
+        # out_path 를 주면 그 버퍼가 디스크의 memmap 입니다.
+        self.out_path = out_path
+        self._buffer = None
+        if keep_samples and out_path is not None:
+            self._buffer = create_store(out_path, [v["name"] for v in variables], max_iter, dtype)
+        elif keep_samples:
+            self._buffer = np.empty((k + 1, max_iter), dtype=dtype)
+
+    @property
+    def samples(self) -> np.ndarray | None:
+        if self._buffer is None:
+            return None
+        return self._buffer[:, : self.n_done]
+
+    def add_chunk(self, matrix: np.ndarray) -> float:
+        """청크 하나를 누적하고 현재 누적 평균을 반환합니다. 비용은 청크 크기에만 비례합니다."""
+        k = len(self.variables)
+        with stage("accumulate", n=matrix.shape[1]):
+            finite = np.isfinite(matrix[k])
+            kept = matrix
+            if not finite.all():
+                self.nonfinite += int(matrix.shape[1] - np.count_nonzero(finite))
+                kept = matrix[:, finite]
+            self.stats.update(kept[k])
+            self.input_stats.update(matrix[:k])
+            self.histogram.update(matrix[k])
+            self.sketch.update(kept[k])
+            if self.estimator is not None:
+                rows = matrix if self.control_variates else matrix[k:]
+                self.estimator.update(_pair_average(rows) if self.antithetic else rows)
+        self.n_done += matrix.shape[1]
+        cur_mean = self.estimate()["mean"]
+        self.running_means.append(cur_mean)
+        self.checkpoints.append(self.n_done)
+        return cur_mean
+
+    def estimate(self) -> dict:
+        """현재까지의 평균 추정량 {'mean', 'se', 'ess', 'n'} (분산 감소 반영)."""
+        if self.estimator is None or self.nonfinite:
+            est = {"mean": float(self.stats.mean), "se": float(self.stats.sem), "ess": float(self.stats.n)}
+        else:
+            means = input_means(self.variables) if self.control_variates else None
+            est = _estimate_from(self.estimator, float(self.stats.var), means)
+        est["n"] = self.n_done
+        return est
+
+    def precision(self, level: float = 0.95) -> dict:
+        """
+        현재까지 달성한 정밀도.
+        se / rel_se      : 평균의 표준오차(분산 감소 반영)와 |평균| 대비 비율 (평균이 0 이면 표준편차 대비)
+        p5_half / p95_half: P5 / P95 의 level 신뢰구간 반폭 z√(p(1-p)/n) / f(Q(p)).
+                           밀도 f 는 분위수 스케치의 Q(p ± h) 차분으로 추정합니다
+                           (h 는 순서통계량 구간 폭 z√(p(1-p)/n) 이되, 스케치 해상도보다 작지 않게)
+        rel_band         : 두 반폭 중 큰 값을 P95 - P5 폭으로 나눈 값
+        분위수 구간은 표본이 독립이라고 보고 계산하므로 층화 / 준난수 설계에서는 보수적입니다.
+        """
+        est = self.estimate()
+        if self.n_done == 0:
+            return {"se": np.inf, "rel_se": np.inf, "p5_half": np.inf, "p95_half": np.inf,
+                    "rel_band": np.inf, "n": 0}
+        z = float(norm_ppf(np.array([0.5 + level / 2]))[0])
+        ps = np.array([0.05, 0.95])
+        delta = z * np.sqrt(ps * (1 - ps) / self.n_done)
+        h = np.maximum(delta, _SKETCH_BANDWIDTH)
+        q = self.sketch.quantile(np.clip(np.concatenate([ps - h, ps, ps + h]), 0.0, 1.0))
+        half = (q[4:] - q[:2]) / 2 * (delta / h)
+        spread = q[3] - q[2]
+        scale = abs(est["mean"]) or float(self.stats.std) or 1.0
+        return {
+            "se": est["se"],
+            "rel_se": est["se"] / scale,
+            "p5_half": float(half[0]),
+            "p95_half": float(half[1]),
+            "rel_band": float(half.max() / spread) if spread > 0 else 0.0,
+            "n": self.n_done,
+        }
+
+    def merge(self, other: "ConvergenceRun") -> None:
+        """다른 실행(워커/부분 실행)의 누적 통계를 병합합니다. 표본과 수렴 추이는 병합하지 않습니다."""
+        self.stats.merge(other.stats)
+        self.input_stats.merge(other.input_stats)
+        self.histogram.merge(other.histogram)
+        self.sketch.merge(other.sketch)
+        if self.estimator is not None:
+            self.estimator.merge(other.estimator)
+        self.n_done += other.n_done
+        self.nonfinite += other.nonfinite
+
+    def summary(self, quantiles: tuple = ()) -> dict:
+        """표본 없이 누적 통계만으로 calc_confidence_interval 과 같은 형식의 요약을 만듭니다."""
+        estimator = self.estimate() if self.estimator is not None else None
+        return sketch_confidence_interval(self.sketch, self.stats, estimator, quantiles)
+
+    def to_result(self) -> SimulationResult:
+        """지금까지의 표본을 복사 없이 SimulationResult 로 반환합니다."""
+        if self._buffer is None:
+            raise ValueError("keep_samples=False 로 실행한 결과에는 표본이 없습니다.")
+        if self.out_path is not None:
+            # 일찍 멈췄으면 파일이 실제 반복 횟수 크기로 다시 쓰이므로 버퍼도 새 파일로 바꿉니다.
+            self._buffer = finalize_store(
+                self.out_path, self._buffer, [v["name"] for v in self.variables], self.n_done
+            )
+        return SimulationResult.from_variables(self.variables, self.samples)
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.to_result().to_frame()
+
+
+@profiled("stream_convergence")
+def stream_convergence(
     variables: list[dict],
     tol: float = 1e-3,
     min_iter: int = 1_000,
     max_iter: int = 100_000,
     chunk: int = 1_000,
-) -> tuple[pd.DataFrame, list[float]]:
+    keep_samples: bool = True,
+    seed: int | None = None,
+    workers: int = 1,
+    pool: Executor | None = None,
+    method: str = "random",
+    antithetic: bool = False,
+    control_variates: bool = False,
+    dtype=np.float64,
+    out_path=None,
+    formula: str | None = None,
+    progress=None,
+    cancel=None,
+    rel_se: float | None = None,
+    band_tol: float | None = None,
+    growth: float = 2.0,
+    max_chunk: int = BLOCK_SIZE,
+) -> ConvergenceRun:
     """
-    평균값 변화가 tol 미만으로 안정화되면 시뮬레이션을 중단합니다.
-    반환: (최종 DataFrame, running_means 리스트)
+    목표 정밀도에 도달하거나 평균값 변화가 tol 미만으로 안정화될 때까지 청크 단위로 시뮬레이션합니다.
+
+    rel_se / band_tol 중 하나라도 주면 정밀도 기준으로 멈춥니다 (tol 은 무시):
+    평균의 상대 표준오차 ≤ rel_se, P5 / P95 의 95% 신뢰구간 반폭 ≤ band_tol × (P95 - P5)
+    (주어진 기준 모두, ConvergenceRun.precision 참고). 둘 다 없으면 연속한 청크의 평균 변화가
+    tol 미만일 때 멈춥니다. 어느 쪽이든 min_iter 전에는 멈추지 않고, 이유는 run.stop_reason 에 남습니다.
+    청크 크기는 chunk 에서 시작해 청크마다 growth 배씩 max_chunk 까지 커지므로
+    (growth=1 이면 고정), 판정과 청크 처리의 고정 비용이 반복 횟수의 로그에 비례합니다.
+    keep_samples=False 이면 표본을 저장하지 않고 누적 통계만 유지합니다.
+    dtype 은 표본 버퍼의 dtype 입니다 (누적 통계는 항상 float64).
+    out_path 를 주면 표본 버퍼를 max_iter 크기의 디스크 memmap(.npy)으로 만듭니다.
+    antithetic / control_variates 를 켜면 수렴 판정에 분산 감소 추정 평균을 씁니다.
+    formula 는 결과 수식입니다 (None 이면 가중합, run_simulation 참고).
+    progress 를 주면 청크를 누적할 때마다 progress(run) 을 호출합니다 (진행 상황 스냅샷용).
+    cancel 은 threading.Event 처럼 is_set() 이 있는 객체이며, 설정되면 다음 청크 전에 멈추고
+    run.cancelled 를 True 로 둡니다 (그때까지의 표본 / 통계는 그대로 유지).
+    tol=0 과 min_iter=max_iter 로 부르면 조기 종료 없이 정확히 max_iter 회 실행하며,
+    chunk=BLOCK_SIZE(청크가 더 커지지 않음)이면 같은 seed 의 run_simulation 과 표본이 동일합니다.
+
+    청크 i 는 항상 SeedSequence(seed) 의 i 번째 자식 스트림으로 샘플링되므로,
+    풀을 쓰더라도 결과는 직렬 실행과 동일합니다. 풀 사용 시 _map_ordered 로 워커 수만큼의
+    청크를 미리 제출해 두고 (풀이 깨지면 같은 방식으로 한 번 다시 제출), 수렴하면 남은 청크는 버립니다.
     """
-    all_rows = []
-    running_means = []
+    seed_seq = np.random.SeedSequence(seed)
+    run = ConvergenceRun(
+        variables, max_iter, keep_samples, antithetic, control_variates,
+        seed=seed_seq.generate_state(1)[0], dtype=dtype, out_path=out_path, formula=formula,
+    )
+    plan = SimulationPlan.create(variables, method, seed_seq, antithetic, dtype, formula)
+    max_chunk = max(max_chunk, chunk)
+    if antithetic:
+        # 대립 변량 쌍이 청크 경계에서 끊기지 않도록
+        chunk += chunk % 2
+        max_chunk += max_chunk % 2
+    use_precision = rel_se is not None or band_tol is not None
+    pool = _pool_for(workers, pool)
     prev_mean = None
 
-    n_done = 0
-    while n_done < max_iter:
-        batch_df = run_simulation(variables, chunk)
-        all_rows.append(batch_df)
-        n_done += chunk
+    def schedule():
+        """(시작 위치, 크기, 시드) 를 청크 순서대로 만듭니다. 크기는 결과와 무관하게 정해집니다."""
+        start, size = 0, chunk
+        while start < max_iter:
+            n = min(size, max_iter - start)
+            yield start, n, seed_seq.spawn(1)[0]
+            start += n
+            size = min(max(int(size * growth), size), max_chunk)
+            if antithetic:
+                size += size % 2
 
-        cur_mean = pd.concat(all_rows)["result"].mean()
-        running_means.append(cur_mean)
+    chunks = schedule()
+    blocks = None
+    if pool is not None:
+        chunks, tasks = tee(chunks)
+        starts, sizes, seeds = (map(itemgetter(i), part) for i, part in enumerate(tee(tasks, 3)))
+        blocks = _map_ordered(
+            pool, _simulate_block, repeat(plan), starts, sizes, seeds, window=max(workers, 1)
+        )
+
+    while run.n_done < max_iter:
+        if cancel is not None and cancel.is_set():
+            run.cancelled = True
+            break
+        start, size, ss = next(chunks)
+        out = None
+        if run._buffer is not None:
+            out = run._buffer[:, start : start + size]
+        if blocks is None:
+            matrix = _sample_matrix(plan, size, start=start, out=out, rng=np.random.default_rng(ss))
+        else:
+            matrix = next(blocks)
+            if out is not None:
+                out[:] = matrix
+        cur_mean = run.add_chunk(matrix)
+        if progress is not None:
+            progress(run)
 
-        if n_done >= min_iter and prev_mean is not None:
+        if run.n_done >= min_iter and use_precision:
+            achieved = run.precision()
+            if (rel_se is None or achieved["rel_se"] <= rel_se) and (
+                band_tol is None or achieved["rel_band"] <= band_tol
+            ):
+                run.converged = True
+                run.stop_reason = "precision"
+                break
+        elif run.n_done >= min_iter and prev_mean is not None:
             if abs(cur_mean - prev_mean) / (abs(prev_mean) + 1e-12) < tol:
+                run.converged = True
+                run.stop_reason = "tolerance"
                 break
         prev_mean = cur_mean
 
-    return pd.concat(all_rows, ignore_index=True), running_means
+    if run.stop_reason is None:
+        run.stop_reason = "cancelled" if run.cancelled else "max_iter"
+    if blocks is not None:
+        blocks.close()  # 미리 제출했지만 쓰지 않은 청크는 취소합니다.
+    return run
+
+
+def _summarize_block(
+    plan: SimulationPlan, start: int, n: int, seed: np.random.SeedSequence, control_variates: bool
+) -> ConvergenceRun:
+    """워커에서 블록 하나를 샘플링해 표본 대신 누적 통계만 돌려줍니다."""
+    part = ConvergenceRun(
+        plan.variables, 0, keep_samples=False, antithetic=plan.antithetic,
+        control_variates=control_variates, seed=seed.generate_state(1)[0], formula=plan.formula,
+    )
+    part.add_chunk(_sample_matrix(plan, n, start=start, rng=np.random.default_rng(seed)))
+    return part
+
+
+def simulate_statistics(
+    variables: list[dict],
+    n_iter: int,
+    seed: int | None = None,
+    workers: int = 1,
+    pool: Executor | None = None,
+    method: str = "random",
+    antithetic: bool = False,
+    control_variates: bool = False,
+    formula: str | None = None,
+) -> ConvergenceRun:
+    """
+    표본을 보관하지 않는 통계 전용 실행. 블록마다 누적 통계(평균/분산, 히스토그램,
+    분위수 스케치)만 만들어 병합하므로 메모리는 반복 횟수와 무관합니다.
+    결과는 ConvergenceRun (samples=None) 이며 summary() 로 요약을 얻습니다.
+    """
+    seed_seq = np.random.SeedSequence(seed)
+    plan = SimulationPlan.create(variables, method, seed_seq, antithetic, formula=formula)
+    run = ConvergenceRun(
+        variables, 0, keep_samples=False, antithetic=antithetic,
+        control_variates=control_variates, seed=seed_seq.generate_state(1)[0], formula=formula,
+    )
+    starts = list(range(0, n_iter, BLOCK_SIZE))
+    sizes = [min(BLOCK_SIZE, n_iter - start) for start in starts]
+    seeds = seed_seq.spawn(len(sizes))
+    pool = _pool_for(workers, pool)
+    parts = _map_ordered(
+        pool, _summarize_block, repeat(plan), starts, sizes, seeds, repeat(control_variates),
+        window=2 * max(workers, 2),
+    )
+    for part in parts:
+        run.merge(part)
+    run.running_means.append(run.estimate()["mean"])
+    run.checkpoints.append(run.n_done)
+    return run
+
+
+@profiled("summarize_result")
+def summarize_result(
+    result: SimulationResult,
+    variables: list[dict],
+    antithetic: bool = False,
+    control_variates: bool = False,
+    rows: int = CHUNK_ROWS,
+    formula: str | None = None,
+) -> ConvergenceRun:
+    """
+    이미 만들어진 결과(메모리 또는 디스크)를 청크 단위로 읽어 누적 통계를 만듭니다.
+    반환된 ConvergenceRun 의 summary() / estimate() / histogram 을 그대로 쓸 수 있고,
+    메모리 사용량은 청크 크기로 제한됩니다.
+    """
+    run = ConvergenceRun(
+        variables, 0, keep_samples=False, antithetic=antithetic,
+        control_variates=control_variates, formula=formula,
+    )
+    rows += rows % 2  # 대립 변량 쌍이 청크 경계에서 끊기지 않도록
+    for chunk in result.iter_chunks(rows):
+        run.add_chunk(chunk)
+    return run
+
+
+def auto_convergence(
+    variables: list[dict],
+    tol: float = 1e-3,
+    min_iter: int = 1_000,
+    max_iter: int = 100_000,
+    chunk: int = 1_000,
+    seed: int | None = None,
+    workers: int = 1,
+    pool: Executor | None = None,
+    method: str = "random",
+    antithetic: bool = False,
+    control_variates: bool = False,
+    dtype=np.float64,
+    formula: str | None = None,
+    rel_se: float | None = None,
+    band_tol: float | None = None,
+    growth: float = 2.0,
+) -> tuple[SimulationResult, list[float]]:
+    """
+    목표 정밀도(rel_se / band_tol)에 도달하거나 평균값 변화가 tol 미만으로 안정화되면
+    시뮬레이션을 중단합니다 (기준은 stream_convergence 참고).
+    반환: (최종 SimulationResult, running_means 리스트)
+    """
+    run = stream_convergence(
+        variables, tol, min_iter, max_iter, chunk,
+        seed=seed, workers=workers, pool=pool, method=method,
+        antithetic=antithetic, control_variates=control_variates, dtype=dtype, formula=formula,
+        rel_se=rel_se, band_tol=band_tol, growth=growth,
+    )
+    return run.to_result(), run.running_means
 
 
 # ─────────────────────────────────────────────
 # 4. 신뢰 구간 계산
 # ─────────────────────────────────────────────
-def calc_confidence_interval(results: np.ndarray) -> dict:
-    """5th / 95th percentile 기반 90% CI 반환."""
-    return {
-        "p5": float(np.percentile(results, 5)),
-        "p95": float(np.percentile(results, 95)),
+@profiled("percentiles")
+def calc_confidence_interval(
+    results: np.ndarray, estimator: dict | None = None, quantiles: tuple = ()
+) -> dict:
+    """
+    5th / 95th percentile 기반 90% CI 반환.
+    estimator(estimate_mean / ConvergenceRun.estimate 결과)를 주면 평균을 분산 감소
+    추정값으로 바꾸고 'se', 'ess', 'n' 을 함께 담습니다.
+    quantiles 에 추가 분위수(0~1)를 주면 'quantiles' 에 {q: 값} 으로 담습니다.
+    NaN / ±inf 결과는 빼고 계산합니다 (유한한 값이 없으면 모두 NaN).
+    """
+    finite = np.isfinite(results)
+    if not finite.all():
+        results = results[finite]
+    if len(results) == 0:
+        results = np.array([np.nan])
+    # P5 / P50 / P95 (+ 요청 분위수) 를 한 번의 partition 으로 계산합니다.
+    qs = np.percentile(results, [5, 50, 95] + [100 * q for q in quantiles])
+    ci = {
+        "p5": float(qs[0]),
+        "p95": float(qs[2]),
         "mean": float(np.mean(results)),
-        "median": float(np.median(results)),
+        "median": float(qs[1]),
         "std": float(np.std(results)),
     }
+    if quantiles:
+        ci["quantiles"] = dict(zip(quantiles, map(float, qs[3:])))
+    if estimator is not None:
+        ci.update(estimator)
+    return ci
+
+
+def sketch_confidence_interval(
+    sketch: QuantileSketch,
+    stats: RunningStats,
+    estimator: dict | None = None,
+    quantiles: tuple = (),
+) -> dict:
+    """
+    통계 전용 모드: 원본 표본 대신 분위수 스케치와 RunningStats 로
+    calc_confidence_interval 과 같은 형식의 요약을 계산합니다.
+    """
+    qs = sketch.quantile(np.array([0.05, 0.5, 0.95, *quantiles]))
+    ci = {
+        "p5": float(qs[0]),
+        "p95": float(qs[2]),
+        "mean": float(stats.mean),
+        "median": float(qs[1]),
+        "std": float(stats.std),
+    }
+    if quantiles:
+        ci["quantiles"] = dict(zip(quantiles, map(float, qs[3:])))
+    if estimator is not None:
+        ci.update(estimator)
+    return ci
+
+
+# ─────────────────────────────────────────────
+# 4-1. 꼬리 확률 (중요도 샘플링)
+# ─────────────────────────────────────────────
+def _likelihood_ratio(z: np.ndarray, shift: np.ndarray) -> np.ndarray:
+    """N(0, I) / N(shift, I) 밀도비 exp(-shift·z + |shift|²/2) (z: (k, n))."""
+    return np.exp(shift @ shift / 2 - shift @ z)
+
+
+@profiled("tail_probability")
+def tail_probability(
+    variables: list[dict],
+    threshold: float,
+    side: str = "below",
+    n: int = 100_000,
+    seed: int | None = None,
+    formula: str | None = None,
+    level: float = 0.95,
+    ce_samples: int = 10_000,
+    rho: float = 0.1,
+    ce_iter: int = 20,
+) -> dict:
+    """
+    결과가 threshold 보다 작을(side='below') / 클('above') 확률을 중요도 샘플링으로 추정합니다.
+
+    모든 변수를 표준정규 점수 z 로 나타내고(x_j = F_j⁻¹(Φ(z_j)), 상관이 있으면 copula 인자를 곱함),
+    z 를 평균이 shift 만큼 옮겨진 N(shift, I) 에서 뽑아 우도비로 가중합니다. shift 는 교차 엔트로피법으로
+    고릅니다: 예비 표본(ce_samples) 중 꼬리 쪽 rho 비율의 우도비 가중 평균으로 shift 를 갱신하면서
+    기준을 threshold 까지 단계적으로 옮깁니다. 어떤 shift 를 쓰든 추정은 불편이며, shift 는 분산만 줄입니다.
+    분포 모양(경험 분포 포함)이나 결과 모델(가중합 / 수식)과 관계없이 쓸 수 있고,
+    본 추정은 BLOCK_SIZE 청크로 누적하므로 메모리가 n 과 무관합니다.
+
+    반환: {'prob', 'se', 'low', 'high' (level 신뢰구간), 'n', 'hits' (꼬리에 든 표본 수),
+           'ess' (꼬리 표본 가중치의 유효 표본 수), 'efficiency' (같은 SE 를 내려면 단순 샘플링에
+           필요한 반복 횟수 ÷ n), 'shift' ({변수명: 이동량}), 'ce_iterations', 'side', 'threshold'}
+    """
+    if side not in ("below", "above"):
+        raise ValueError(f"side 는 'below' 또는 'above' 여야 합니다: {side}")
+    plan = SimulationPlan(variables, formula=formula)
+    k = len(variables)
+    sign = 1.0 if side == "below" else -1.0
+    target = sign * threshold
+
+    def score(z: np.ndarray) -> np.ndarray:
+        """작을수록 꼬리에 가까운 값 (sign × 결과). 계산할 수 없는 결과는 꼬리 밖(inf)으로 둡니다."""
+        u = norm_cdf(z if plan.copula is None else plan.copula @ z)
+        values = np.empty_like(u)
+        for j, var in enumerate(variables):
+            values[j] = inverse_cdf(var["dist"], var["min"], var["max"], u[j], var.get("table"))
+        g = sign * combine_inputs(variables, values, plan.formula)
+        return np.where(np.isnan(g), np.inf, g)
+
+    ce_seed, main_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(ce_seed)
+    shift = np.zeros(k)
+    iterations = 0
+    with stage("cross_entropy", n=ce_samples):
+        for iterations in range(1, ce_iter + 1):
+            z = rng.standard_normal((k, ce_samples)) + shift[:, None]
+            g = score(z)
+            gamma = max(target, float(np.quantile(g, rho)))
+            elite = g <= gamma
+            if not elite.any():
+                break
+            w = _likelihood_ratio(z[:, elite], shift)
+            shift = (z[:, elite] * w).sum(axis=1) / w.sum()
+            if gamma <= target:
+                break
+
+    stats = RunningStats()
+    hits, w_sum, w_sq = 0, 0.0, 0.0
+    sizes = [min(BLOCK_SIZE, n - start) for start in range(0, n, BLOCK_SIZE)]
+    for size, block_seed in zip(sizes, main_seed.spawn(len(sizes))):
+        with stage("sample", n=size):
+            z = np.random.default_rng(block_seed).standard_normal((k, size))
+            z += shift[:, None]
+            hit = score(z) <= target
+        y = np.zeros(size)
+        y[hit] = _likelihood_ratio(z[:, hit], shift)
+        stats.update(y)
+        hits += int(hit.sum())
+        w_sum += float(y.sum())
+        w_sq += float(y @ y)
+
+    prob, se = float(stats.mean), float(stats.sem)
+    half = float(norm_ppf(np.array([0.5 + level / 2]))[0]) * se
+    return {
+        "prob": prob,
+        "se": se,
+        "low": max(prob - half, 0.0),
+        "high": min(prob + half, 1.0),
+        "n": n,
+        "hits": hits,
+        "ess": w_sum**2 / w_sq if w_sq > 0 else 0.0,
+        "efficiency": prob * (1 - prob) / (n * se**2) if se > 0 else np.inf,
+        "shift": {var["name"]: float(mu) for var, mu in zip(variables, shift)},
+        "ce_iterations": iterations,
+        "side": side,
+        "threshold": float(threshold),
+    }
 
 
 # ─────────────────────────────────────────────
 # 5. 수렴 추이 (고정 횟수 버전용)
 # ─────────────────────────────────────────────
+@profiled("running_mean")
 def calc_running_mean(results: np.ndarray, n_points: int = 200) -> tuple[np.ndarray, np.ndarray]:
-    """결과 배열에서 running mean 추이를 균등 간격으로 샘플링해 반환합니다."""
+    """
+    결과 배열에서 running mean 추이를 균등 간격으로 샘플링해 반환합니다.
+    NaN / ±inf 결과는 합과 개수 모두에서 뺍니다.
+    """
     total = len(results)
     indices = np.linspace(100, total, n_points, dtype=int)
-    means = [results[:i].mean() for i in indices]
-    return indices, np.array(means)
+    # 청크별 누적합으로 한 번만 훑습니다 (디스크 결과도 청크 단위로만 읽음).
+    positions = np.clip(indices, 1, total)
+    means = np.empty(len(indices))
+    running = 0.0
+    counted = 0
+    for start in range(0, total, CHUNK_ROWS):
+        chunk = results[start : start + CHUNK_ROWS]
+        finite = np.isfinite(chunk)
+        if finite.all():
+            csum = np.cumsum(chunk, dtype=float) + running
+            ccount = np.arange(counted + 1, counted + len(chunk) + 1)
+        else:
+            csum = np.cumsum(np.where(finite, chunk, 0.0), dtype=float) + running
+            ccount = np.cumsum(finite) + counted
+        hit = (positions > start) & (positions <= start + len(csum))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means[hit] = csum[positions[hit] - start - 1] / ccount[positions[hit] - start - 1]
+        running, counted = csum[-1], ccount[-1]
+    return indices, means
 
 
 # ─────────────────────────────────────────────
 # 6. 민감도 분석 (토네이도 차트용)
 # ─────────────────────────────────────────────
-def sensitivity_analysis(df: pd.DataFrame, target: str = "result") -> pd.Series:
+@profiled("correlations")
+def sensitivity_analysis(
+    data: SimulationResult | pd.DataFrame, target: str = "result"
+) -> pd.Series:
     """
     각 입력 변수와 결과값 사이의 Pearson 상관계수를 계산합니다.
     절댓값 내림차순으로 정렬된 Series를 반환합니다.
+    SimulationResult 는 DataFrame 으로 변환하지 않고 배열 청크 위에서 바로 계산합니다
+    (평균 → 중심화 곱의 합, 두 번 훑음). 디스크 결과도 청크만 읽습니다.
+    결과가 NaN / ±inf 인 행은 빼고 계산합니다.
     """
-    input_cols = [c for c in df.columns if c != target]
-    corr = df[input_cols].corrwith(df[target])
+    if not isinstance(data, SimulationResult):  # pandas DataFrame
+        input_cols = [c for c in data.columns if c != target]
+        finite = np.isfinite(data[target])
+        corr = data.loc[finite, input_cols].corrwith(data.loc[finite, target])
+    else:
+        def finite_chunks():
+            for chunk in data.iter_chunks():
+                finite = np.isfinite(chunk[-1])
+                yield chunk if finite.all() else chunk[:, finite]
+
+        n = 0
+        sums = np.zeros(len(data.names) + 1)
+        for chunk in finite_chunks():
+            n += chunk.shape[1]
+            sums += chunk.sum(axis=1, dtype=float)
+        means = sums / max(n, 1)
+        sxx = np.zeros(len(data.names))
+        sxy = np.zeros(len(data.names))
+        syy = 0.0
+        for chunk in finite_chunks():
+            centered = chunk - means[:, None]
+            x, y = centered[:-1], centered[-1]
+            sxx += np.einsum("ij,ij->i", x, x)
+            sxy += x @ y
+            syy += y @ y
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = sxy / np.sqrt(sxx * syy)
+        import pandas as pd
+
+        corr = pd.Series(values, index=data.names, dtype=float)
     return corr.reindex(corr.abs().sort_values(ascending=False).index)
+
+
+# ─────────────────────────────────────────────
+# 6-0. 부트스트랩 구간 (분위수 / 평균 / 상관계수)
+# ─────────────────────────────────────────────
+BOOT_BATCHES = 512
+# 분위수 창 폭에 더하는 여유: 스케치 순위 오차(약 1.7 / k)의 두 배 남짓 + 재표본 분위수 순위의 8σ
+_BOOT_WINDOW_SIGMA = 8.0
+
+
+@profiled("bootstrap")
+def bootstrap_intervals(
+    result: SimulationResult,
+    n_boot: int = 500,
+    level: float = 0.90,
+    seed: int | None = None,
+    batches: int = BOOT_BATCHES,
+    bins: int = 256,
+) -> dict:
+    """
+    P5 / 중앙값 / P95 / 평균 / 표준편차와 변수별 Pearson 상관계수의 부트스트랩 구간 (level 백분위 구간).
+
+    표본을 이어진 batches 개 묶음으로 나누고, 묶음마다 충분통계(개수, 중심화 합 / 제곱합 / 곱의 합)를
+    한 번 훑어 만듭니다. 재표본은 묶음별 Poisson(1) 가중치 (n_boot, 묶음 수) 행렬 하나이고,
+    모든 재표본의 통계를 가중치 × 묶음 통계 행렬곱으로 한 번에 계산합니다.
+    분위수는 첫 번째 훑기에서 만든 분위수 스케치로 재표본 분위수가 놓일 좁은 창
+    [Q(p - d), Q(p + d)] 을 잡고, 묶음마다 창 아래 개수(정확한 꼬리)와 창 안의 bins 구간
+    히스토그램을 세어 선형 보간합니다. 해상도는 창 폭 / bins 라서 치우친 결과에서도
+    표본 순서통계량과 거의 같고, 창을 벗어나는 재표본이 있으면 창을 넓혀 그 분위수만 다시 셉니다.
+    비용은 표본 두 번 읽기(평균 / 스케치, 묶음 통계) + n_boot × 묶음 수 × bins 곱이며,
+    메모리는 청크 크기와 3 × 묶음 수 × bins 로 제한됩니다 (디스크 결과도 청크만 읽음).
+    묶음 크기는 짝수라서 대립 변량 쌍이 한 묶음에 함께 들어갑니다.
+    결과가 NaN / ±inf 인 행은 모든 통계에서 뺍니다.
+
+    반환: {'mean', 'std', 'p5', 'median', 'p95': (하한, 상한),
+           'correlations': {변수명: (하한, 상한)}, 'n_boot', 'level'}
+    """
+    if len(result) < 4:
+        raise ValueError("부트스트랩에는 표본이 4개 이상 필요합니다.")
+    k = len(result.names)
+    size = -(-len(result) // max(min(batches, len(result) // 2), 1))
+    size += size % 2
+    m = -(-len(result) // size)
+    rows = max(CHUNK_ROWS // size, 1) * size  # 청크 경계가 묶음 경계와 맞도록
+
+    def finite_chunks():
+        """(첫 묶음 번호, 청크, 유한한 결과 마스크, 청크 안 묶음 번호)"""
+        start = 0
+        for chunk in result.iter_chunks(rows):
+            c = chunk.shape[1]
+            yield start // size, chunk, np.isfinite(chunk[-1]), np.arange(c) // size
+            start += c
+
+    # 1) 중심화 기준(평균)과 분위수 창을 잡을 스케치
+    shift = np.zeros(k + 1)
+    sketch = QuantileSketch(seed=seed)
+    n = 0
+    for _, chunk, finite, _ in finite_chunks():
+        kept = chunk if finite.all() else chunk[:, finite]
+        n += kept.shape[1]
+        shift += kept.sum(axis=1, dtype=float)
+        sketch.update(kept[-1])
+    if n < 4:
+        raise ValueError("부트스트랩에는 유한한 결과가 4개 이상 필요합니다.")
+    shift /= n
+
+    targets = (("p5", 0.05), ("median", 0.5), ("p95", 0.95))
+    spread = {key: 4 / sketch.k + _BOOT_WINDOW_SIGMA * np.sqrt(p * (1 - p) / n) for key, p in targets}
+
+    def window(key: str, p: float) -> tuple[float, float]:
+        d = spread[key]
+        lo = sketch.min if p - d <= 0 else float(sketch.quantile(p - d))
+        hi = sketch.max if p + d >= 1 else float(sketch.quantile(p + d))
+        return lo, hi if hi > lo else lo + 1.0
+
+    def count_window(counts: dict, key: str, first: int, y, finite, batch) -> None:
+        """묶음별 창 아래 개수와 창 안 히스토그램을 더합니다."""
+        lo, hi, below, hist = counts[key]
+        y, batch = y[finite], batch[finite]
+        nb = int(batch[-1]) + 1 if len(batch) else 0
+        span = slice(first, first + nb)
+        below[span] += np.bincount(batch[y < lo], minlength=nb)
+        inside = (y >= lo) & (y <= hi)
+        idx = np.minimum(((y[inside] - lo) * (bins / (hi - lo))).astype(np.intp), bins - 1)
+        idx += batch[inside] * bins
+        hist[span] += np.bincount(idx, minlength=nb * bins).reshape(nb, bins)
+
+    def new_counts(key: str, p: float) -> tuple:
+        return (*window(key, p), np.zeros(m), np.zeros((m, bins)))
+
+    # 2) 묶음별 충분통계 [개수, Σy, Σy², Σx, Σx², Σxy] 와 분위수 창 도수
+    stats = np.zeros((m, 3 + 3 * k))
+    counts = {key: new_counts(key, p) for key, p in targets}
+    for first, chunk, finite, batch in finite_chunks():
+        c = chunk.shape[1]
+        offsets = np.arange(0, c, size)
+        span = slice(first, first + len(offsets))
+        centered = chunk - shift[:, None]
+        x, y = centered[:-1], centered[-1]
+        if not finite.all():
+            y = np.where(finite, y, 0.0)
+            x = x * finite
+        stats[span, 0] = np.add.reduceat(finite.astype(float), offsets)
+        stats[span, 1] = np.add.reduceat(y, offsets)
+        stats[span, 2] = np.add.reduceat(y * y, offsets)
+        stats[span, 3 : 3 + k] = np.add.reduceat(x, offsets, axis=1).T
+        stats[span, 3 + k : 3 + 2 * k] = np.add.reduceat(x * x, offsets, axis=1).T
+        stats[span, 3 + 2 * k :] = np.add.reduceat(x * y, offsets, axis=1).T
+        for key in counts:
+            count_window(counts, key, first, chunk[-1], finite, batch)
+
+    # 3) 재표본: Poisson(1) 묶음 가중치 × 묶음 통계
+    weights = np.random.default_rng(seed).poisson(1.0, (n_boot, m)).astype(float)
+    sums = weights @ stats
+    count = np.maximum(sums[:, 0], 1.0)
+    ey, eyy = sums[:, 1] / count, sums[:, 2] / count
+    ex = sums[:, 3 : 3 + k] / count[:, None]
+    exx = sums[:, 3 + k : 3 + 2 * k] / count[:, None]
+    exy = sums[:, 3 + 2 * k :] / count[:, None]
+    var_y = np.maximum(eyy - ey**2, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (exy - ex * ey[:, None]) / np.sqrt(np.maximum(exx - ex**2, 0.0) * var_y[:, None])
+
+    # 분위수: 재표본 누적 도수 = 창 아래 개수 + 창 안 누적 히스토그램.
+    # 목표 순위가 창 밖인 재표본이 있으면 창을 넓혀 그 분위수만 다시 셉니다 (창이 전체 범위면 항상 안).
+    rows_b = np.arange(n_boot)
+    replicate_q = {}
+    pending = dict(targets)
+    while pending:
+        retry = {}
+        for key, p in pending.items():
+            lo, hi, below, hist = counts[key]
+            target = p * sums[:, 0]
+            base = weights @ below
+            cum = base[:, None] + weights @ np.cumsum(hist, axis=1)
+            if (lo > sketch.min and np.any(base >= target)) or (
+                hi < sketch.max and np.any(cum[:, -1] < target)
+            ):
+                spread[key] *= 4
+                retry[key] = p
+                continue
+            pos = np.minimum((cum < target[:, None]).sum(axis=1), bins - 1)
+            upper = cum[rows_b, pos]
+            lower = np.where(pos > 0, cum[rows_b, pos - 1], base)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                frac = np.clip(np.nan_to_num((target - lower) / (upper - lower)), 0.0, 1.0)
+            replicate_q[key] = lo + (pos + frac) * ((hi - lo) / bins)
+        if retry:
+            counts.update({key: new_counts(key, p) for key, p in retry.items()})
+            for first, chunk, finite, batch in finite_chunks():
+                for key in retry:
+                    count_window(counts, key, first, chunk[-1], finite, batch)
+        pending = retry
+
+    tails = [50 * (1 - level), 50 * (1 + level)]
+
+    def interval(values: np.ndarray) -> tuple[float, float]:
+        low, high = np.nanpercentile(values, tails, axis=0)
+        return float(low), float(high)
+
+    out = {
+        "mean": interval(ey + shift[-1]),
+        "std": interval(np.sqrt(var_y)),
+        **{key: interval(replicate_q[key]) for key, _ in targets},
+        "n_boot": n_boot,
+        "level": level,
+    }
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 상수 변수의 상관계수는 nan
+        low, high = np.nanpercentile(corr, tails, axis=0)
+    out["correlations"] = {
+        name: (float(a), float(b)) for name, a, b in zip(result.names, low, high)
+    }
+    return out
+
+
+# ─────────────────────────────────────────────
+# 6-1. 분산 기반 민감도 (Sobol 지수)
+# ─────────────────────────────────────────────
+def _sobol_estimates(f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray) -> tuple:
+    """Saltelli(2010) 1차 지수와 Jansen 총 효과 지수. f_ab 는 (변수 수, n)."""
+    var = np.concatenate([f_a, f_b]).var()
+    if var == 0:
+        return np.zeros(len(f_ab)), np.zeros(len(f_ab))
+    first = (f_b * (f_ab - f_a)).mean(axis=1) / var
+    total = 0.5 * ((f_a - f_ab) ** 2).mean(axis=1) / var
+    return first, total
+
+
+@profiled("sobol")
+def sobol_indices(
+    variables: list[dict],
+    n: int = 8_192,
+    seed: int | None = None,
+    method: str = "random",
+    formula: str | None = None,
+    n_boot: int = 200,
+    level: float = 0.90,
+    batches: int = BOOT_BATCHES,
+) -> pd.DataFrame:
+    """
+    분산 기반 전역 민감도 (Sobol 1차 / 총 효과 지수) 와 bootstrap 신뢰 구간.
+
+    (2 × 변수 수) 차원 균등 설계를 A / B 두 행렬로 나누고, i 번째 행만 B 에서 가져온
+    AB_i 행렬 k 개를 (변수 수, k × n) 배열 하나로 쌓아 결과 모델을 한 번에 평가합니다
+    (k + 2 번의 시뮬레이션 대신 몇 번의 큰 벡터 연산). 입력은 서로 독립이라고 가정하므로
+    변수 간 상관(corr)은 이 분석에서 무시합니다.
+    bootstrap 은 bootstrap_intervals 와 같은 묶음별 Poisson(1) 가중치 방식이라
+    재표본마다 표본을 다시 뽑지 않고 (n_boot, 묶음 수) 행렬곱 한 번으로 끝납니다.
+
+    반환: 변수별 S1 / S1_low / S1_high / ST / ST_low / ST_high DataFrame (ST 내림차순).
+    S1 은 변수 하나만의 기여, ST 는 상호작용까지 포함한 기여이며 ST - S1 이 상호작용 몫입니다.
+    """
+    k = len(variables)
+    names = [var["name"] for var in variables]
+    rng = np.random.default_rng(seed)
+    u = uniform_design(method, n, 2 * k, rng)
+    f_a = np.empty(n)
+    f_b = np.empty(n)
+    f_ab = np.empty((k, n))
+    # AB_i 를 쌓은 배열이 CHUNK_ROWS × 변수 수 원소를 넘지 않도록 열 방향으로 나눕니다.
+    step = max(1, CHUNK_ROWS // max(k, 1))
+    for start in range(0, n, step):
+        cols = slice(start, min(start + step, n))
+        m = cols.stop - start
+        x_a = np.empty((k, m))
+        x_b = np.empty((k, m))
+        for j, var in enumerate(variables):
+            x_a[j] = inverse_cdf(var["dist"], var["min"], var["max"], u[j, cols], var.get("table"))
+            x_b[j] = inverse_cdf(
+                var["dist"], var["min"], var["max"], u[k + j, cols], var.get("table")
+            )
+        stacked = np.empty((k, k + 2, m))
+        stacked[:] = x_a[:, None, :]
+        stacked[:, k + 1] = x_b
+        idx = np.arange(k)
+        stacked[idx, idx] = x_b  # AB_i: i 번째 블록의 i 번째 변수만 B 값
+        f = combine_inputs(variables, stacked.reshape(k, -1), formula).reshape(k + 2, m)
+        f_ab[:, cols] = f[:k]
+        f_a[cols] = f[k]
+        f_b[cols] = f[k + 1]
+
+    first, total = _sobol_estimates(f_a, f_b, f_ab)
+
+    # 두 지수와 분산은 모두 표본별 값의 평균이므로, 이어진 묶음마다
+    # [개수, Σ(a+b), Σ(a²+b²) (a, b 는 중심화한 f_a, f_b), Σ f_b(f_ab - f_a), Σ(f_a - f_ab)²]
+    # 를 한 번 합산해 두고 Poisson(1) 묶음 가중치와의 행렬곱으로 모든 재표본을 계산합니다.
+    m = min(batches, n)
+    offsets = np.arange(m) * n // m
+    shift = 0.5 * (f_a.mean() + f_b.mean())
+    c_a, c_b = f_a - shift, f_b - shift
+    stats = np.empty((m, 3 + 2 * k))
+    stats[:, 0] = np.diff(np.append(offsets, n))
+    stats[:, 1] = np.add.reduceat(c_a + c_b, offsets)
+    stats[:, 2] = np.add.reduceat(c_a * c_a + c_b * c_b, offsets)
+    stats[:, 3 : 3 + k] = np.add.reduceat(f_b * (f_ab - f_a), offsets, axis=1).T
+    stats[:, 3 + k :] = np.add.reduceat((f_a - f_ab) ** 2, offsets, axis=1).T
+    sums = rng.poisson(1.0, (n_boot, m)).astype(float) @ stats
+    count = np.maximum(sums[:, :1], 1.0)
+    var = sums[:, 2:3] / (2 * count) - (sums[:, 1:2] / (2 * count)) ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        boot_first = np.where(var > 0, sums[:, 3 : 3 + k] / count / var, 0.0)
+        boot_total = np.where(var > 0, 0.5 * sums[:, 3 + k :] / count / var, 0.0)
+    tail = 100 * (1 - level) / 2
+    lo_first, hi_first = np.percentile(boot_first, [tail, 100 - tail], axis=0)
+    lo_total, hi_total = np.percentile(boot_total, [tail, 100 - tail], axis=0)
+    import pandas as pd
+
+    table = pd.DataFrame(
+        {
+            "S1": first, "S1_low": lo_first, "S1_high": hi_first,
+            "ST": total, "ST_low": lo_total, "ST_high": hi_total,
+        },
+        index=names,
+    )
+    return table.sort_values("ST", ascending=False)
+
+
+# ─────────────────────────────────────────────
+# 7. 시나리오 비교 (공통 난수, CRN)
+# ─────────────────────────────────────────────
+def compare_scenarios(
+    scenarios: list[dict],
+    n_iter: int,
+    seed: int | None = None,
+    level: float = 0.90,
+    method: str = "random",
+) -> dict:
+    """
+    여러 시나리오를 같은 변수명끼리 동일한 균등 난수로 실행해 쌍별 차이를 비교합니다.
+
+    scenarios: scenarios.load_scenario 형식의 dict 목록 ({'name', 'variables', ...})
+               settings 에 'formula' 가 있으면 그 시나리오의 결과 수식을 씁니다
+    method   : 공통 균등 난수를 만드는 샘플링 방식 (SAMPLING_METHODS 참고)
+    반환: {
+        'results': {시나리오명: 결과 배열},
+        'pairs'  : 쌍별 차이 (A - B) 요약 DataFrame
+                   mean_diff / se / ci_low / ci_high / p5 / p95 / prob_a_gt_b
+                   + 독립 난수였을 때의 표준오차(se_independent)와 분산 감소 배수
+    }
+    """
+    rng = np.random.default_rng(seed)
+    names = list(dict.fromkeys(var["name"] for sc in scenarios for var in sc["variables"]))
+    uniforms = dict(zip(names, uniform_design(method, n_iter, len(names), rng)))
+
+    results = {}
+    for sc in scenarios:
+        variables = sc["variables"]
+        u = np.stack([uniforms[var["name"]] for var in variables])
+        corr = correlation_matrix(variables)
+        if corr is not None:
+            u = correlate_uniforms(u, copula_factor(corr)[0])
+        values = np.empty((len(variables), n_iter))
+        for j, var in enumerate(variables):
+            values[j] = inverse_cdf(var["dist"], var["min"], var["max"], u[j], var.get("table"))
+        formula = sc.get("settings", {}).get("formula")
+        results[sc["name"]] = combine_inputs(variables, values, formula)
+
+    z = float(norm_ppf(0.5 + level / 2))
+    rows = []
+    labels = list(results)
+    for i, a in enumerate(labels):
+        for b in labels[i + 1 :]:
+            diff = results[a] - results[b]
+            se = float(diff.std(ddof=1) / np.sqrt(n_iter))
+            se_ind = float(np.sqrt((results[a].var(ddof=1) + results[b].var(ddof=1)) / n_iter))
+            mean = float(diff.mean())
+            rows.append({
+                "a": a,
+                "b": b,
+                "mean_diff": mean,
+                "se": se,
+                "ci_low": mean - z * se,
+                "ci_high": mean + z * se,
+                "p5": float(np.percentile(diff, 5)),
+                "p95": float(np.percentile(diff, 95)),
+                "prob_a_gt_b": float((diff > 0).mean()),
+                "se_independent": se_ind,
+                "variance_reduction": se_ind ** 2 / se ** 2 if se > 0 else np.inf,
+            })
+
+    import pandas as pd
+
+    return {"results": results, "pairs": pd.DataFrame(rows)}
+
+
+# ─────────────────────────────────────────────
+# 7-1. 일괄 시나리오 / 파라미터 그리드 (한 번에 벡터 평가)
+# ─────────────────────────────────────────────
+def parameter_grid(variables: list[dict], grid: dict, formula: str | None = None) -> list[dict]:
+    """
+    기준 변수 목록에서 파라미터 조합마다 시나리오 하나를 만듭니다 (sweep_scenarios 입력 형식).
+
+    grid: {"변수명.필드": [값, ...]} — 필드는 min / max / weight / dist
+    예) {"단가.max": [12, 15], "수량.weight": [1, 2]} → 4개 시나리오
+    조회표(table)가 없는 변수가 어느 조합에서든 '경험' 분포가 되면 시나리오를 만들기 전에 ValueError.
+    """
+    keys = list(grid)
+    targets = []
+    for key in keys:
+        name, _, field = key.rpartition(".")
+        if field not in ("min", "max", "weight", "dist") or not any(
+            v["name"] == name for v in variables
+        ):
+            raise ValueError(f"그리드 항목을 해석할 수 없습니다: {key}")
+        targets.append((name, field))
+    for v in variables:
+        dists = {v["dist"]}
+        for (name, field), key in zip(targets, keys):
+            if name == v["name"] and field == "dist":
+                dists = set(grid[key])
+        if "경험" in dists and not v.get("table"):
+            raise ValueError(f"'{v['name']}': 경험 분포에는 조회표(table)가 필요합니다.")
+    scenarios = []
+    # 값 인덱스의 모든 조합 (앞쪽 항목이 가장 느리게 바뀌는 순서)
+    for combo in product(*(range(len(grid[key])) for key in keys)):
+        sc_vars = [dict(v) for v in variables]
+        labels = []
+        for (name, field), key, i in zip(targets, keys, combo):
+            value = grid[key][i]
+            for v in sc_vars:
+                if v["name"] == name:
+                    v[field] = value
+            labels.append(f"{key}={value}")
+        scenarios.append({
+            "name": ", ".join(labels),
+            "variables": sc_vars,
+            "settings": {"formula": formula},
+        })
+    return scenarios
+
+
+def _as_index(idx) -> np.ndarray | slice:
+    """연속된 인덱스는 slice 로 바꿔 fancy indexing 복사를 피합니다."""
+    idx = np.asarray(idx)
+    if len(idx) and np.array_equal(idx, np.arange(idx[0], idx[0] + len(idx))):
+        return slice(int(idx[0]), int(idx[0]) + len(idx))
+    return idx
+
+
+@profiled("sweep")
+def sweep_scenarios(
+    scenarios: list[dict],
+    n_iter: int = 10_000,
+    seed: int | None = None,
+    method: str = "random",
+    threshold: float | None = None,
+    max_elements: int = 1 << 22,
+) -> pd.DataFrame:
+    """
+    여러 시나리오를 (변수 × 시나리오 × 반복) 3-D 배열로 쌓아 한 번에 평가하고
+    시나리오별 요약 통계 표를 반환합니다.
+
+    모든 시나리오는 같은 변수명 집합을 가져야 합니다 (범위/분포/가중치/수식/상관은 달라도 됨).
+    변수마다 같은 균등 난수를 공유하므로(CRN) 시나리오 간 차이는 설정 차이만 반영합니다.
+    청크 하나의 원소 수가 max_elements 를 넘지 않도록 반복 방향으로 나눠 계산하며,
+    분위수는 시나리오별 분위수 스케치(순위 오차 약 1.7 / k)로 근사하므로 메모리는 n_iter 와
+    무관하고, 결과 범위가 넓거나 치우쳐도 정확도가 떨어지지 않습니다.
+    결과가 NaN / ±inf 인 행은 통계에서 빼며 n 은 유한한 결과 수입니다.
+
+    반환 컬럼: n / mean / se / std / min / p5 / median / p95 / max (+ threshold 지정 시 prob_above)
+    """
+    if not scenarios:
+        raise ValueError("시나리오가 없습니다.")
+    base = [v["name"] for v in scenarios[0]["variables"]]
+    k, S = len(base), len(scenarios)
+    models = []
+    for sc in scenarios:
+        by_name = {v["name"]: v for v in sc["variables"]}
+        if sorted(by_name) != sorted(base):
+            raise ValueError(f"'{sc['name']}' 의 변수 목록이 첫 시나리오와 다릅니다.")
+        models.append([by_name[name] for name in base])
+
+    # 변수별 (시나리오,) 파라미터 배열과, 같은 분포끼리 묶은 시나리오 인덱스
+    mins = np.array([[v["min"] for v in m] for m in models], dtype=float).T   # (k, S)
+    maxs = np.array([[v["max"] for v in m] for m in models], dtype=float).T
+    weights = np.stack([_normalized_weights(m) for m in models])           # (S, k)
+
+    # 상관 행렬 / 결과 수식이 같은 시나리오끼리 묶어 한 번씩만 처리합니다.
+    copulas: dict = {}
+    for s_idx, m in enumerate(models):
+        corr = correlation_matrix(m)
+        key = None if corr is None else corr.tobytes()
+        factor = None if corr is None else copula_factor(corr)[0]
+        copulas.setdefault(key, (factor, []))[1].append(s_idx)
+    # 상관 그룹마다 (변수, 분포, 시나리오 인덱스) 단위로 역변환을 묶어 둡니다.
+    # 경험 분포는 조회표가 같은 시나리오끼리만 묶습니다.
+    fills = []
+    for factor, members in copulas.values():
+        groups = []
+        for j in range(k):
+            keys = [
+                (models[s_idx][j]["dist"], tuple(models[s_idx][j].get("table") or ()))
+                for s_idx in members
+            ]
+            for key in dict.fromkeys(keys):
+                idx = np.asarray(members)[[other == key for other in keys]]
+                groups.append((j, key[0], key[1] or None, _as_index(idx)))
+        fills.append((factor, groups))
+    formulas: dict = {}
+    for s_idx, sc in enumerate(scenarios):
+        formulas.setdefault(sc.get("settings", {}).get("formula") or None, []).append(s_idx)
+    formulas = {formula: _as_index(members) for formula, members in formulas.items()}
+
+    seed_seq = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seed_seq)
+    scramble = int(seed_seq.generate_state(1, np.uint64)[0])
+    # 시나리오마다 남는(유한한) 결과 수가 다를 수 있어 통계와 스케치를 시나리오별로 둡니다.
+    stats = [RunningStats() for _ in range(S)]
+    sketches = [QuantileSketch(seed=child) for child in seed_seq.spawn(S)]
+    above = np.zeros(S)
+    chunk = int(max(256, min(n_iter, max_elements // (S * (k + 1)))))
+
+    values = np.empty((k, S, chunk))
+    result = np.empty((S, chunk))
+    for start in range(0, n_iter, chunk):
+        m = min(chunk, n_iter - start)
+        u = uniform_design(method, m, k, rng, start=start, scramble=scramble)
+        vals = values[:, :, :m]
+        for factor, groups in fills:
+            u_g = u if factor is None else correlate_uniforms(u, factor)
+            for j, dist, table, idx in groups:
+                vals[j, idx] = inverse_cdf(
+                    dist, mins[j, idx][:, None], maxs[j, idx][:, None], u_g[j][None, :], table
+                )
+        out = result[:, :m]
+        for formula, members in formulas.items():
+            if formula is None:
+                out[members] = np.einsum("sk,ksm->sm", weights[members], vals[:, members])
+            else:
+                plan = compile_formula(formula, tuple(base))
+                out[members] = plan.evaluate(vals[:, members])
+        finite = np.isfinite(out)
+        for s_idx in range(S):
+            row = out[s_idx] if finite[s_idx].all() else out[s_idx][finite[s_idx]]
+            stats[s_idx].update(row)
+            sketches[s_idx].update(row)
+        if threshold is not None:
+            above += (out > threshold).sum(axis=1)
+
+    qs = np.array([sketch.quantile(np.array([0.05, 0.5, 0.95])) for sketch in sketches])
+    import pandas as pd
+
+    table = pd.DataFrame(
+        {
+            "n": [acc.n for acc in stats],
+            "mean": [float(acc.mean) for acc in stats],
+            "se": [float(acc.sem) for acc in stats],
+            "std": [float(acc.std) for acc in stats],
+            "min": [float(acc.min) for acc in stats],
+            "p5": qs[:, 0],
+            "median": qs[:, 1],
+            "p95": qs[:, 2],
+            "max": [float(acc.max) for acc in stats],
+        },
+        index=pd.Index([sc["name"] for sc in scenarios], name="scenario"),
+    )
+    if threshold is not None:
+        table["prob_above"] = above / table["n"].to_numpy()
+    return table
+
+
+# ─────────────────────────────────────────────
+# 8. 히스토그램 (서버 측 binning)
+# ─────────────────────────────────────────────
+def result_bounds(variables: list[dict], formula: str | None = None) -> tuple[float, float]:
+    """
+    결과가 가질 수 있는 최솟값/최댓값 (모든 분포가 [min, max] 로 유계).
+    가중합은 해석적으로, 수식은 구간 연산으로 구합니다. 수식이 유계가 아니면
+    (0 을 지나는 값으로 나누기 등) 고정 시드 예비 표본의 범위를 넓혀 씁니다.
+    범위가 실행마다 같아야 블록별 히스토그램을 병합할 수 있습니다.
+    """
+    mins = np.array([v["min"] for v in variables], dtype=float)
+    maxs = np.array([v["max"] for v in variables], dtype=float)
+    if not formula:
+        weights = _normalized_weights(variables)
+        lo, hi = mins * weights, maxs * weights
+        return float(np.minimum(lo, hi).sum()), float(np.maximum(lo, hi).sum())
+    lo, hi = compile_formula(formula, tuple(v["name"] for v in variables)).bounds(mins, maxs)
+    if np.isfinite(lo) and np.isfinite(hi):
+        return lo, hi
+    pilot = _sample_matrix(
+        SimulationPlan(variables, formula=formula), 4_096, rng=np.random.default_rng(0)
+    )[-1]
+    pilot = pilot[np.isfinite(pilot)]
+    if len(pilot) == 0:
+        return 0.0, 1.0
+    p_lo, p_hi = float(pilot.min()), float(pilot.max())
+    margin = (p_hi - p_lo) * 0.5
+    return max(lo, p_lo - margin), min(hi, p_hi + margin)
+
+
+@profiled("histogram")
+def result_histogram(results: np.ndarray, bins: int = 80) -> tuple[np.ndarray, np.ndarray]:
+    """
+    결과 배열을 bins 개 구간으로 미리 집계한 (edges, counts) 를 반환합니다.
+    차트에는 원본 표본 대신 이 상수 크기 데이터만 전달합니다. NaN / ±inf 는 세지 않습니다.
+    """
+    finite = np.isfinite(results)
+    counts, edges = np.histogram(results if finite.all() else results[finite], bins=bins)
+    return edges, counts
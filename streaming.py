@@ -0,0 +1,295 @@
+"""
+streaming.py — 스트리밍 누적 통계 (병합 가능한 accumulator)
+"""
+import numpy as np
+
+
+# ─────────────────────────────────────────────
+# 1. Welford 평균/분산 + 최솟값/최댓값
+# ─────────────────────────────────────────────
+class RunningStats:
+    """
+    청크 단위로 갱신되는 평균/분산/최솟값/최댓값 accumulator.
+
+    청크 하나를 반영하는 비용은 청크 크기에만 비례하며, 이미 누적된 표본 수와
+    무관합니다. 마지막 축을 표본 축으로 보고 나머지 축은 독립된 통계로 유지하므로
+    (변수 수,) 나 (시나리오 수,) 형태의 통계도 한 번에 누적할 수 있습니다.
+    두 accumulator는 Chan 병합 공식으로 합칠 수 있습니다.
+    """
+
+    __slots__ = ("n", "mean", "m2", "min", "max", "total")
+
+    def __init__(self, shape: tuple = ()):
+        self.n = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.total = np.zeros(shape)
+
+    def update(self, x: np.ndarray) -> None:
+        """표본 청크 x (마지막 축 = 표본)를 반영합니다."""
+        x = np.asarray(x, dtype=float)
+        m = x.shape[-1]
+        if m == 0:
+            return
+        total = x.sum(axis=-1)
+        mean = total / m
+        m2 = ((x - mean[..., None]) ** 2).sum(axis=-1)
+        self._combine(m, mean, m2, x.min(axis=-1), x.max(axis=-1), total)
+
+    def merge(self, other: "RunningStats") -> None:
+        """다른 accumulator(다른 청크/워커의 누적 결과)를 병합합니다."""
+        if other.n == 0:
+            return
+        self._combine(other.n, other.mean, other.m2, other.min, other.max, other.total)
+
+    def _combine(self, m, mean, m2, lo, hi, total) -> None:
+        n = self.n + m
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (m / n)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.n * m / n)
+        self.min = np.minimum(self.min, lo)
+        self.max = np.maximum(self.max, hi)
+        self.total = self.total + total
+        self.n = n
+
+    @property
+    def var(self) -> np.ndarray:
+        """모분산 (np.var 기본값과 동일, ddof=0)."""
+        return self.m2 / self.n if self.n else np.full_like(self.m2, np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+
+    @property
+    def sem(self) -> np.ndarray:
+        """평균의 표준오차."""
+        if self.n < 2:
+            return np.full_like(self.m2, np.inf)
+        return np.sqrt(self.m2 / (self.n - 1) / self.n)
+
+
+# ─────────────────────────────────────────────
+# 2. 공분산 (co-moment) accumulator
+# ─────────────────────────────────────────────
+class RunningCovariance:
+    """
+    다변량 평균과 co-moment 행렬 Σ(x - x̄)(x - x̄)ᵀ 를 청크 단위로 누적합니다.
+
+    입력은 (차원, 표본 수) 배열이며, RunningStats 와 같은 Chan 병합 공식을 씁니다.
+    제어 변량 회귀처럼 전체 표본 없이 공분산만 필요한 추정량에 사용합니다.
+    """
+
+    __slots__ = ("n", "mean", "comoment")
+
+    def __init__(self, dim: int):
+        self.n = 0
+        self.mean = np.zeros(dim)
+        self.comoment = np.zeros((dim, dim))
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float)
+        m = x.shape[1]
+        if m == 0:
+            return
+        mean = x.mean(axis=1)
+        centered = x - mean[:, None]
+        self._combine(m, mean, centered @ centered.T)
+
+    def merge(self, other: "RunningCovariance") -> None:
+        if other.n == 0:
+            return
+        self._combine(other.n, other.mean, other.comoment)
+
+    def _combine(self, m, mean, comoment) -> None:
+        n = self.n + m
+        delta = mean - self.mean
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * (self.n * m / n)
+        self.mean = self.mean + delta * (m / n)
+        self.n = n
+
+    @property
+    def cov(self) -> np.ndarray:
+        """표본 공분산 행렬 (ddof=1)."""
+        if self.n < 2:
+            return np.full_like(self.comoment, np.nan)
+        return self.comoment / (self.n - 1)
+
+
+# ─────────────────────────────────────────────
+# 3. 고정 구간 히스토그램 (병합 가능)
+# ─────────────────────────────────────────────
+FINE_BINS = 4096
+
+
+class StreamingHistogram:
+    """
+    [lo, hi] 를 bins 개 등간격 구간으로 나눈 히스토그램 accumulator.
+
+    구간 경계가 고정이므로 청크/워커별 히스토그램을 단순 합으로 병합할 수 있고,
+    원본 표본 없이 상수 크기의 (edges, counts) 만 유지합니다. 표시용으로는
+    coarsen() 으로 실제 값이 있는 범위만 잘라 적당한 구간 수로 합칩니다.
+    범위를 벗어난 값은 양 끝 구간에 넣고, NaN / ±inf 는 구간에 넣지 않고 nonfinite 로만 셉니다.
+    """
+
+    __slots__ = ("lo", "hi", "counts", "nonfinite")
+
+    def __init__(self, lo: float, hi: float, bins: int = FINE_BINS):
+        if not hi > lo:
+            hi = lo + 1.0
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.nonfinite = 0
+
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.lo, self.hi, len(self.counts) + 1)
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x)
+        finite = np.isfinite(x)
+        if not finite.all():
+            self.nonfinite += int(x.size - np.count_nonzero(finite))
+            x = x[finite]
+        bins = len(self.counts)
+        idx = ((x - self.lo) * (bins / (self.hi - self.lo))).astype(np.intp)
+        np.clip(idx, 0, bins - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=bins)
+
+    def merge(self, other: "StreamingHistogram") -> None:
+        if (other.lo, other.hi, len(other.counts)) != (self.lo, self.hi, len(self.counts)):
+            raise ValueError("구간 경계가 다른 히스토그램은 병합할 수 없습니다.")
+        self.counts += other.counts
+        self.nonfinite += other.nonfinite
+
+    def coarsen(self, bins: int = 80) -> tuple[np.ndarray, np.ndarray]:
+        """값이 있는 범위만 남겨 약 bins 개 구간으로 합친 (edges, counts) 를 반환합니다."""
+        nonzero = np.flatnonzero(self.counts)
+        if len(nonzero) == 0:
+            return self.edges[[0, -1]], np.zeros(1, dtype=np.int64)
+        first, last = nonzero[0], nonzero[-1] + 1
+        group = max(1, -(-(last - first) // bins))
+        n_groups = -(-(last - first) // group)
+        padded = np.zeros(n_groups * group, dtype=np.int64)
+        padded[: last - first] = self.counts[first:last]
+        width = (self.hi - self.lo) / len(self.counts)
+        edges = self.lo + (first + group * np.arange(n_groups + 1)) * width
+        return np.minimum(edges, self.hi), padded.reshape(n_groups, group).sum(axis=1)
+
+
+# ─────────────────────────────────────────────
+# 4. KLL 분위수 스케치 (병합/직렬화 가능)
+# ─────────────────────────────────────────────
+class QuantileSketch:
+    """
+    KLL 분위수 스케치. 원본 표본 없이 임의 분위수를 근사합니다.
+
+    level h 의 원소는 가중치 2^h 를 가지며, 버퍼가 용량을 넘으면 정렬 후 한 칸씩 건너
+    절반만 위 level 로 올립니다 (compaction). 메모리는 약 3k 개 원소로 유계이고,
+    순위 오차는 대략 1.7 / k 입니다 (k=2048 이면 약 0.1%).
+    두 스케치는 level 별로 이어 붙인 뒤 다시 compaction 하는 방식으로 병합됩니다.
+    """
+
+    __slots__ = ("k", "n", "min", "max", "levels", "_rng")
+
+    def __init__(self, k: int = 2048, seed=None):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            buf = self.levels[level]
+            if len(buf) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buf = np.sort(buf)
+                keep = buf[-1:] if len(buf) % 2 else buf[:0]
+                body = buf[: len(buf) - len(keep)]
+                promoted = body[self._rng.integers(2) :: 2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float).ravel()
+        if len(x) == 0:
+            return
+        self.n += len(x)
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self.levels[0] = np.concatenate([self.levels[0], x])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.n == 0:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, buf in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], buf])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _weighted(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(buf), 2.0 ** level) for level, buf in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """q ∈ [0, 1] (스칼라 또는 배열) 에 해당하는 근사 분위수."""
+        q = np.asarray(q, dtype=float)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)[()]
+        items, cum = self._weighted()
+        idx = np.searchsorted(cum, q * cum[-1], side="left")
+        out = items[np.minimum(idx, len(items) - 1)]
+        out = np.where(q <= 0, self.min, np.where(q >= 1, self.max, out))
+        return out[()]
+
+    def rank(self, x):
+        """x 이하인 표본 비율의 근사값 (근사 누적분포함수)."""
+        if self.n == 0:
+            return np.full(np.shape(x), np.nan)[()]
+        items, cum = self._weighted()
+        idx = np.searchsorted(items, np.asarray(x, dtype=float), side="right")
+        return (np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0) / cum[-1])[()]
+
+    def to_dict(self) -> dict:
+        """JSON 으로 저장 가능한 dict (부분 실행 결과를 나중에 병합할 때 사용)."""
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "levels": [buf.tolist() for buf in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, seed=None) -> "QuantileSketch":
+        sketch = cls(data["k"], seed)
+        sketch.n = data["n"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        sketch.levels = [np.asarray(buf, dtype=float) for buf in data["levels"]]
+        return sketch
@@ -0,0 +1,7 @@
+"""
+conftest.py — 테스트에서 저장소 최상위 모듈(simulation, formula 등)을 import 할 수 있게 합니다.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,38 @@
+"""
+test_bootstrap.py — 묶음 Poisson 부트스트랩 분위수 구간 (단순 재표본 부트스트랩과 비교, NaN 결과)
+"""
+import numpy as np
+import pytest
+
+from simulation import bootstrap_intervals, run_simulation
+
+VARIABLES = [
+    {"name": "a", "min": 0.0, "max": 10.0, "dist": "균등", "weight": 1.0},
+    {"name": "b", "min": 0.0, "max": 10.0, "dist": "균등", "weight": 1.0},
+]
+QUANTILES = {"p5": 0.05, "median": 0.5, "p95": 0.95}
+
+
+def naive_intervals(y: np.ndarray, n_boot: int = 200, level: float = 0.90) -> dict:
+    """행 단위 복원 추출로 재표본마다 분위수를 다시 계산하는 기준 부트스트랩."""
+    rng = np.random.default_rng(5)
+    reps = np.array([
+        np.quantile(y[rng.integers(0, len(y), len(y))], list(QUANTILES.values()))
+        for _ in range(n_boot)
+    ])
+    low, high = np.percentile(reps, [50 * (1 - level), 50 * (1 + level)], axis=0)
+    return {key: (low[j], high[j]) for j, key in enumerate(QUANTILES)}
+
+
+@pytest.mark.parametrize("formula", ["exp(a) + b", "a / (b - 5)", "log(a - 5) + b"])
+def test_quantile_intervals_match_naive_bootstrap(formula):
+    result = run_simulation(VARIABLES, 60_000, seed=1, formula=formula)
+    y = result.results[np.isfinite(result.results)]
+    boot = bootstrap_intervals(result, seed=0)  # log(a - 5) 는 NaN 이 섞여도 실패하지 않아야 합니다
+    naive = naive_intervals(y)
+    for key, p in QUANTILES.items():
+        low, high = boot[key]
+        assert low <= np.quantile(y, p) <= high
+        # 두 방법의 끝점 차이는 구간 폭에 비해 작아야 합니다 (재표본 수가 유한해서 생기는 흔들림 정도).
+        width = naive[key][1] - naive[key][0]
+        np.testing.assert_allclose(boot[key], naive[key], atol=0.35 * width)
@@ -0,0 +1,37 @@
+"""
+test_cache.py — 결과 캐시 한도와 제거 (디스크 한도, on_evict)
+"""
+from pathlib import Path
+
+from cache import ResultCache
+
+
+def write(path: Path, size: int) -> Path:
+    path.write_bytes(b"\0" * size)
+    return path
+
+
+def test_disk_limit_evicts_oldest_entries(tmp_path):
+    evicted = []
+    cache = ResultCache(max_disk_bytes=1_000, on_evict=lambda key, name, value: evicted.append(key))
+    for key in "abc":
+        cache.put(key, "export:csv", write(tmp_path / f"{key}.csv", 400))
+    assert evicted == ["a"]
+    assert cache.disk_bytes == 800
+
+
+def test_oversized_entry_is_refused_without_on_evict(tmp_path):
+    evicted = []
+    cache = ResultCache(
+        max_bytes=1_000, max_disk_bytes=1_000,
+        on_evict=lambda key, name, value: evicted.append(key),
+    )
+    cache.put("a", "export:csv", write(tmp_path / "a.csv", 400))
+    cache.put("b", "export:csv", write(tmp_path / "b.csv", 5_000))
+    cache.put("c", "blob", b"\0" * 5_000)
+
+    # 혼자 한도를 넘는 항목은 저장하지 않지만, 호출한 쪽이 계속 쓰므로 파일도 지우지 않습니다.
+    assert ("b", "export:csv") not in cache and ("c", "blob") not in cache
+    assert evicted == []
+    assert cache.get("a", "export:csv") == tmp_path / "a.csv"
+    assert cache.disk_bytes == 400
@@ -0,0 +1,66 @@
+"""
+test_engine.py — 엔진 불변식 (병렬 = 직렬 재현성)
+"""
+from concurrent.futures import wait
+
+import numpy as np
+import pytest
+
+from simulation import BLOCK_SIZE, get_pool, run_simulation, stream_convergence
+
+VARIABLES = [
+    {"name": "단가", "min": 10.0, "max": 20.0, "dist": "정규", "weight": 1.0},
+    {"name": "수량", "min": 100.0, "max": 300.0, "dist": "삼각", "weight": 2.0},
+    {"name": "고정비", "min": 500.0, "max": 900.0, "dist": "균등", "weight": 0.5},
+]
+# 블록 경계를 걸치고 마지막 블록이 짧도록 잡은 반복 횟수
+N_ITER = 2 * BLOCK_SIZE + 1_234
+
+
+# ─────────────────────────────────────────────
+# 1. 병렬 실행 재현성
+# ─────────────────────────────────────────────
+@pytest.mark.parametrize("method", ["random", "lhs", "sobol"])
+def test_parallel_matches_serial_bitwise(method):
+    serial = run_simulation(VARIABLES, N_ITER, seed=7, workers=1, method=method)
+    parallel = run_simulation(VARIABLES, N_ITER, seed=7, workers=2, method=method)
+    assert parallel.names == serial.names
+    np.testing.assert_array_equal(parallel.data, serial.data)
+
+
+def test_parallel_formula_and_streaming_match_serial():
+    formula = "`단가` * `수량` - `고정비`"
+    serial = run_simulation(VARIABLES, N_ITER, seed=11, formula=formula)
+    parallel = run_simulation(VARIABLES, N_ITER, seed=11, workers=2, formula=formula)
+    np.testing.assert_array_equal(parallel.data, serial.data)
+
+    # 횟수 지정 스트리밍(청크 = BLOCK_SIZE)도 같은 시드의 run_simulation 과 표본이 같아야 합니다.
+    streamed = stream_convergence(
+        VARIABLES, tol=0.0, min_iter=N_ITER, max_iter=N_ITER, chunk=BLOCK_SIZE,
+        seed=11, workers=2, formula=formula,
+    ).to_result()
+    np.testing.assert_array_equal(streamed.data, serial.data)
+
+
+def test_stream_convergence_recovers_from_broken_pool():
+    serial = run_simulation(VARIABLES, N_ITER, seed=13)
+    killed = []
+
+    def kill_workers(run):
+        # 첫 청크를 받은 뒤 공유 풀의 워커를 죽여, 남은 청크가 새 풀에서 다시 제출되게 합니다.
+        # 결과를 보내는 도중에 죽이면 풀 관리 스레드가 끊긴 메시지를 기다리며 멈추므로
+        # (CPython 동작), 제출된 작업이 모두 끝나 워커가 쉬고 있을 때 죽입니다.
+        if not killed:
+            pool = get_pool(2)
+            wait([item.future for item in list(pool._pending_work_items.values())])
+            for process in list(pool._processes.values()):
+                process.kill()
+            killed.append(run.n_done)
+
+    streamed = stream_convergence(
+        VARIABLES, tol=0.0, min_iter=N_ITER, max_iter=N_ITER, chunk=BLOCK_SIZE,
+        seed=13, workers=2, progress=kill_workers,
+    ).to_result()
+    assert killed == [BLOCK_SIZE]
+    np.testing.assert_array_equal(streamed.data, serial.data)
+
@@ -0,0 +1,53 @@
+"""
+test_export.py — 내보내기 왕복 (CSV / NPZ / Parquet)
+"""
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from export import export_result
+from simulation import run_simulation
+
+VARIABLES = [
+    {"name": "단가", "min": 10.0, "max": 20.0, "dist": "정규", "weight": 1.0},
+    {"name": "수량", "min": 100.0, "max": 300.0, "dist": "삼각", "weight": 2.0},
+    {"name": "고정비", "min": 500.0, "max": 900.0, "dist": "균등", "weight": 0.5},
+]
+
+
+def read_csv(path) -> pd.DataFrame:
+    """내보낸 CSV 를 float 그대로 다시 읽습니다 (BOM, 왕복 정밀도)."""
+    return pd.read_csv(path, encoding="utf-8-sig", float_precision="round_trip")
+
+
+@pytest.fixture(scope="module")
+def result():
+    return run_simulation(VARIABLES, 5_000, seed=3)
+
+
+def test_export_csv_round_trip(result, tmp_path):
+    path = export_result(result, "csv", tmp_path / "out.csv")
+    frame = read_csv(path)
+    assert list(frame.columns) == result.columns
+    np.testing.assert_array_equal(frame.to_numpy().T, result.data)
+
+
+def test_export_npz_round_trip(result, tmp_path):
+    path = export_result(result, "npz", tmp_path / "out.npz")
+    with np.load(path) as archive:
+        assert sorted(archive.files) == sorted(result.columns)
+        for name in result.columns:
+            np.testing.assert_array_equal(archive[name], result[name])
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+
+
+def test_export_parquet_round_trip(result, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = export_result(result, "parquet", tmp_path / "out.parquet")
+    table = pq.read_table(path)
+    assert table.column_names == result.columns
+    for name in result.columns:
+        np.testing.assert_array_equal(table[name].to_numpy(), result[name])
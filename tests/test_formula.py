@@ -0,0 +1,107 @@
+"""
+test_formula.py — 결과 수식 화이트리스트 (허용 구문은 NumPy 와 같게 평가, 그 밖은 ValueError),
+정의역 밖의 결과(NaN / ±inf)를 통계에서 빼는지
+"""
+import numpy as np
+import pytest
+
+from formula import compile_formula
+from simulation import (
+    calc_confidence_interval,
+    calc_running_mean,
+    estimate_mean,
+    run_simulation,
+    sensitivity_analysis,
+    summarize_result,
+)
+
+NAMES = ("a", "b", "변수 C")
+VALUES = np.array([[1.0, 2.0, 4.0], [3.0, 0.5, 2.0], [2.0, 8.0, 1.0]])
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("a + b * 2", lambda a, b, c: a + b * 2),
+        ("-a ** 2 / b", lambda a, b, c: -a ** 2 / b),
+        ("`변수 C` - 1.5", lambda a, b, c: c - 1.5),
+        ("abs(a - b) + sqrt(`변수 C`)", lambda a, b, c: np.abs(a - b) + np.sqrt(c)),
+        ("exp(a) * log(`변수 C`)", lambda a, b, c: np.exp(a) * np.log(c)),
+        ("max(a, b, 2) - min(a, b)", lambda a, b, c: np.maximum(np.maximum(a, b), 2) - np.minimum(a, b)),
+        ("where(a > b, a, b)", lambda a, b, c: np.where(a > b, a, b)),
+        ("(a <= 2) * 10 + (b >= 2)", lambda a, b, c: (a <= 2) * 10 + (b >= 2)),
+    ],
+)
+def test_allowed_syntax_matches_numpy(expression, expected):
+    plan = compile_formula(expression, NAMES)
+    np.testing.assert_allclose(plan.evaluate(VALUES), expected(*VALUES))
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "a +",
+        "a.real",
+        "__import__('os')",
+        "open('x')",
+        "a[0]",
+        "lambda: 1",
+        "[a, b]",
+        "'text'",
+        "True",
+        "a if b else c",
+        "a < b < 2",
+        "a % 2",
+        "a // 2",
+        "round(a)",
+        "max(a)",
+        "where(a, b)",
+        "max(a, b=1)",
+        "d + 1",
+        "`없는 변수` + 1",
+        "9" * 400,        # float 로 바꾸면 OverflowError
+        "1e999",          # inf
+        "2 + 3j",         # 복소수 (TypeError)
+        "9" * 5000,       # 정수 문자열 변환 한도 초과
+        "-" * 100_000 + "1",  # 지나친 중첩
+    ],
+)
+def test_rejected_syntax_raises_value_error(expression):
+    with pytest.raises(ValueError):
+        compile_formula(expression, NAMES)
+
+
+def test_nonfinite_results_are_counted_and_excluded():
+    variables = [
+        {"name": "a", "min": 0.0, "max": 10.0, "dist": "균등", "weight": 1.0},
+        {"name": "b", "min": -1.0, "max": 1.0, "dist": "정규", "weight": 1.0},
+    ]
+    formula = "log(a - 2) + 1 / b"  # a < 2 이면 NaN, b = 0 근처는 큰 값 (±inf 는 드묾)
+    result = run_simulation(variables, 20_000, seed=4, formula=formula)
+    values = result.results
+    finite = np.isfinite(values)
+    assert 0 < (~finite).sum() < len(values)
+    kept = values[finite]
+
+    run = summarize_result(result, variables, formula=formula)
+    assert run.nonfinite == (~finite).sum()
+    assert run.histogram.nonfinite == run.nonfinite and run.histogram.n == len(kept)
+    assert run.stats.n == run.sketch.n == len(kept)
+    np.testing.assert_allclose(run.stats.mean, kept.mean())
+
+    ci = calc_confidence_interval(values)
+    np.testing.assert_allclose(
+        [ci["p5"], ci["median"], ci["p95"]], np.percentile(kept, [5, 50, 95])
+    )
+    np.testing.assert_allclose([ci["mean"], ci["std"]], [kept.mean(), kept.std()])
+
+    idxs, means = calc_running_mean(values)
+    cumulative = np.cumsum(np.where(finite, values, 0.0)) / np.cumsum(finite)
+    np.testing.assert_allclose(means, cumulative[idxs - 1])
+
+    # 남은 행은 입력 기댓값과 맞지 않으므로 제어 변량 대신 유한한 결과의 단순 평균으로 추정합니다.
+    est = estimate_mean(result.data, variables, control_variates=True)
+    np.testing.assert_allclose(est["mean"], kept.mean())
+    assert est["ess"] == len(kept)
+    assert np.isfinite(sensitivity_analysis(result).to_numpy()).all()
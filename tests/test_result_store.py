@@ -0,0 +1,27 @@
+"""
+test_result_store.py — 디스크 결과 저장소 (memmap 왕복, 다시 연 결과의 내보내기)
+"""
+import numpy as np
+import pandas as pd
+
+from export import export_result
+from simulation import BLOCK_SIZE, SimulationResult, run_simulation
+
+VARIABLES = [
+    {"name": "단가", "min": 10.0, "max": 20.0, "dist": "정규", "weight": 1.0},
+    {"name": "수량", "min": 100.0, "max": 300.0, "dist": "삼각", "weight": 2.0},
+]
+N_ITER = 2 * BLOCK_SIZE + 1_234
+
+
+def test_disk_result_round_trip(tmp_path):
+    memory = run_simulation(VARIABLES, N_ITER, seed=5)
+    disk = run_simulation(VARIABLES, N_ITER, seed=5, out_path=tmp_path / "run.npy")
+    reopened = SimulationResult.open(tmp_path / "run.npy")
+    assert disk.on_disk and reopened.on_disk
+    assert reopened.names == memory.names
+    np.testing.assert_array_equal(reopened.data, memory.data)
+
+    path = export_result(reopened, "csv", tmp_path / "disk.csv")
+    frame = pd.read_csv(path, encoding="utf-8-sig", float_precision="round_trip")
+    np.testing.assert_array_equal(frame.to_numpy().T, memory.data)
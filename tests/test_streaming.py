@@ -0,0 +1,83 @@
+"""
+test_streaming.py — 스트리밍 accumulator 불변식 (Welford / Chan 병합, 히스토그램, 분위수 스케치 오차)
+"""
+import numpy as np
+import pytest
+
+from streaming import QuantileSketch, RunningCovariance, RunningStats, StreamingHistogram
+
+
+# ─────────────────────────────────────────────
+# 1. Welford / Chan 병합
+# ─────────────────────────────────────────────
+def test_running_stats_merge_matches_numpy():
+    rng = np.random.default_rng(0)
+    x = rng.lognormal(3.0, 1.2, size=(4, 50_000)) + 1e6  # 큰 오프셋: 단순 합 공식이면 오차가 큼
+    left, right = RunningStats((4,)), RunningStats((4,))
+    for chunk in np.array_split(x[:, :20_000], 7, axis=1):
+        left.update(chunk)
+    for chunk in np.array_split(x[:, 20_000:], 13, axis=1):
+        right.update(chunk)
+    left.merge(right)
+    left.merge(RunningStats((4,)))  # 빈 accumulator 병합은 아무 일도 하지 않음
+
+    assert left.n == x.shape[1]
+    np.testing.assert_allclose(left.mean, x.mean(axis=1), rtol=1e-13)
+    np.testing.assert_allclose(left.var, x.var(axis=1), rtol=1e-9)
+    np.testing.assert_array_equal(left.min, x.min(axis=1))
+    np.testing.assert_array_equal(left.max, x.max(axis=1))
+    np.testing.assert_allclose(left.total, x.sum(axis=1), rtol=1e-13)
+
+
+def test_running_covariance_merge_matches_numpy():
+    rng = np.random.default_rng(1)
+    cov = [[2.0, 0.5, 0.0], [0.5, 1.0, -0.3], [0.0, -0.3, 3.0]]
+    x = rng.multivariate_normal([1.0, -2.0, 5.0], cov, 30_000).T
+    left, right = RunningCovariance(3), RunningCovariance(3)
+    for chunk in np.array_split(x[:, :9_999], 5, axis=1):
+        left.update(chunk)
+    right.update(x[:, 9_999:])
+    left.merge(right)
+    np.testing.assert_allclose(left.cov, np.cov(x), rtol=1e-10, atol=1e-12)
+
+
+# ─────────────────────────────────────────────
+# 2. 고정 구간 히스토그램
+# ─────────────────────────────────────────────
+def test_histogram_counts_nonfinite_separately():
+    x = np.array([0.5, np.nan, 1.5, np.inf, -np.inf, 9.5, 20.0, -3.0])
+    hist = StreamingHistogram(0.0, 10.0, bins=10)
+    hist.update(x[:4])
+    other = StreamingHistogram(0.0, 10.0, bins=10)
+    other.update(x[4:])
+    hist.merge(other)
+
+    # NaN / ±inf 는 구간에 넣지 않고, 범위를 벗어난 유한값만 양 끝 구간에 들어갑니다.
+    assert hist.nonfinite == 3
+    assert hist.n == 5
+    np.testing.assert_array_equal(hist.counts, [2, 1, 0, 0, 0, 0, 0, 0, 0, 2])
+
+
+# ─────────────────────────────────────────────
+# 3. 분위수 스케치 순위 오차
+# ─────────────────────────────────────────────
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_quantile_sketch_rank_error(seed):
+    rng = np.random.default_rng(100 + seed)
+    x = rng.lognormal(0.0, 1.0, 300_000)
+    k = 2048
+    left, right = QuantileSketch(k, seed=seed), QuantileSketch(k, seed=seed + 10)
+    for chunk in np.array_split(x[:150_000], 37):
+        left.update(chunk)
+    for chunk in np.array_split(x[150_000:], 11):
+        right.update(chunk)
+    left.merge(right)
+
+    qs = np.linspace(0.01, 0.99, 99)
+    ordered = np.sort(x)
+    rank_of_estimate = np.searchsorted(ordered, left.quantile(qs), side="right") / len(x)
+    # 문서상 순위 오차는 약 1.7 / k 이고, 99개 분위수의 최댓값에 여유를 둔 한도입니다.
+    assert np.abs(rank_of_estimate - qs).max() < 4 / k
+    assert np.abs(left.rank(np.quantile(x, qs)) - qs).max() < 4 / k
+    assert left.n == len(x)
+    assert (left.min, left.max) == (x.min(), x.max())
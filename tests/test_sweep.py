@@ -0,0 +1,36 @@
+"""
+test_sweep.py — 일괄 시나리오 평가 요약 (분위수 정확도)
+"""
+import numpy as np
+import pytest
+
+from simulation import run_simulation, sweep_scenarios
+
+VARIABLES = [
+    {"name": "a", "min": 0.0, "max": 10.0, "dist": "균등", "weight": 1.0},
+    {"name": "b", "min": 0.0, "max": 10.0, "dist": "균등", "weight": 1.0},
+]
+FORMULAS = ["exp(a) + b", "a / (b - 5)", "log(a - 5) + b", None]
+N_ITER = 200_000
+
+
+@pytest.fixture(scope="module")
+def table():
+    scenarios = [
+        {"name": str(formula), "variables": VARIABLES, "settings": {"formula": formula}}
+        for formula in FORMULAS
+    ]
+    return sweep_scenarios(scenarios, n_iter=N_ITER, seed=3)
+
+
+@pytest.mark.parametrize("formula", FORMULAS)
+def test_sweep_quantiles_match_np_quantile(table, formula):
+    # 같은 모델의 독립 표본을 기준으로, 분위수 추정값의 순위가 표본 오차 + 스케치 오차 안인지 봅니다.
+    reference = run_simulation(VARIABLES, N_ITER, seed=11, formula=formula).results
+    reference = np.sort(reference[np.isfinite(reference)])
+    row = table.loc[str(formula)]
+    for key, p in (("p5", 0.05), ("median", 0.5), ("p95", 0.95)):
+        rank = np.searchsorted(reference, row[key]) / len(reference)
+        assert abs(rank - p) < 4e-3, (key, row[key], np.quantile(reference, p))
+    assert abs(row["n"] - len(reference)) < 0.02 * N_ITER
+    assert np.isfinite(row[["mean", "std", "min", "max"]].to_numpy(dtype=float)).all()